@@ -1,24 +1,62 @@
-# from .adjust_train_parameters import adjust_training_parameters
-# from .calculate_priorities import define_priorities
-# from .calculate_scores import compute_scores, normalize_scores
-# from .create_model import check_sparsity, create_model_tf
-# from .dynamic_train import dynamic_train
-# from .edgetrain_folder import get_edgetrain_folder
-# from .resource_monitor import log_usage_once, sys_resources
-# from .train_visualize import log_train_time, log_usage_plot, training_history_plot
-
-__all__ = [
-    "adjust_training_parameters",
-    "define_priorities",
-    "compute_scores",
-    "normalize_scores",
-    "check_sparsity",
-    "create_model_tf",
-    "dynamic_train",
-    "get_edgetrain_folder",
-    "log_usage_once",
-    "sys_resources",
-    "log_train_time",
-    "log_usage_plot",
-    "training_history_plot",
-]
+import importlib
+import sys
+import types
+
+# Public names and the submodule defining them. Submodules are imported on first
+# access, so `import edgetrain` does not load TensorFlow, matplotlib or pandas.
+_LAZY_ATTRIBUTES = {
+    "adjust_training_parameters": "adjust_train_parameters",
+    "define_priorities": "calculate_priorities",
+    "compute_scores": "calculate_scores",
+    "normalize_scores": "calculate_scores",
+    "check_sparsity": "create_model",
+    "create_model_tf": "create_model",
+    "dynamic_train": "dynamic_train",
+    "dynamic_train_multi_worker": "dynamic_train",
+    "get_edgetrain_folder": "edgetrain_folder",
+    "load_log": "log_reader",
+    "log_usage_once": "resource_monitor",
+    "sys_resources": "resource_monitor",
+    "load_trace": "replay",
+    "policy_grid": "replay",
+    "replay_policy": "replay",
+    "replay_policies": "replay",
+    "render_reports": "report",
+    "log_train_time": "train_visualize",
+    "log_usage_plot": "train_visualize",
+    "training_history_plot": "train_visualize",
+    "run_trials": "trials",
+    "trial_grid": "trials",
+}
+
+__all__ = list(_LAZY_ATTRIBUTES)
+
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRIBUTES.get(name)
+    if module_name is None:
+        raise AttributeError(f"module '{__name__}' has no attribute '{name}'")
+    value = getattr(importlib.import_module(f".{module_name}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+class _Package(types.ModuleType):
+    # Importing a submodule binds it on the package. Keep the public function of the
+    # same name (`dynamic_train`) bound instead, as an eager import would; the
+    # submodule stays importable with `from edgetrain.dynamic_train import ...`
+    def __setattr__(self, name, value):
+        if (
+            isinstance(value, types.ModuleType)
+            and _LAZY_ATTRIBUTES.get(name) == name
+            and value.__name__ == f"{__name__}.{name}"
+        ):
+            value = getattr(value, name)
+        super().__setattr__(name, value)
+
+
+sys.modules[__name__].__class__ = _Package
@@ -1,8 +1,247 @@
+import numpy as np
+
 from edgetrain.resource_monitor import sys_resources
 
+# Memory usage (%) and accuracy (0-1) thresholds of the adjustment rules
+DEFAULT_THRESHOLDS = {
+    "memory_high": 75,
+    "memory_low": 50,
+    "accuracy_low": 0.05,
+    "accuracy_high": 0.95,
+}
+
+DEFAULT_BATCH_BUCKETS = (16, 32, 64, 128)
+
+
+def snap_batch_size(batch_size, buckets=DEFAULT_BATCH_BUCKETS):
+    """
+    Snap a batch size to the closest allowed bucket.
+
+    Parameters:
+    - batch_size (int): Requested batch size.
+    - buckets (iterable of int): Allowed batch sizes. Ties go to the smaller bucket.
+
+    Returns:
+    - int: The closest bucket.
+    """
+    return min(sorted(buckets), key=lambda bucket: abs(bucket - batch_size))
+
+
+def snap_batch_size_array(batch_size, buckets=DEFAULT_BATCH_BUCKETS):
+    """
+    Array counterpart of `snap_batch_size`.
+
+    Parameters:
+    - batch_size (np.ndarray): Requested batch sizes.
+    - buckets (iterable of int): Allowed batch sizes. Ties go to the smaller bucket.
+
+    Returns:
+    - np.ndarray: The closest bucket of each batch size.
+    """
+    buckets = np.sort(np.asarray(list(buckets)))
+    # argmin returns the first (smallest) of tied buckets
+    distance = np.abs(buckets - np.asarray(batch_size)[..., np.newaxis])
+    return buckets[np.argmin(distance, axis=-1)]
+
+
+class BatchSizeController:
+    """
+    Interface of the batch size rules used by `adjust_training_parameters`.
+
+    Subclasses implement `propose`, which is called whenever the batch size has the
+    highest priority, and may keep state between calls.
+    """
+
+    def propose(self, batch_size, resources, buckets=None, throughput=None):
+        """
+        Propose the next batch size.
+
+        Parameters:
+        - batch_size (int): Current batch size.
+        - resources (dict): Dictionary containing system resource usage metrics.
+        - buckets (iterable of int, optional): Allowed batch sizes.
+        - throughput (dict, optional): Measured 'samples_per_second', and the 'batch_size' it
+          was measured at if it differs from the current batch size.
+
+        Returns:
+        - int: The proposed batch size.
+        """
+        raise NotImplementedError
+
+    def reset(self):
+        """
+        Forget the state of previous calls.
+        """
+
+
+class ThresholdBatchSizeController(BatchSizeController):
+    """
+    Default rule: halve the batch size above the high memory threshold and double it
+    below the low memory threshold. Stateless.
+
+    Parameters:
+    - thresholds (dict, optional): Overrides of `DEFAULT_THRESHOLDS`.
+    """
+
+    def __init__(self, thresholds=None):
+        self.thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+    def propose(self, batch_size, resources, buckets=None, throughput=None):
+        if (
+            resources["cpu_memory_percent"] > self.thresholds["memory_high"]
+            or resources["gpu_memory_percent"] > self.thresholds["memory_high"]
+        ):
+            return max(16, batch_size // 2)  # Halve batch size
+        if (
+            resources["cpu_memory_percent"] < self.thresholds["memory_low"]
+            and resources["gpu_memory_percent"] < self.thresholds["memory_low"]
+        ):
+            return min(128, batch_size * 2)  # Double batch size
+        return batch_size
+
+
+class HysteresisBatchSizeController(BatchSizeController):
+    """
+    Move the batch size toward a target memory utilization in proportional steps.
+
+    Nothing changes while memory usage is within `band` of `target`. Outside of it, the
+    batch size is scaled by `1 + gain * (target - memory) / 100` (at most doubled or
+    halved) and snapped to the allowed buckets, so small errors do not switch buckets.
+    After a change, the next `cooldown` calls keep the batch size, which leaves time for
+    memory usage to settle.
+
+    Parameters:
+    - target (float): Target memory usage (%), the larger of CPU and GPU memory usage.
+    - band (float): Half-width (%) of the dead band around the target.
+    - gain (float): Proportional gain.
+    - cooldown (int): Number of calls without change after each change.
+    - min_batch_size (int): Smallest batch size.
+    - max_batch_size (int): Largest batch size.
+    """
+
+    def __init__(
+        self,
+        target=60.0,
+        band=10.0,
+        gain=2.0,
+        cooldown=2,
+        min_batch_size=16,
+        max_batch_size=128,
+    ):
+        self.target = target
+        self.band = band
+        self.gain = gain
+        self.cooldown = cooldown
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.reset()
+
+    def reset(self):
+        self._cooldown_left = 0
+
+    def propose(self, batch_size, resources, buckets=None, throughput=None):
+        if self._cooldown_left > 0:
+            self._cooldown_left -= 1
+            return batch_size
+
+        memory = max(resources["cpu_memory_percent"], resources["gpu_memory_percent"])
+        error = self.target - memory
+        if abs(error) <= self.band:
+            return batch_size
+
+        factor = min(2.0, max(0.5, 1 + self.gain * error / 100))
+        proposed = round(batch_size * factor)
+        proposed = min(self.max_batch_size, max(self.min_batch_size, proposed))
+        if buckets:
+            proposed = snap_batch_size(proposed, buckets)
+
+        if proposed != batch_size:
+            self._cooldown_left = self.cooldown
+        return proposed
+
+
+class ThroughputBatchSizeController(BatchSizeController):
+    """
+    Pick the batch size with the highest measured throughput under a memory ceiling.
+
+    Each call records the samples/s and memory usage of the current batch size. Above the
+    ceiling, the batch size steps down. Otherwise, the next larger size is tried while the
+    current size is the fastest known one, and the fastest size that stayed under the
+    ceiling is chosen once larger sizes stop paying off.
+
+    This controller is opt-in, even when throughput is measured: it changes the batch
+    size to explore larger sizes on any host with memory to spare, which also changes the
+    optimization (gradient noise, effective learning rate) of runs that were not under
+    memory pressure. The threshold rule stays the default so that batch sizes only move
+    with memory usage, and existing logs and replays keep their meaning.
+
+    Parameters:
+    - memory_ceiling (float): Maximum memory usage (%), the larger of CPU and GPU memory usage.
+    - min_batch_size (int): Smallest batch size.
+    - max_batch_size (int): Largest batch size. Without buckets, sizes double from
+      `min_batch_size` up to `max_batch_size`.
+    """
+
+    def __init__(self, memory_ceiling=75.0, min_batch_size=16, max_batch_size=128):
+        self.memory_ceiling = memory_ceiling
+        self.min_batch_size = min_batch_size
+        self.max_batch_size = max_batch_size
+        self.reset()
+
+    def reset(self):
+        self.samples_per_second = {}
+        self.memory = {}
+
+    def _sizes(self, buckets):
+        if buckets:
+            sizes = sorted(buckets)
+        else:
+            sizes, size = [], self.min_batch_size
+            while size <= self.max_batch_size:
+                sizes.append(size)
+                size *= 2
+        return [s for s in sizes if self.min_batch_size <= s <= self.max_batch_size]
+
+    def propose(self, batch_size, resources, buckets=None, throughput=None):
+        throughput = throughput or {}
+        measured = throughput.get("batch_size", batch_size)
+        memory = max(resources["cpu_memory_percent"], resources["gpu_memory_percent"])
+        self.memory[measured] = max(memory, self.memory.get(measured, memory))
+        samples_per_second = throughput.get("samples_per_second", np.nan)
+        if not np.isnan(samples_per_second):
+            self.samples_per_second[measured] = samples_per_second
+
+        sizes = self._sizes(buckets)
+        if memory > self.memory_ceiling:
+            smaller = [s for s in sizes if s < batch_size]
+            return smaller[-1] if smaller else batch_size
+
+        fitting = {
+            size: value
+            for size, value in self.samples_per_second.items()
+            if self.memory[size] <= self.memory_ceiling
+        }
+        if not fitting:
+            return batch_size
+        fastest = max(fitting, key=fitting.get)
+
+        # Explore the next larger size while the current one is the fastest
+        larger = [s for s in sizes if s > batch_size]
+        if fastest == batch_size and larger and larger[0] not in self.memory:
+            return larger[0]
+        return fastest
+
 
 def adjust_training_parameters(
-    priority_values, batch_size, lr, accuracy_score, resources=None
+    priority_values,
+    batch_size,
+    lr,
+    accuracy_score,
+    resources=None,
+    thresholds=None,
+    batch_size_controller=None,
+    buckets=None,
+    throughput=None,
 ):
     """
     Adjust the training parameters (batch size, learning rate) based on the highest priority score,
@@ -13,6 +252,13 @@ def adjust_training_parameters(
     - batch_size (int): Current batch size.
     - lr (float): Current learning rate.
     - accuracy_score (float): Current accuracy score from the latest epoch (0-1).
+    - resources (dict, optional): Dictionary containing system resource usage metrics. If None, system resources will be fetched.
+    - thresholds (dict, optional): Overrides of `DEFAULT_THRESHOLDS`.
+    - batch_size_controller (BatchSizeController, optional): Rule choosing the next batch
+      size. Defaults to `ThresholdBatchSizeController(thresholds)`, also when throughput is
+      given; pass a `ThroughputBatchSizeController` to tune for speed.
+    - buckets (iterable of int, optional): Allowed batch sizes, passed to the controller.
+    - throughput (dict, optional): Measured throughput, passed to the controller.
 
     Returns:
     - adjusted_batch_size (int): Adjusted batch size.
@@ -23,31 +269,132 @@ def adjust_training_parameters(
     if resources is None:
         resources = sys_resources()
 
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
     # Determine which parameter has the highest priority score
     highest_priority = max(priority_values, key=priority_values.get)
 
     # Adjust the parameter based on system resources and highest priority score
     if highest_priority == "batch_size":
         # Adjust batch size based on memory usage
-        if resources["cpu_memory_percent"] > 75 or resources["gpu_memory_percent"] > 75:
-            adjusted_batch_size = max(16, batch_size // 2)  # Halve batch size
-        elif (
-            resources["cpu_memory_percent"] < 50
-            and resources["gpu_memory_percent"] < 50
-        ):
-            adjusted_batch_size = min(128, batch_size * 2)  # Double batch size
-        else:
-            adjusted_batch_size = batch_size
+        if batch_size_controller is None:
+            batch_size_controller = ThresholdBatchSizeController(thresholds)
+        adjusted_batch_size = batch_size_controller.propose(
+            batch_size, resources, buckets=buckets, throughput=throughput
+        )
         adjusted_lr = lr
 
     elif highest_priority == "learning_rate":
         # Adjust learning rate based on accuracy score
-        if accuracy_score < 0.05:  # Example threshold for low accuracy
+        if accuracy_score < thresholds["accuracy_low"]:  # Low accuracy
             adjusted_lr = max(1e-5, lr * 0.5)  # Reduce learning rate
-        elif accuracy_score > 0.95:  # Example threshold for high accuracy
+        elif accuracy_score > thresholds["accuracy_high"]:  # High accuracy
             adjusted_lr = min(1e-2, lr * 1.2)  # Slightly increase learning rate
         else:
             adjusted_lr = lr
         adjusted_batch_size = batch_size
 
     return adjusted_batch_size, adjusted_lr
+
+
+def adjust_precision(
+    priority_values,
+    precision,
+    resources=None,
+    thresholds=None,
+    mixed_precision="mixed_float16",
+):
+    """
+    Switch from float32 to mixed precision when memory pressure is high.
+
+    Mixed precision roughly halves activation memory, so when batch size adjustment has the
+    highest priority and memory usage is above the high threshold, switching precision is
+    tried before the batch size is halved. The switch is one-way.
+
+    Parameters:
+    - priority_values (dict): Dictionary of priority values for each parameter.
+    - precision (str): Current Keras dtype policy, e.g. 'float32'.
+    - resources (dict, optional): Dictionary containing system resource usage metrics.
+    - thresholds (dict, optional): Overrides of `DEFAULT_THRESHOLDS`.
+    - mixed_precision (str, optional): Mixed policy to switch to ('mixed_float16' or
+      'mixed_bfloat16'). None disables switching.
+
+    Returns:
+    - str: The adjusted precision policy.
+    """
+    if not mixed_precision or precision != "float32":
+        return precision
+    if max(priority_values, key=priority_values.get) != "batch_size":
+        return precision
+
+    # Get system resources
+    if resources is None:
+        resources = sys_resources()
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+
+    if (
+        resources["cpu_memory_percent"] > thresholds["memory_high"]
+        or resources["gpu_memory_percent"] > thresholds["memory_high"]
+    ):
+        return mixed_precision
+    return precision
+
+
+def adjust_training_parameters_array(
+    priority_values, batch_size, lr, accuracy_score, resources, thresholds=None
+):
+    """
+    Array counterpart of `adjust_training_parameters`: adjust many parameter sets at once.
+    Batch sizes follow the default threshold rule.
+
+    Parameters:
+    - priority_values (np.ndarray): Structured array of priorities (see `define_priorities_array`).
+    - batch_size (np.ndarray): Current batch sizes.
+    - lr (np.ndarray): Current learning rates.
+    - accuracy_score (np.ndarray): Current accuracy scores (0-1).
+    - resources (np.ndarray or dict): Structured array (see `resources_array`) or dict of
+      arrays with 'cpu_memory_percent' and 'gpu_memory_percent'.
+    - thresholds (dict, optional): Overrides of `DEFAULT_THRESHOLDS`. Values may be arrays that
+      broadcast against the other arguments.
+
+    Returns:
+    - adjusted_batch_size (np.ndarray): Adjusted batch sizes.
+    - adjusted_lr (np.ndarray): Adjusted learning rates.
+    """
+    thresholds = {**DEFAULT_THRESHOLDS, **(thresholds or {})}
+    batch_size = np.asarray(batch_size)
+    lr = np.asarray(lr, dtype=float)
+    accuracy_score = np.asarray(accuracy_score, dtype=float)
+    cpu_memory = np.asarray(resources["cpu_memory_percent"])
+    gpu_memory = np.asarray(resources["gpu_memory_percent"])
+
+    # Ties go to the batch size, which comes first in the scalar priority dictionary
+    batch_size_first = priority_values["batch_size"] >= priority_values["learning_rate"]
+
+    # Adjust batch size based on memory usage
+    memory_high = (cpu_memory > thresholds["memory_high"]) | (
+        gpu_memory > thresholds["memory_high"]
+    )
+    memory_low = (cpu_memory < thresholds["memory_low"]) & (
+        gpu_memory < thresholds["memory_low"]
+    )
+    new_batch_size = np.where(
+        memory_high,
+        np.maximum(16, batch_size // 2),
+        np.where(memory_low, np.minimum(128, batch_size * 2), batch_size),
+    )
+
+    # Adjust learning rate based on accuracy score
+    new_lr = np.where(
+        accuracy_score < thresholds["accuracy_low"],
+        np.maximum(1e-5, lr * 0.5),
+        np.where(
+            accuracy_score > thresholds["accuracy_high"],
+            np.minimum(1e-2, lr * 1.2),
+            lr,
+        ),
+    )
+
+    adjusted_batch_size = np.where(batch_size_first, new_batch_size, batch_size)
+    adjusted_lr = np.where(batch_size_first, lr, new_lr)
+    return adjusted_batch_size, adjusted_lr
@@ -0,0 +1,233 @@
+import gc
+import threading
+import time
+
+import psutil
+import tensorflow as tf
+
+from edgetrain.adjust_train_parameters import DEFAULT_THRESHOLDS
+from edgetrain.input_pipeline import build_pipeline
+
+
+def _process_rss():
+    return psutil.Process().memory_info().rss
+
+
+class PeakMemoryMonitor:
+    """
+    Track the peak resident memory (RSS) of this process from a background thread.
+
+    Parameters:
+    - interval (float): Seconds between two samples.
+    - memory_fn (callable, optional): Function returning the current memory usage in bytes.
+      Defaults to the RSS of this process.
+    """
+
+    def __init__(self, interval=0.005, memory_fn=None):
+        self.interval = interval
+        self._memory_fn = memory_fn or _process_rss
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.peak = 0
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            self.peak = max(self.peak, self._memory_fn())
+
+    def __enter__(self):
+        self.peak = self._memory_fn()
+        self._stop_event.clear()
+        self._thread = threading.Thread(
+            target=self._run, name="edgetrain-peak-memory", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._stop_event.set()
+        self._thread.join()
+        self.peak = max(self.peak, self._memory_fn())
+
+
+def default_memory_budget(memory_percent=None):
+    """
+    Memory (bytes) that training may add before system memory usage reaches a limit.
+
+    Parameters:
+    - memory_percent (float, optional): System memory usage limit (%). Defaults to the
+      'memory_high' adjustment threshold.
+
+    Returns:
+    - int: The memory budget in bytes (0 if the limit is already exceeded).
+    """
+    if memory_percent is None:
+        memory_percent = DEFAULT_THRESHOLDS["memory_high"]
+    memory = psutil.virtual_memory()
+    limit = memory.total * memory_percent / 100
+    return max(0, int(limit - (memory.total - memory.available)))
+
+
+def probe_batch_size(
+    model, dataset, batch_size, steps=3, baseline=None, memory_fn=None
+):
+    """
+    Run a few timed training steps at one batch size.
+
+    The first step compiles the train function and is not timed. Running out of memory
+    is reported as a batch size that does not fit.
+
+    Parameters:
+    - model (tf.keras.Model): A compiled model. Its weights are updated by the probe.
+    - dataset (tf.data.Dataset): A dataset of unbatched (image, label) elements.
+    - batch_size (int): Batch size to probe.
+    - steps (int): Number of timed steps.
+    - baseline (int, optional): Memory usage (bytes) growth is measured from. Defaults to
+      the memory usage before the probe.
+    - memory_fn (callable, optional): Function returning the current memory usage in
+      bytes. Defaults to the RSS of this process.
+
+    Returns:
+    - trial (dict): 'batch_size', 'memory_growth' (peak bytes above the baseline),
+      'step_time' (s), 'samples_per_second', and 'oom' (True if the probe ran out of memory).
+    """
+    batches = build_pipeline(
+        dataset.repeat(), batch_size, shuffle_buffer=0, drop_remainder=True
+    ).take(steps + 1)
+
+    gc.collect()
+    trial = {"batch_size": batch_size, "oom": False}
+    with PeakMemoryMonitor(memory_fn=memory_fn) as monitor:
+        if baseline is None:
+            baseline = monitor.peak
+        try:
+            iterator = iter(batches)
+            model.train_on_batch(*next(iterator))
+            start = time.perf_counter()
+            for images, labels in iterator:
+                model.train_on_batch(images, labels)
+            elapsed = time.perf_counter() - start
+        except (tf.errors.ResourceExhaustedError, MemoryError):
+            trial["oom"] = True
+            elapsed = float("inf")
+
+    trial["memory_growth"] = max(0, monitor.peak - baseline)
+    trial["step_time"] = elapsed / steps
+    trial["samples_per_second"] = batch_size * steps / elapsed
+    return trial
+
+
+def find_batch_size(
+    model,
+    dataset,
+    memory_budget=None,
+    min_batch_size=8,
+    max_batch_size=1024,
+    buckets=None,
+    steps=3,
+    probe_fn=None,
+    memory_fn=None,
+):
+    """
+    Find the largest batch size that fits a memory budget and the fastest batch size.
+
+    Batch sizes are doubled from `min_batch_size` until one exceeds the budget (or runs out
+    of memory), then the largest fitting size is found by binary search between the last
+    fitting and the first failing size. Each probe runs a few timed training steps (see
+    `probe_batch_size`) and measures the peak growth of process memory from the start of
+    the search, so the search works on CPU-only machines. Memory kept by earlier probes
+    (e.g. compiled functions of other batch sizes) is charged to later ones, as the
+    budget was computed before it was allocated.
+
+    Parameters:
+    - model (tf.keras.Model): A compiled model used for probing. Its weights are updated,
+      so pass a throwaway copy of the model to train.
+    - dataset (tf.data.Dataset): A dataset of unbatched (image, label) elements. Each
+      probe reads it again from the start; pass a bounded sample (e.g. `dataset.take(n)`)
+      rather than a source that can only be read once.
+    - memory_budget (int, optional): Maximum memory growth (bytes) during training. Defaults
+      to `default_memory_budget()`.
+    - min_batch_size (int): Smallest batch size probed. Without buckets, probed sizes are
+      multiples of it.
+    - max_batch_size (int): Largest batch size probed.
+    - buckets (iterable of int, optional): Only probe these batch sizes.
+    - steps (int): Number of timed steps per probe.
+    - probe_fn (callable, optional): Function `(batch_size) -> trial` replacing
+      `probe_batch_size`, e.g. for tests.
+    - memory_fn (callable, optional): Function returning the current memory usage in
+      bytes. Defaults to the RSS of this process.
+
+    Returns:
+    - dict: 'max_batch_size' (largest fitting size), 'best_batch_size' (highest samples/s
+      among fitting sizes) and 'trials' (every probe, in probing order). Both sizes are
+      None if no batch size fits.
+    """
+    if memory_budget is None:
+        memory_budget = default_memory_budget()
+    if probe_fn is None:
+        gc.collect()
+        baseline = (memory_fn or _process_rss)()
+
+        def probe_fn(batch_size):
+            return probe_batch_size(
+                model,
+                dataset,
+                batch_size,
+                steps=steps,
+                baseline=baseline,
+                memory_fn=memory_fn,
+            )
+
+    # Candidate batch sizes: the buckets, or multiples of the smallest size
+    if buckets:
+        sizes = sorted(b for b in buckets if min_batch_size <= b <= max_batch_size)
+    else:
+        sizes = list(range(min_batch_size, max_batch_size + 1, min_batch_size))
+
+    trials = []
+
+    def fits(index):
+        trial = probe_fn(sizes[index])
+        trial["fits"] = not trial["oom"] and trial["memory_growth"] <= memory_budget
+        trials.append(trial)
+        print(
+            f"Batch size {trial['batch_size']}: "
+            f"{trial['memory_growth'] / 2**20:.1f} MiB, "
+            f"{trial['samples_per_second']:.1f} samples/s"
+            f"{'' if trial['fits'] else ' (exceeds memory budget)'}"
+        )
+        return trial["fits"]
+
+    # Double the batch size until it no longer fits
+    low, high = None, None
+    index = 0
+    while index < len(sizes):
+        if not fits(index):
+            high = index
+            break
+        low = index
+        next_size = sizes[index] * 2
+        next_index = next((i for i, s in enumerate(sizes) if s >= next_size), None)
+        if next_index is None and index < len(sizes) - 1:
+            next_index = len(sizes) - 1
+        if next_index is None:
+            break
+        index = next_index
+
+    # Binary search between the last fitting and the first failing size
+    if low is not None and high is not None:
+        while high - low > 1:
+            middle = (low + high) // 2
+            if fits(middle):
+                low = middle
+            else:
+                high = middle
+
+    fitting = [trial for trial in trials if trial["fits"]]
+    if not fitting:
+        return {"max_batch_size": None, "best_batch_size": None, "trials": trials}
+    best = max(fitting, key=lambda trial: trial["samples_per_second"])
+    return {
+        "max_batch_size": sizes[low],
+        "best_batch_size": best["batch_size"],
+        "trials": trials,
+    }
@@ -0,0 +1,384 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import tempfile
+import time
+
+# Fixed snapshot so benchmarks of the decision pipeline do not measure the system
+BENCHMARK_RESOURCES = {
+    "cpu_cores": 4,
+    "cpu_compute_percent": 55.0,
+    "cpu_memory_percent": 72.0,
+    "gpu_compute_percent": 0.0,
+    "gpu_memory_usage": 0.0,
+    "gpu_memory_total": 0.0,
+    "gpu_memory_percent": 0.0,
+    "num_gpus": 0,
+}
+
+DEFAULT_TOLERANCE = 0.2
+
+
+def _metric(value, unit, higher_is_better):
+    return {"value": float(value), "unit": unit, "higher_is_better": higher_is_better}
+
+
+def _median_time(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def bench_sys_resources(quick=False):
+    """
+    Latency of a non-blocking `sys_resources` call.
+
+    Parameters:
+    - quick (bool): Run fewer repetitions.
+
+    Returns:
+    - dict: The metrics keyed by name.
+    """
+    from edgetrain.resource_monitor import sys_resources
+
+    sys_resources(interval=None)
+    latency = _median_time(lambda: sys_resources(interval=None), 20 if quick else 200)
+    return {"sys_resources.latency": _metric(latency, "s", False)}
+
+
+def bench_log_usage_once(quick=False):
+    """
+    Rows per second written by `log_usage_once` to a CSV and a `.npy` log.
+
+    Parameters:
+    - quick (bool): Write fewer rows.
+
+    Returns:
+    - dict: The metrics keyed by name.
+    """
+    from edgetrain.log_sinks import open_log_sink
+    from edgetrain.resource_monitor import log_usage_once
+
+    rows = 200 if quick else 2000
+    scores = {"memory_score": 0.5, "accuracy_score": 0.1, "throughput_score": 0.0}
+    priorities = {"batch_size": 0.3, "learning_rate": 0.2}
+    metrics = {}
+    with tempfile.TemporaryDirectory() as log_dir:
+        for extension in ["csv", "npy"]:
+            with open_log_sink(os.path.join(log_dir, f"log.{extension}")) as sink:
+                start = time.perf_counter()
+                for epoch in range(rows):
+                    log_usage_once(
+                        sink,
+                        0.2,
+                        32,
+                        1e-3,
+                        scores,
+                        priorities,
+                        num_epoch=epoch,
+                        resources=BENCHMARK_RESOURCES,
+                        accuracy=0.5,
+                    )
+                sink.flush()
+                elapsed = time.perf_counter() - start
+            metrics[f"log_usage_once.{extension}_rows_per_second"] = _metric(
+                rows / elapsed, "rows/s", True
+            )
+    return metrics
+
+
+def bench_check_sparsity(quick=False):
+    """
+    Latency of `check_sparsity` on dense models of increasing size.
+
+    Parameters:
+    - quick (bool): Only benchmark the smaller models.
+
+    Returns:
+    - dict: The metrics keyed by name, one per model width.
+    """
+    from tensorflow import keras
+
+    from edgetrain.create_model import check_sparsity
+
+    widths = [64, 256] if quick else [64, 256, 1024]
+    metrics = {}
+    for width in widths:
+        model = keras.Sequential(
+            [keras.layers.Input(shape=(width,))]
+            + [keras.layers.Dense(width) for _ in range(4)]
+        )
+        latency = _median_time(lambda: check_sparsity(model), 3 if quick else 10)
+        metrics[f"check_sparsity.width_{width}_latency"] = _metric(latency, "s", False)
+    return metrics
+
+
+def bench_decisions(quick=False):
+    """
+    Scoring, priority and adjustment decisions per second on a fixed resource snapshot.
+
+    Parameters:
+    - quick (bool): Run fewer decisions.
+
+    Returns:
+    - dict: The metrics keyed by name.
+    """
+    from edgetrain.adjust_train_parameters import adjust_training_parameters
+    from edgetrain.calculate_priorities import define_priorities
+    from edgetrain.calculate_scores import compute_scores
+
+    decisions = 500 if quick else 5000
+    batch_size, lr = 32, 1e-3
+    start = time.perf_counter()
+    for i in range(decisions):
+        accuracy = 0.5 + 0.4 * (i % 10) / 10
+        scores = compute_scores(0.5, accuracy, resources=BENCHMARK_RESOURCES)
+        priorities = define_priorities(scores)
+        batch_size, lr = adjust_training_parameters(
+            priorities,
+            batch_size,
+            lr,
+            scores["accuracy_score"],
+            resources=BENCHMARK_RESOURCES,
+        )
+    elapsed = time.perf_counter() - start
+    return {
+        "decisions.per_second": _metric(decisions / elapsed, "decisions/s", True),
+    }
+
+
+def bench_dynamic_train(quick=False):
+    """
+    Training throughput and per-epoch overhead of `dynamic_train` on synthetic
+    MNIST-shaped data.
+
+    Throughput is the median step throughput logged by the controller. The overhead is
+    the time per epoch spent outside training steps: model setup, compilation, resource
+    sampling, adjustments and logging.
+
+    Parameters:
+    - quick (bool): Train on fewer samples.
+
+    Returns:
+    - dict: The metrics keyed by name.
+    """
+    import numpy as np
+
+    from edgetrain.dynamic_train import dynamic_train
+    from edgetrain.log_reader import load_log
+
+    samples, epochs = (256, 2) if quick else (2048, 3)
+    rng = np.random.default_rng(0)
+    train_dataset = {
+        "images": rng.random((samples, 28, 28, 1), dtype=np.float32),
+        "labels": rng.integers(0, 10, samples),
+    }
+
+    def train(log_file, epochs, dynamic_adjustments):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            dynamic_train(
+                train_dataset,
+                epochs=epochs,
+                batch_size=32,
+                log_file=log_file,
+                dynamic_adjustments=dynamic_adjustments,
+            )
+        return time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        # Warm up TensorFlow so the timed run does not pay for its initialization
+        train(os.path.join(log_dir, "warmup.csv"), 1, False)
+        log_file = os.path.join(log_dir, "resource_log.csv")
+        wall_time = train(log_file, epochs, True)
+        # Step throughput measured by the controller, excluding compilation
+        throughput = load_log(log_file, columns=["Samples/s"])["Samples/s"]
+    samples_per_second = float(np.nanmedian(throughput[throughput > 0]))
+    step_time = samples * epochs / samples_per_second
+
+    return {
+        "dynamic_train.samples_per_second": _metric(
+            samples_per_second, "samples/s", True
+        ),
+        "dynamic_train.epoch_overhead": _metric(
+            max(0.0, wall_time - step_time) / epochs, "s", False
+        ),
+    }
+
+
+BENCHMARKS = {
+    "sys_resources": bench_sys_resources,
+    "log_usage_once": bench_log_usage_once,
+    "check_sparsity": bench_check_sparsity,
+    "decisions": bench_decisions,
+    "dynamic_train": bench_dynamic_train,
+}
+
+
+def run_benchmarks(names=None, quick=False):
+    """
+    Run benchmarks of the EdgeTrain hot paths.
+
+    Parameters:
+    - names (iterable of str, optional): Benchmarks to run (keys of `BENCHMARKS`).
+      Defaults to all of them.
+    - quick (bool): Run smaller workloads, e.g. for smoke tests.
+
+    Returns:
+    - results (dict): 'machine' (platform description), 'created' (timestamp) and
+      'metrics' (each metric's 'value', 'unit' and 'higher_is_better', keyed by name).
+    """
+    names = list(BENCHMARKS) if names is None else list(names)
+    for name in names:
+        if name not in BENCHMARKS:
+            raise ValueError(f"Unknown benchmark '{name}'.")
+
+    metrics = {}
+    for name in names:
+        print(f"Running benchmark '{name}'...")
+        metrics.update(BENCHMARKS[name](quick=quick))
+    return {
+        "machine": {
+            "platform": platform.platform(),
+            "python": platform.python_version(),
+            "cpu_count": os.cpu_count(),
+        },
+        "created": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "metrics": metrics,
+    }
+
+
+def save_results(results, path):
+    """
+    Write benchmark results to a JSON file.
+
+    Parameters:
+    - results (dict): The results of `run_benchmarks`.
+    - path (str): Path to the JSON file.
+    """
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    """
+    Read benchmark results written by `save_results`.
+
+    Parameters:
+    - path (str): Path to the JSON file.
+
+    Returns:
+    - results (dict): The benchmark results.
+    """
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """
+    Compare benchmark results with a baseline.
+
+    Parameters:
+    - results (dict): The current results.
+    - baseline (dict): The baseline results.
+    - tolerance (float): Relative slowdown tolerated before a metric counts as a
+      regression, e.g. 0.2 for 20 %.
+
+    Returns:
+    - comparison (list of dict): One entry per metric present in both results, with
+      'name', 'baseline', 'value', 'change' (relative change, positive when faster)
+      and 'regression'.
+    """
+    comparison = []
+    for name, metric in results["metrics"].items():
+        reference = baseline["metrics"].get(name)
+        if reference is None or not reference["value"]:
+            continue
+        change = metric["value"] / reference["value"] - 1
+        if not metric["higher_is_better"]:
+            change = reference["value"] / metric["value"] - 1 if metric["value"] else 0
+        comparison.append(
+            {
+                "name": name,
+                "baseline": reference["value"],
+                "value": metric["value"],
+                "change": change,
+                "regression": change < -tolerance,
+            }
+        )
+    return comparison
+
+
+def main(argv=None):
+    """
+    Command line entry point: run the benchmarks and compare them with a baseline.
+
+    Parameters:
+    - argv (list of str, optional): Command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+    - int: The exit status, 1 if any metric regressed against the baseline.
+    """
+    parser = argparse.ArgumentParser(
+        prog="edgetrain-benchmark",
+        description="Benchmark the EdgeTrain hot paths.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        default="benchmark_results.json",
+        help="JSON file the results are written to (default: benchmark_results.json).",
+    )
+    parser.add_argument(
+        "-b",
+        "--baseline",
+        default=None,
+        help="JSON results to compare with; regressions set the exit status to 1.",
+    )
+    parser.add_argument(
+        "-t",
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Relative slowdown tolerated by the comparison (default: 0.2).",
+    )
+    parser.add_argument(
+        "--only",
+        nargs="+",
+        choices=list(BENCHMARKS),
+        default=None,
+        help="Benchmarks to run (default: all).",
+    )
+    parser.add_argument("--quick", action="store_true", help="Run smaller workloads.")
+    args = parser.parse_args(argv)
+
+    results = run_benchmarks(args.only, quick=args.quick)
+    save_results(results, args.output)
+    for name, metric in results["metrics"].items():
+        print(f"{name}: {metric['value']:.6g} {metric['unit']}")
+    print(f"Results written to '{args.output}'.")
+
+    if args.baseline is None:
+        return 0
+    comparison = compare_results(
+        results, load_results(args.baseline), tolerance=args.tolerance
+    )
+    for entry in comparison:
+        print(
+            f"{entry['name']}: {entry['change']:+.1%} vs baseline"
+            f"{' (REGRESSION)' if entry['regression'] else ''}"
+        )
+    regressions = [entry["name"] for entry in comparison if entry["regression"]]
+    print(f"{len(regressions)} regression(s) against '{args.baseline}'.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,3 +1,18 @@
+import numpy as np
+
+# Default weights if user priorities are not provided
+DEFAULT_PRIORITIES = {
+    "batch_size_adjustment": 0.4,
+    "accuracy_improvement": 0.6,
+    "throughput_improvement": 0.2,
+    "time_to_accuracy_improvement": 0.2,
+}
+
+
+# Fields of priority scores in array form
+PRIORITY_DTYPE = np.dtype([("batch_size", "float64"), ("learning_rate", "float64")])
+
+
 def define_priorities(normalized_scores, user_priorities=None):
     """
     Calculate priority scores for adjustments based on resource usage and accuracy.
@@ -6,28 +21,69 @@ def define_priorities(normalized_scores, user_priorities=None):
     - normalized_scores (dict): Dictionary containing normalized scores for memory usage and accuracy.
         - memory_score (float): Score indicating memory usage pressure (0-100).
         - accuracy_score (float): Score indicating stagnation in accuracy improvement (0-1).
-    - user_priorities (dict, optional): Optional user-defined priorities for resource conservation and accuracy improvement.
+        - throughput_score (float, optional): Score indicating a throughput drop (0-1).
+        - time_to_accuracy_score (float, optional): Score indicating accuracy stalling per
+          second of training (0-1).
+    - user_priorities (dict, optional): Optional user-defined priorities for resource conservation, accuracy
+      improvement, throughput improvement and time-to-accuracy improvement. A throughput drop raises the
+      batch size priority; stalling accuracy per second raises the learning rate priority.
 
     Returns:
     - priority_value (dict): A dictionary of priority scores for batch size and learning rate.
     """
 
-    # Default weights if user priorities are not provided
-    default_priorities = {
-        "batch_size_adjustment": 0.4,
-        "accuracy_improvement": 0.6,
-    }
-
     # Use user-defined priorities if available
-    priorities = user_priorities if user_priorities else default_priorities
+    priorities = user_priorities if user_priorities else DEFAULT_PRIORITIES
 
     # Calculate weighted priority scores
     priority_value = {
         "batch_size": priorities["batch_size_adjustment"]
-        * normalized_scores.get("memory_score"),
+        * normalized_scores.get("memory_score")
+        + priorities.get("throughput_improvement", 0)
+        * normalized_scores.get("throughput_score", 0),
         "learning_rate": (
             priorities["accuracy_improvement"] * normalized_scores.get("accuracy_score")
+            + priorities.get("time_to_accuracy_improvement", 0)
+            * normalized_scores.get("time_to_accuracy_score", 0)
         ),
     }
 
     return priority_value
+
+
+def define_priorities_array(normalized_scores, user_priorities=None):
+    """
+    Array counterpart of `define_priorities`.
+
+    Parameters:
+    - normalized_scores (np.ndarray): Structured array of normalized scores (see `compute_scores_array`).
+    - user_priorities (dict, optional): Priority weights. Values may be arrays that broadcast
+      against the scores, e.g. to evaluate several weightings at once.
+
+    Returns:
+    - priority_value (np.ndarray): Structured array of `PRIORITY_DTYPE`.
+    """
+    priorities = user_priorities if user_priorities else DEFAULT_PRIORITIES
+
+    batch_size = np.multiply(
+        priorities["batch_size_adjustment"], normalized_scores["memory_score"]
+    )
+    if "throughput_score" in normalized_scores.dtype.names:
+        batch_size = batch_size + np.multiply(
+            priorities.get("throughput_improvement", 0),
+            normalized_scores["throughput_score"],
+        )
+    learning_rate = np.multiply(
+        priorities["accuracy_improvement"], normalized_scores["accuracy_score"]
+    )
+    if "time_to_accuracy_score" in normalized_scores.dtype.names:
+        learning_rate = learning_rate + np.multiply(
+            priorities.get("time_to_accuracy_improvement", 0),
+            normalized_scores["time_to_accuracy_score"],
+        )
+
+    batch_size, learning_rate = np.broadcast_arrays(batch_size, learning_rate)
+    priority_value = np.empty(batch_size.shape, dtype=PRIORITY_DTYPE)
+    priority_value["batch_size"] = batch_size
+    priority_value["learning_rate"] = learning_rate
+    return priority_value
@@ -1,17 +1,80 @@
+import numpy as np
+
 from edgetrain.resource_monitor import sys_resources
 
+# Fields of normalized scores in array form
+SCORE_DTYPE = np.dtype(
+    [
+        ("memory_score", "float64"),
+        ("accuracy_score", "float64"),
+        ("throughput_score", "float64"),
+        ("time_to_accuracy_score", "float64"),
+    ]
+)
+
+# Default 0-100 range for memory score and 0-1 range for accuracy score
+DEFAULT_SCORE_RANGES = {"memory_score_range": 100, "accuracy_score_range": 1}
+
+
+def throughput_score(samples_per_second, best_samples_per_second):
+    """
+    Score how far training throughput has fallen below the best throughput of the run.
+
+    Parameters:
+    - samples_per_second (float): Current training throughput.
+    - best_samples_per_second (float): Best throughput measured so far.
+
+    Returns:
+    - float: 0 at the best throughput, approaching 1 as throughput drops. 0 if unknown.
+    """
+    if not best_samples_per_second > 0 or np.isnan(samples_per_second):
+        return 0.0
+    return 1 - samples_per_second / best_samples_per_second
+
+
+def time_to_accuracy_score(
+    accuracy_per_second, best_accuracy_per_second, target_reached=False
+):
+    """
+    Score how far the accuracy gain per second of training has fallen below the best
+    gain of the run, i.e. how much accuracy stalls per unit of wall time.
+
+    Parameters:
+    - accuracy_per_second (float): Accuracy gain per second since the previous decision.
+    - best_accuracy_per_second (float): Best accuracy gain per second so far.
+    - target_reached (bool): Whether the target accuracy was reached.
+
+    Returns:
+    - float: 0 at the best gain, approaching 1 as accuracy stalls. 0 if unknown or once
+      the target accuracy is reached.
+    """
+    if (
+        target_reached
+        or not best_accuracy_per_second > 0
+        or np.isnan(accuracy_per_second)
+    ):
+        return 0.0
+    return 1 - accuracy_per_second / best_accuracy_per_second
+
 
 def compute_scores(
-    previous_accuracy, current_accuracy, score_ranges=None, resources=None
+    previous_accuracy,
+    current_accuracy,
+    score_ranges=None,
+    resources=None,
+    throughput=None,
 ):
     """
-    Compute memory and accuracy scores, and normalize them.
+    Compute memory, accuracy, throughput and time-to-accuracy scores, and normalize them.
 
     Parameters:
     - previous_accuracy (float): Accuracy from the previous epoch.
     - current_accuracy (float): Current accuracy.
     - score_ranges (dict, optional): Dictionary of maximum possible improvements for each score.
     - resources (dict, optional): Dictionary containing system resource usage metrics. If None, system resources will be fetched.
+    - throughput (dict, optional): 'samples_per_second', 'best_samples_per_second',
+      'accuracy_per_second', 'best_accuracy_per_second' and 'time_to_accuracy' (NaN until
+      the target accuracy is reached) of the run. Missing values score 0.
 
     Returns:
     - normalized_scores (dict): Dictionary of normalized scores.
@@ -23,10 +86,7 @@ def compute_scores(
 
     # Default score ranges
     if score_ranges is None:
-        score_ranges = {
-            "memory_score_range": 100,  # Default 0-100 range for memory score
-            "accuracy_score_range": 1,  # Default 0-1 range for accuracy score
-        }
+        score_ranges = DEFAULT_SCORE_RANGES
 
     # Calculate memory score
     # If there is a GPU, average GPU and CPU for memory score, otherwise, just use CPU
@@ -40,8 +100,28 @@ def compute_scores(
     # Calculate accuracy score
     accuracy_score = 1 - max(0, current_accuracy - previous_accuracy)
 
+    # Calculate throughput score
+    if throughput is None:
+        throughput = {}
+    throughput_score_value = throughput_score(
+        throughput.get("samples_per_second", np.nan),
+        throughput.get("best_samples_per_second", np.nan),
+    )
+
+    # Calculate time-to-accuracy score
+    time_to_accuracy_score_value = time_to_accuracy_score(
+        throughput.get("accuracy_per_second", np.nan),
+        throughput.get("best_accuracy_per_second", np.nan),
+        target_reached=not np.isnan(throughput.get("time_to_accuracy", np.nan)),
+    )
+
     # Store all scores in a dictionary
-    raw_scores = {"memory_score": memory_score, "accuracy_score": accuracy_score}
+    raw_scores = {
+        "memory_score": memory_score,
+        "accuracy_score": accuracy_score,
+        "throughput_score": throughput_score_value,
+        "time_to_accuracy_score": time_to_accuracy_score_value,
+    }
 
     # Normalize the scores
     normalized_scores = normalize_scores(raw_scores, score_ranges)
@@ -70,3 +150,89 @@ def normalize_scores(raw_scores, score_ranges):
         normalized_scores[score_name] = normalized_score
 
     return normalized_scores
+
+
+def compute_scores_array(
+    previous_accuracy, current_accuracy, resources, score_ranges=None, throughput=None
+):
+    """
+    Array counterpart of `compute_scores`: compute normalized scores for many decisions at once.
+
+    Parameters:
+    - previous_accuracy (np.ndarray or float): Accuracies from the previous decisions.
+    - current_accuracy (np.ndarray or float): Current accuracies.
+    - resources (np.ndarray or dict): Structured array (see `resources_array`) or dict of
+      arrays with 'cpu_memory_percent', 'gpu_memory_percent' and 'num_gpus'.
+    - score_ranges (dict, optional): Dictionary of maximum possible improvements for each score.
+    - throughput (np.ndarray or dict, optional): Arrays of 'samples_per_second' and
+      'best_samples_per_second', and optionally 'accuracy_per_second',
+      'best_accuracy_per_second' and 'time_to_accuracy'. If None, throughput and
+      time-to-accuracy scores are 0.
+
+    Returns:
+    - normalized_scores (np.ndarray): Structured array of `SCORE_DTYPE`.
+    """
+    if score_ranges is None:
+        score_ranges = DEFAULT_SCORE_RANGES
+
+    # Average GPU and CPU for memory score where there is a GPU, otherwise use CPU only
+    cpu_memory = np.asarray(resources["cpu_memory_percent"], dtype=float)
+    gpu_memory = np.asarray(resources["gpu_memory_percent"], dtype=float)
+    memory_score = np.where(
+        np.asarray(resources["num_gpus"]) > 0, (cpu_memory + gpu_memory) / 2, cpu_memory
+    )
+
+    accuracy_score = 1 - np.maximum(
+        0, np.asarray(current_accuracy, dtype=float) - previous_accuracy
+    )
+
+    throughput_scores = time_to_accuracy_scores = 0.0
+    if throughput is not None:
+        samples_per_second = np.asarray(throughput["samples_per_second"], dtype=float)
+        best = np.asarray(throughput["best_samples_per_second"], dtype=float)
+        known = (best > 0) & ~np.isnan(samples_per_second)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            throughput_scores = np.where(known, 1 - samples_per_second / best, 0.0)
+    if throughput is not None and "accuracy_per_second" in throughput:
+        accuracy_per_second = np.asarray(throughput["accuracy_per_second"], dtype=float)
+        best = np.asarray(throughput["best_accuracy_per_second"], dtype=float)
+        known = (best > 0) & ~np.isnan(accuracy_per_second)
+        known &= np.isnan(np.asarray(throughput["time_to_accuracy"], dtype=float))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            time_to_accuracy_scores = np.where(
+                known, 1 - accuracy_per_second / best, 0.0
+            )
+
+    (
+        memory_score,
+        accuracy_score,
+        throughput_scores,
+        time_to_accuracy_scores,
+    ) = np.broadcast_arrays(
+        memory_score, accuracy_score, throughput_scores, time_to_accuracy_scores
+    )
+    raw_scores = np.empty(memory_score.shape, dtype=SCORE_DTYPE)
+    raw_scores["memory_score"] = memory_score
+    raw_scores["accuracy_score"] = accuracy_score
+    raw_scores["throughput_score"] = throughput_scores
+    raw_scores["time_to_accuracy_score"] = time_to_accuracy_scores
+
+    return normalize_scores_array(raw_scores, score_ranges)
+
+
+def normalize_scores_array(raw_scores, score_ranges):
+    """
+    Array counterpart of `normalize_scores`.
+
+    Parameters:
+    - raw_scores (np.ndarray): Structured array of raw scores, one field per score.
+    - score_ranges (dict): Dictionary of maximum possible improvements for each score.
+
+    Returns:
+    - normalized_scores (np.ndarray): Structured array with the same fields.
+    """
+    normalized_scores = np.empty(raw_scores.shape, dtype=raw_scores.dtype)
+    for score_name in raw_scores.dtype.names:
+        score_range = score_ranges.get(f"{score_name}_range", 1)
+        normalized_scores[score_name] = raw_scores[score_name] / score_range
+    return normalized_scores
@@ -0,0 +1,193 @@
+import os
+import pickle
+import threading
+
+import tensorflow as tf
+from tensorflow import keras
+
+from edgetrain.hyperparameters import _unwrap_optimizer
+
+
+def _loss_scale_variables(optimizer):
+    # Dynamic loss scale and its counter, tracked by mixed precision optimizers
+    loss_scale = tf.train.TrackableView.children(optimizer).get("loss_scale")
+    if loss_scale is None:
+        return {}
+    return dict(tf.train.TrackableView.children(loss_scale))
+
+
+def get_training_state(model):
+    """
+    Copy the weights and optimizer state of a model to host memory.
+
+    Parameters:
+    - model (tf.keras.Model): The compiled model.
+
+    Returns:
+    - state (dict): 'precision' (Keras dtype policy of the first layer), 'weights' (one
+      list of arrays per layer, including pruning masks and steps), 'optimizer' (the
+      optimizer variables, including the iteration count) and 'loss_scale' (the dynamic
+      loss scale state of a mixed precision optimizer, empty otherwise).
+    """
+    return {
+        "precision": model.layers[0].dtype_policy.name,
+        "weights": [layer.get_weights() for layer in model.layers],
+        "optimizer": [
+            variable.numpy()
+            for variable in _unwrap_optimizer(model.optimizer).variables
+        ],
+        "loss_scale": {
+            name: variable.numpy()
+            for name, variable in _loss_scale_variables(model.optimizer).items()
+        },
+    }
+
+
+def set_training_state(model, state):
+    """
+    Restore weights and optimizer state copied by `get_training_state`.
+
+    Weights are float32 under every precision policy, so they are restored layer by layer
+    into a model of the same architecture built with any policy (a mixed precision model
+    ends with an extra float32 softmax layer). Call within the distribution strategy scope
+    of the model, since the optimizer variables may have to be created.
+
+    Parameters:
+    - model (tf.keras.Model): The compiled model.
+    - state (dict): A training state (see `get_training_state`).
+    """
+    for layer, weights in zip(model.layers, state["weights"]):
+        layer.set_weights(weights)
+
+    # Checkpoints of float32 models have no loss scale; keep the initial one
+    loss_scale = state.get("loss_scale", {})
+    for name, variable in _loss_scale_variables(model.optimizer).items():
+        if name in loss_scale:
+            variable.assign(loss_scale[name])
+
+    if not state["optimizer"]:
+        return
+    optimizer = _unwrap_optimizer(model.optimizer)
+    optimizer.build(model.trainable_variables)
+    for variable, value in zip(optimizer.variables, state["optimizer"]):
+        variable.assign(value)
+
+
+def save_checkpoint(path, checkpoint):
+    """
+    Write a checkpoint atomically: a crash while writing keeps the previous checkpoint.
+
+    Parameters:
+    - path (str): Path to the checkpoint file.
+    - checkpoint (dict): The checkpoint (see `TrainingCheckpoint`).
+    """
+    temporary_path = f"{path}.tmp"
+    with open(temporary_path, "wb") as f:
+        pickle.dump(checkpoint, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary_path, path)
+
+
+def load_checkpoint(path):
+    """
+    Read a checkpoint written by `save_checkpoint`.
+
+    Parameters:
+    - path (str): Path to the checkpoint file.
+
+    Returns:
+    - checkpoint (dict): The checkpoint, or None if the file does not exist.
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+class TrainingCheckpoint(keras.callbacks.Callback):
+    """
+    Periodically checkpoint the training state of `dynamic_train` from a background thread.
+
+    Every `every_n_epochs` epochs, the model weights, optimizer slots (with the pruning
+    step, which follows the optimizer iterations), loss scale, controller state and training history
+    are copied to host memory at the end of the epoch. Pickling and writing the copy runs
+    in a background thread, so training only waits if the previous checkpoint is still
+    being written. The log is flushed before each checkpoint is written, so the log on
+    disk holds at least `log_records` records.
+
+    Place this callback after the `EdgeTrainController` so the checkpoint includes the
+    decision taken at the end of the epoch.
+
+    Parameters:
+    - path (str): Path to the checkpoint file.
+    - controller (EdgeTrainController): The controller whose state is saved.
+    - every_n_epochs (int): Number of epochs between two checkpoints.
+    - log_sink (sink, optional): Log sink flushed before each checkpoint is written.
+    - log_start (int): Number of records the log held before the controller's first one.
+    - history (list, optional): Training history of the epochs before the current run.
+
+    Attributes:
+    - history (list): Training history, one entry per epoch.
+    - checkpoint_count (int): Number of checkpoints written.
+    """
+
+    def __init__(
+        self,
+        path,
+        controller,
+        every_n_epochs=1,
+        log_sink=None,
+        log_start=0,
+        history=None,
+    ):
+        super().__init__()
+        self.path = path
+        self.controller = controller
+        self.every_n_epochs = every_n_epochs
+        self.log_sink = log_sink
+        self.log_start = log_start
+        self.history = list(history or [])
+        self.checkpoint_count = 0
+        self._thread = None
+
+    def _write(self, checkpoint):
+        if self.log_sink is not None:
+            self.log_sink.flush()
+        save_checkpoint(self.path, checkpoint)
+        self.checkpoint_count += 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.history.append({key: [value] for key, value in (logs or {}).items()})
+        if (epoch + 1) % self.every_n_epochs:
+            return
+
+        controller_state = self.controller.get_state()
+        checkpoint = {
+            "epoch": epoch + 1,
+            "model": get_training_state(self.model),
+            "controller": controller_state,
+            "history": list(self.history),
+            "log_records": self.log_start + controller_state["log_count"],
+        }
+
+        # Checkpoints are written in order, one at a time
+        self.wait()
+        self._thread = threading.Thread(
+            target=self._write,
+            args=(checkpoint,),
+            name="edgetrain-checkpoint-writer",
+            daemon=True,
+        )
+        self._thread.start()
+
+    def on_train_end(self, logs=None):
+        self.wait()
+
+    def wait(self):
+        """
+        Wait until the last checkpoint is written.
+        """
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,70 @@
+import time
+
+from tensorflow import keras
+
+
+def _tracing_count(function):
+    # Eager (non tf.function) train functions are never traced
+    get_count = getattr(function, "experimental_get_tracing_count", None)
+    return get_count() if get_count is not None else 0
+
+
+class TrainFunctionCache(keras.callbacks.Callback):
+    """
+    Cache one compiled train function per batch size and measure tracing overhead.
+
+    Call `activate(model, batch_size)` before each `model.fit` call: the train function
+    compiled for that batch size is restored, so switching back to a batch size that was
+    already used does not trace again. As a callback, it counts the steps during which the
+    active train function was (re)traced and adds their duration to `compile_time`.
+
+    Attributes:
+    - compile_count (int): Number of steps that traced the train function.
+    - retrace_count (int): Number of such steps after the first compilation.
+    - compile_time (float): Cumulative duration (s) of the steps that traced.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.compile_count = 0
+        self.compile_time = 0.0
+        self._functions = {}
+        self._active_batch_size = None
+        self._step_start = None
+        self._step_tracing_count = 0
+
+    @property
+    def retrace_count(self):
+        return max(0, self.compile_count - 1)
+
+    def activate(self, model, batch_size):
+        """
+        Make the train function compiled for `batch_size` the model's train function.
+
+        Parameters:
+        - model (tf.keras.Model): The compiled model.
+        - batch_size (int): Batch size of the next `fit` call.
+        """
+        if self._active_batch_size is not None and model.train_function is not None:
+            self._functions[self._active_batch_size] = model.train_function
+
+        # None makes Keras build a new train function on the next fit call
+        model.train_function = self._functions.get(batch_size)
+        self._active_batch_size = batch_size
+
+    def clear(self):
+        """
+        Forget the cached train functions, e.g. after the model was rebuilt.
+        """
+        self._functions = {}
+        self._active_batch_size = None
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_tracing_count = _tracing_count(self.model.train_function)
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        # The first call may trace more than once (variable creation); count it once
+        if _tracing_count(self.model.train_function) > self._step_tracing_count:
+            self.compile_count += 1
+            self.compile_time += time.perf_counter() - self._step_start
@@ -2,14 +2,19 @@ import numpy as np
 import tensorflow as tf
 from tensorflow.keras import layers, models
 
+PRECISION_POLICIES = ("float32", "mixed_float16", "mixed_bfloat16")
 
-def create_model_tf(input_shape, model_path=None):
+
+def create_model_tf(input_shape, model_path=None, precision="float32"):
     """
     Create a Convolutional Neural Network (CNN) model.
 
     Parameters:
     - input_shape (tuple): the shape of the input data (e.g., (1, 28, 28) for MNIST).
     - model_path (str): the path to load the model.
+    - precision (str): Keras dtype policy of the layers ('float32', 'mixed_float16' or
+      'mixed_bfloat16'). Mixed policies compute in 16 bits and keep float32 weights; the
+      output softmax always computes in float32. Ignored for loaded models.
 
     Returns:
     - model: A compiled tensorflow model.
@@ -18,6 +23,10 @@ def create_model_tf(input_shape, model_path=None):
     # Ensure that the input shape is provided
     if input_shape is None:
         raise ValueError("Input shape must be defined.")
+    if precision not in PRECISION_POLICIES:
+        raise ValueError(
+            f"Unknown precision '{precision}', expected one of {PRECISION_POLICIES}."
+        )
 
     if model_path and tf.io.gfile.exists(model_path):
         model = tf.keras.models.load_model(model_path)
@@ -26,38 +35,115 @@ def create_model_tf(input_shape, model_path=None):
         model = models.Sequential(
             [
                 layers.Input(shape=input_shape),
-                layers.Conv2D(32, (3, 3), activation="relu"),
-                layers.MaxPooling2D((2, 2)),
-                layers.Conv2D(64, (3, 3), activation="relu"),
-                layers.MaxPooling2D((2, 2)),
-                layers.Conv2D(64, (3, 3), activation="relu"),
-                layers.Flatten(),
-                layers.Dense(64, activation="relu"),
-                layers.Dense(10, activation="softmax"),
+                layers.Conv2D(32, (3, 3), activation="relu", dtype=precision),
+                layers.MaxPooling2D((2, 2), dtype=precision),
+                layers.Conv2D(64, (3, 3), activation="relu", dtype=precision),
+                layers.MaxPooling2D((2, 2), dtype=precision),
+                layers.Conv2D(64, (3, 3), activation="relu", dtype=precision),
+                layers.Flatten(dtype=precision),
+                layers.Dense(64, activation="relu", dtype=precision),
             ]
         )
+        if precision == "float32":
+            model.add(layers.Dense(10, activation="softmax"))
+        else:
+            # Softmax in 16 bits is numerically unstable: compute it in float32
+            model.add(layers.Dense(10, dtype=precision))
+            model.add(layers.Activation("softmax", dtype="float32"))
 
     return model
 
 
-def check_sparsity(model):
+def precision_optimizer(optimizer, precision):
+    """
+    Prepare an optimizer for a dtype policy.
+
+    float16 gradients underflow without loss scaling, so for 'mixed_float16' the optimizer
+    is wrapped in a dynamic `LossScaleOptimizer`. bfloat16 has the float32 exponent range
+    and needs no loss scaling.
+
+    Parameters:
+    - optimizer (tf.keras.optimizers.Optimizer): The optimizer.
+    - precision (str): Keras dtype policy of the model.
+
+    Returns:
+    - tf.keras.optimizers.Optimizer: The optimizer to compile the model with.
+    """
+    if precision == "mixed_float16":
+        return tf.keras.mixed_precision.LossScaleOptimizer(optimizer)
+    return optimizer
+
+
+@tf.function(reduce_retracing=True)
+def _count_near_zero(weights, tol):
+    # One fused graph over all weights; only the per-weight counts leave the device
+    return tf.stack(
+        [
+            tf.math.count_nonzero(tf.abs(w) <= tf.cast(tol, w.dtype), dtype=tf.int64)
+            for w in weights
+        ]
+    )
+
+
+def sparsity_report(model, tol=1e-8, trainable_only=False):
+    """
+    Calculate per-layer and global sparsity of a model on the device holding its weights.
+
+    Parameters:
+    - model (tf.keras.Model): The TensorFlow model to check sparsity for.
+    - tol (float): Weights with an absolute value up to `tol` count as zero.
+    - trainable_only (bool): Only count trainable weights.
+
+    Returns:
+    - dict: Global 'zeros', 'total' and 'sparsity', and the same statistics per layer
+      under 'layers', keyed by layer name. Layers without floating point weights are left out.
+    """
+
+    layer_weights = []
+    for layer in model.layers:
+        weights = layer.trainable_weights if trainable_only else layer.weights
+        # Integer weights (e.g. pruning step counters) are not parameters
+        weights = [w for w in weights if w.dtype.is_floating]
+        if weights:
+            layer_weights.append((layer.name, weights))
+
+    flat_weights = [w for _, weights in layer_weights for w in weights]
+    if flat_weights:
+        counts = _count_near_zero(
+            flat_weights, tf.constant(tol, dtype=tf.float64)
+        ).numpy()
+    else:
+        counts = np.zeros(0, dtype=np.int64)
+
+    report = {"layers": {}}
+    start = 0
+    for name, weights in layer_weights:
+        stop = start + len(weights)
+        zeros = int(counts[start:stop].sum())
+        total = sum(int(np.prod(w.shape)) for w in weights)
+        report["layers"][name] = {
+            "zeros": zeros,
+            "total": total,
+            "sparsity": zeros / total if total > 0 else 0,
+        }
+        start = stop
+
+    zeros = sum(layer["zeros"] for layer in report["layers"].values())
+    total = sum(layer["total"] for layer in report["layers"].values())
+    report.update(zeros=zeros, total=total, sparsity=zeros / total if total > 0 else 0)
+    return report
+
+
+def check_sparsity(model, tol=1e-8):
     """
     Calculate the sparsity of a given model.
 
     Parameters:
     - model (tf.keras.Model): The TensorFlow model to check sparsity for.
+    - tol (float): Weights with an absolute value up to `tol` count as zero.
 
     Returns:
     - float: The sparsity of the model, defined as the ratio of zero-valued parameters to the total number of parameters.
     """
 
-    total_params = 0
-    zero_params = 0
-    for layer in model.layers:
-        if hasattr(layer, "weights"):
-            for weight in layer.weights:
-                weight_values = weight.numpy()
-                total_params += np.prod(weight_values.shape)
-                zero_params += np.sum(np.isclose(weight_values, 0))
-    sparsity = (zero_params / total_params) if total_params > 0 else 0
-    return sparsity
+    return sparsity_report(model, tol=tol)["sparsity"]
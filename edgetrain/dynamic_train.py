@@ -1,12 +1,100 @@
+import os
+import types
+
 import tensorflow as tf
 import tensorflow_model_optimization as tfmot
 from tensorflow import keras
 
-from edgetrain.adjust_train_parameters import adjust_training_parameters
-from edgetrain.calculate_priorities import define_priorities
-from edgetrain.calculate_scores import compute_scores
-from edgetrain.create_model import create_model_tf
-from edgetrain.resource_monitor import log_usage_once
+from edgetrain.adjust_train_parameters import DEFAULT_BATCH_BUCKETS, snap_batch_size
+from edgetrain.batch_finder import find_batch_size
+from edgetrain.checkpoint import (
+    TrainingCheckpoint,
+    get_training_state,
+    load_checkpoint,
+    set_training_state,
+)
+from edgetrain.compile_cache import TrainFunctionCache
+from edgetrain.create_model import create_model_tf, precision_optimizer
+from edgetrain.gradient_accumulation import GradientAccumulator
+from edgetrain.input_pipeline import build_pipeline, load_dataset
+from edgetrain.log_reader import count_log_records, truncate_log
+from edgetrain.log_sinks import AsyncLogSink, open_log_sink
+from edgetrain.multi_worker import (
+    WorkerCoordinator,
+    is_multi_worker,
+    launch_local_workers,
+)
+from edgetrain.resource_monitor import ResourceSampler
+from edgetrain.step_profiler import StepProfiler, step_timing_file
+from edgetrain.train_controller import EdgeTrainController
+
+
+def _probe_elements(train_dataset, train_elements, num_samples):
+    # Probes read a bounded pipeline of their own. A one-shot generator cannot be read
+    # twice, so it is probed on zeros of the same shape instead
+    if isinstance(train_dataset, types.GeneratorType):
+        element = tuple(
+            tf.zeros(spec.shape, spec.dtype) for spec in train_elements.element_spec
+        )
+        return tf.data.Dataset.from_tensors(element).repeat(num_samples)
+    return train_elements.take(num_samples)
+
+
+def _find_start_batch_size(
+    train_dataset, train_elements, input_shape, lr, batch_buckets
+):
+    # Probe an unpruned copy of the model: it has the same activations and its weights
+    # are thrown away
+    probe_model = create_model_tf(input_shape=input_shape)
+    probe_model.compile(
+        optimizer=keras.optimizers.Adam(learning_rate=lr),
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    max_batch_size = max(batch_buckets) if batch_buckets else 1024
+    result = find_batch_size(
+        probe_model,
+        _probe_elements(train_dataset, train_elements, max_batch_size),
+        min_batch_size=16,
+        max_batch_size=max_batch_size,
+        buckets=batch_buckets,
+    )
+    if result["best_batch_size"] is None:
+        print("No batch size fits in the memory budget; using the smallest one.")
+        return min(batch_buckets) if batch_buckets else 16
+    print(
+        f"Recommended batch sizes: best throughput={result['best_batch_size']}, "
+        f"largest fitting={result['max_batch_size']}"
+    )
+    return result["best_batch_size"]
+
+
+def _build_model(input_shape, lr, pruning, precision):
+    # Pruned and compiled model; call within the distribution strategy scope
+    base_model = create_model_tf(input_shape=input_shape, precision=precision)
+    optimizer = precision_optimizer(keras.optimizers.Adam(learning_rate=lr), precision)
+
+    # Pruning wrappers take the global policy; they must compute in the layer's dtype
+    global_policy = keras.mixed_precision.global_policy()
+    keras.mixed_precision.set_global_policy(precision)
+    try:
+        pruning_schedule = tfmot.sparsity.keras.ConstantSparsity(pruning, begin_step=0)
+        model = tfmot.sparsity.keras.prune_low_magnitude(
+            base_model, pruning_schedule=pruning_schedule
+        )
+    finally:
+        keras.mixed_precision.set_global_policy(global_policy)
+    model.compile(
+        optimizer=optimizer,
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def _worker_log_file(log_file, task_id):
+    root, extension = os.path.splitext(log_file)
+    return f"{root}.worker{task_id}{extension}"
 
 
 def dynamic_train(
@@ -17,122 +105,314 @@ def dynamic_train(
     pruning=0.2,
     log_file="resource_log.csv",
     dynamic_adjustments=True,
+    sample_interval=1.0,
+    adjust_every_n_steps=None,
+    adjust_every_seconds=None,
+    shuffle_buffer=1024,
+    cache=False,
+    batch_buckets=DEFAULT_BATCH_BUCKETS,
+    user_priorities=None,
+    thresholds=None,
+    batch_size_controller=None,
+    gradient_accumulation=False,
+    precision="float32",
+    mixed_precision=None,
+    checkpoint_path=None,
+    checkpoint_every=1,
+    resume=False,
+    strategy=None,
+    step_timing=False,
+    profile_steps=None,
+    memory_budget=None,
 ):
     """
     Train the model with optional dynamic resource adjustment.
 
     Parameters:
-    - train_dataset (dict): The training dataset containing 'images' and 'labels'.
+    - train_dataset (dict, tf.data.Dataset, generator or str): The training data. Either a dict
+      containing 'images' and 'labels', a dataset or generator of unbatched (image, label)
+      pairs, or a path to a directory of '.npy' files or an '.npz' file (see `load_dataset`).
     - epochs (int): Number of epochs to train the model.
-    - batch_size (int): The base batch size to use.
+    - batch_size (int or 'auto'): The base batch size to use. With 'auto', a short probe
+      (see `find_batch_size`) picks the batch size with the best throughput that fits in
+      memory.
     - lr (float): The initial learning rate.
     - pruning (float): Initial pruning ratio (for dynamic adjustment).
-    - log_file (str): Path to the log file where resource usage is saved.
+    - log_file (str): Path to the log file where resource usage is saved. Files ending in
+      '.npy' are written as buffered binary logs, all others as CSV. Records are written
+      from a background thread.
     - dynamic_adjustments (bool): Flag to enable/disable dynamic adjustments.
+    - sample_interval (float): Seconds between two background resource samples.
+    - adjust_every_n_steps (int, optional): Run the adjustment pipeline every N training steps.
+    - adjust_every_seconds (float, optional): Run the adjustment pipeline every T seconds.
+      If neither is set, parameters are adjusted once per epoch.
+    - shuffle_buffer (int): Size of the input pipeline shuffle buffer (0 disables shuffling).
+    - cache (bool or str): Cache input elements in memory (True) or in the given file.
+    - batch_buckets (iterable of int, optional): Allowed batch sizes. Batch sizes are snapped
+      to the closest bucket, the last incomplete batch of each epoch is dropped and each
+      bucket's train function is compiled once and reused. None disables bucketing.
+    - user_priorities (dict, optional): User-defined priorities passed to `define_priorities`.
+    - thresholds (dict, optional): Adjustment thresholds passed to `adjust_training_parameters`
+      (see `edgetrain.replay` to tune them on recorded logs).
+    - batch_size_controller (BatchSizeController, optional): Rule choosing the next batch
+      size, e.g. `HysteresisBatchSizeController` to avoid oscillations or
+      `ThroughputBatchSizeController` to pick the fastest size under a memory ceiling
+      (opt-in, see its docstring). Defaults to the threshold rule.
+    - gradient_accumulation (bool): Keep the number of samples per optimizer update at
+      `batch_size`. When memory pressure shrinks the batch size, gradients of the smaller
+      micro-batches are accumulated over several steps instead (see `GradientAccumulator`),
+      and the accumulation factor is logged.
+    - precision (str): Initial Keras dtype policy: 'float32', 'mixed_float16' (with loss
+      scaling) or 'mixed_bfloat16'.
+    - mixed_precision (str, optional): Mixed policy to switch a float32 model to when
+      memory pressure is high, before the batch size is halved. The model is rebuilt with
+      the new policy and keeps its weights and optimizer state. None disables switching.
+      The active policy is logged.
+    - checkpoint_path (str, optional): File the training state is checkpointed to (see
+      `TrainingCheckpoint`): weights, optimizer slots, loss scale, pruning step, controller state
+      (batch size, learning rate, precision, previous accuracy...), history and log
+      position. Checkpoints are written from a background thread. None disables them.
+    - checkpoint_every (int): Number of epochs between two checkpoints.
+    - resume (bool): Restore the state saved in `checkpoint_path` and continue training
+      from the epoch after the checkpoint. Log records written after the checkpoint are
+      removed and logging continues in the same log file. Without a checkpoint, a new
+      run starts.
+    - strategy (tf.distribute.Strategy, optional): Distribution strategy. Defaults to
+      `MirroredStrategy` over the local devices. With `MultiWorkerMirroredStrategy` (see
+      `dynamic_train_multi_worker`), every worker calls `dynamic_train`; decisions are
+      coordinated across workers (see `WorkerCoordinator`), the chief writes `log_file` and
+      the checkpoints, and the other workers log to '<log_file>.worker<index>'.
+    - step_timing (bool): Time the data wait, compute and EdgeTrain callback overhead of
+      every training step (see `StepProfiler`) and write their histograms to
+      '<log_file root>_step_timing.json'.
+    - profile_steps (tuple of int, optional): First and last training step of a
+      TensorFlow profiler trace written to the '<log_file root>_profile' directory. None
+      disables tracing.
+    - memory_budget (int, optional): Memory (bytes) the training process may use. Memory
+      scores and thresholds then compare this process's memory (USS, and TensorFlow's GPU
+      allocator usage) with the budget instead of host-wide usage, so other processes and
+      the page cache do not shrink the batch size. None uses host-wide percentages.
 
     Returns:
     - final_model (tf.keras.Model): The trained and stripped model.
     - history_list (list): A list of training history for each epoch.
     """
 
-    # Log initial resource usage
-    normalized_scores = {"memory_score": 0, "accuracy_score": 0}
-    priority_value = {"batch_size": 0, "learning_rate": 0}
-    log_usage_once(
-        log_file,
-        pruning,
-        batch_size,
-        lr,
-        normalized_scores,
-        priority_value,
-        num_epoch=0,
-        resources=None,
-    )
-
     # Create MirroredStrategy for distributed training
-    strategy = tf.distribute.MirroredStrategy()
-
-    # Initialize training variables
-    history_list = []
-    prev_accuracy = 0.0
-
-    # Prepare training data
-    train_images, train_labels = train_dataset["images"], train_dataset["labels"]
+    if strategy is None:
+        strategy = tf.distribute.MirroredStrategy()
+    coordinator = None
+    if is_multi_worker(strategy):
+        coordinator = WorkerCoordinator(strategy)
+        if not coordinator.is_chief:
+            log_file = _worker_log_file(log_file, coordinator.task_id)
 
-    # Create model within scope and apply initial pruning
-    with strategy.scope():
-        base_model = create_model_tf(input_shape=train_images[0].shape)
-        optimizer = keras.optimizers.Adam(learning_rate=lr)
+    checkpoint = None
+    if resume and checkpoint_path:
+        checkpoint = load_checkpoint(checkpoint_path)
+        if checkpoint is None:
+            print(f"No checkpoint found at '{checkpoint_path}'; starting a new run.")
+        else:
+            # Drop the records logged after the checkpoint
+            truncate_log(log_file, checkpoint["log_records"])
+            print(f"Resuming from the checkpoint of epoch {checkpoint['epoch']}.")
 
-        pruning_schedule = tfmot.sparsity.keras.ConstantSparsity(pruning, begin_step=0)
-        model = tfmot.sparsity.keras.prune_low_magnitude(
-            base_model, pruning_schedule=pruning_schedule
-        )
-        model.compile(
-            optimizer=optimizer,
-            loss="sparse_categorical_crossentropy",
-            metrics=["accuracy"],
-        )
+    # Sample system resources and write the log in background threads so that scoring
+    # and logging never block training on a measurement or on disk I/O
+    sampler = ResourceSampler(interval=sample_interval)
+    log_sink = AsyncLogSink(open_log_sink(log_file))
+    with sampler, log_sink:
+        # Prepare a streaming input pipeline of unbatched samples; batch size changes
+        # only rebatch this stream
+        train_elements = load_dataset(train_dataset)
+        input_shape = tuple(train_elements.element_spec[0].shape)
 
-    # Training model one epoch at a time
-    for epoch in range(epochs):
-        print(f"Epoch {epoch + 1}/{epochs}")
+        if checkpoint is not None:
+            batch_size = checkpoint["controller"]["batch_size"]
+        elif batch_size == "auto":
+            batch_size = _find_start_batch_size(
+                train_dataset, train_elements, input_shape, lr, batch_buckets
+            )
+            if coordinator is not None:
+                # Probes differ between workers; all of them use the chief's result
+                batch_size = int(coordinator.broadcast([batch_size])[0])
 
-        # Add pruning update callback
-        callbacks = [tfmot.sparsity.keras.UpdatePruningStep()]
+        # Limit batch sizes to buckets so each one is compiled only once
+        if batch_buckets:
+            batch_size = snap_batch_size(batch_size, batch_buckets)
+        train_function_cache = TrainFunctionCache()
 
-        history = model.fit(
-            train_images,
-            train_labels,
+        controller = EdgeTrainController(
             batch_size=batch_size,
-            epochs=1,
-            callbacks=callbacks,
+            lr=lr,
+            pruning=pruning,
+            log_file=log_sink,
+            sampler=sampler,
+            every_n_steps=adjust_every_n_steps,
+            every_seconds=adjust_every_seconds,
+            dynamic_adjustments=dynamic_adjustments,
+            user_priorities=user_priorities,
+            thresholds=thresholds,
+            batch_size_controller=batch_size_controller,
+            batch_buckets=batch_buckets,
+            train_function_cache=train_function_cache,
+            effective_batch_size=batch_size if gradient_accumulation else None,
+            precision=precision,
+            mixed_precision=mixed_precision,
+            coordinator=coordinator,
+            memory_budget=memory_budget,
         )
 
-        # Save training history
-        history_list.append(history.history)
+        if checkpoint is not None:
+            controller.set_state(checkpoint["controller"])
+            log_start = checkpoint["log_records"] - controller.log_count
+        else:
+            # Log initial resource usage
+            log_start = count_log_records(log_file)
+            controller.log_usage(num_epoch=0)
 
-        # Update "current" accuracy
-        curr_accuracy = history.history["accuracy"][-1]
+        # Initialize training variables
+        history_list = list(checkpoint["history"]) if checkpoint is not None else []
 
-        # If dynamic adjustments are enabled
-        if dynamic_adjustments:
-            # Compute scores & priorities
-            normalized_scores = compute_scores(prev_accuracy, curr_accuracy)
-            priority_value = define_priorities(normalized_scores)
+        # Create model within scope and apply initial pruning
+        model_precision = controller.precision
+        if checkpoint is not None:
+            model_precision = checkpoint["model"]["precision"]
+        with strategy.scope():
+            model = _build_model(input_shape, controller.lr, pruning, model_precision)
+            if checkpoint is not None:
+                set_training_state(model, checkpoint["model"])
 
-            # Adjust highest priority parameter
-            adjusted_batch_size, adjusted_lr = adjust_training_parameters(
-                priority_values=priority_value,
-                batch_size=batch_size,
-                lr=lr,
-                accuracy_score=curr_accuracy,
+        # Micro-batches only accumulate gradients; the accumulator updates the model
+        gradient_accumulator = None
+        if gradient_accumulation:
+            gradient_accumulator = GradientAccumulator(controller.accumulation_steps)
+            gradient_accumulator.attach(model)
+
+        # Pruning update and adjustment callbacks run inside a single fit call
+        callbacks = [
+            train_function_cache,
+            tfmot.sparsity.keras.UpdatePruningStep(),
+            controller,
+        ]
+        if gradient_accumulator is not None:
+            # Updates are part of the step the controller times
+            callbacks.insert(-1, gradient_accumulator)
+        step_profiler = None
+        if step_timing or profile_steps is not None:
+            step_profiler = StepProfiler(
+                output_file=step_timing_file(log_file) if step_timing else None,
+                profile_steps=profile_steps,
+                profile_dir=f"{os.path.splitext(log_file)[0]}_profile",
+            )
+            step_profiler.attach(model)
+        training_checkpoint = None
+        if checkpoint_path and (coordinator is None or coordinator.is_chief):
+            # Saves the state after the controller's end of epoch decision
+            training_checkpoint = TrainingCheckpoint(
+                checkpoint_path,
+                controller,
+                every_n_epochs=checkpoint_every,
+                log_sink=log_sink,
+                log_start=log_start,
+                history=history_list,
             )
+            callbacks.append(training_checkpoint)
+        if step_profiler is not None:
+            # Times the work of every other callback
+            callbacks = [step_profiler] + callbacks + [step_profiler.end_callback]
 
-            batch_size = adjusted_batch_size
-            lr = adjusted_lr
+        # The controller stops fit at the end of an epoch when the batch size changes;
+        # training then resumes from the next epoch with the new batch size
+        epoch = checkpoint["epoch"] if checkpoint is not None else 0
+        while epoch < epochs:
+            if controller.precision != model_precision:
+                # The dtype policy is fixed when layers are built: rebuild the model
+                print(f"Switching precision to {controller.precision}.")
+                with strategy.scope():
+                    new_model = _build_model(
+                        input_shape, controller.lr, pruning, controller.precision
+                    )
+                    set_training_state(new_model, get_training_state(model))
+                model, model_precision = new_model, controller.precision
+                train_function_cache.clear()
+                if gradient_accumulator is not None:
+                    gradient_accumulator.attach(model)
+                if step_profiler is not None:
+                    step_profiler.attach(model)
 
-            print(
-                f"Adjusted parameters for next epoch: batch_size={batch_size}, pruning_ratio={pruning}, learning_rate={lr}"
+            train_batches = build_pipeline(
+                train_elements,
+                controller.batch_size,
+                shuffle_buffer=shuffle_buffer,
+                cache=cache,
+                drop_remainder=bool(batch_buckets),
+            )
+            train_function_cache.activate(model, controller.batch_size)
+            if gradient_accumulator is not None:
+                gradient_accumulator.steps = controller.accumulation_steps
+            history = model.fit(
+                train_batches,
+                epochs=epochs,
+                initial_epoch=epoch,
+                callbacks=callbacks,
             )
 
-        # Log resource usage
-        log_usage_once(
-            log_file,
-            pruning,
-            batch_size,
-            lr,
-            normalized_scores,
-            priority_value,
-            num_epoch=epoch + 1,
-            resources=None,
-        )
+            # Save training history, one entry per epoch
+            for i in range(len(history.epoch)):
+                history_list.append(
+                    {key: [values[i]] for key, values in history.history.items()}
+                )
+            epoch += len(history.epoch)
 
-        # Update previous accuracy
-        prev_accuracy = curr_accuracy
+        if step_profiler is not None:
+            step_profiler.close()
 
     # Strip pruning for final model deployment
     final_model = tfmot.sparsity.keras.strip_pruning(model)
     print("Pruning stripped. Model ready for deployment.")
 
     return final_model, history_list
+
+
+def _train_worker(strategy, train_dataset, model_path, kwargs):
+    # Entry point of each worker process of `dynamic_train_multi_worker`
+    final_model, history_list = dynamic_train(
+        train_dataset, strategy=strategy, **kwargs
+    )
+    if model_path and WorkerCoordinator(strategy).is_chief:
+        final_model.save(model_path)
+    return history_list
+
+
+def dynamic_train_multi_worker(
+    train_dataset, num_workers=2, model_path=None, timeout=None, **kwargs
+):
+    """
+    Train with `dynamic_train` in several local processes joined by
+    `MultiWorkerMirroredStrategy`.
+
+    Each worker trains one replica on its own share of the CPU cores (see
+    `launch_local_workers`); batch sizes are global, i.e. split between the workers.
+    Resource snapshots are combined over all workers and the chief's decisions are applied
+    on every worker. Decisions run per epoch or every `adjust_every_n_steps` steps;
+    `adjust_every_seconds` is not supported.
+
+    Parameters:
+    - train_dataset (dict or str): The training data, as in `dynamic_train`. Data are sent
+      to every worker, so pass a path for large datasets.
+    - num_workers (int): Number of worker processes.
+    - model_path (str, optional): Path the chief saves the trained, stripped model to.
+    - timeout (float, optional): Maximum number of seconds to wait for the workers.
+    - **kwargs: Other `dynamic_train` arguments.
+
+    Returns:
+    - history_list (list): The chief's training history, one entry per epoch.
+    """
+    histories = launch_local_workers(
+        _train_worker,
+        num_workers=num_workers,
+        args=(train_dataset, model_path, kwargs),
+        timeout=timeout,
+    )
+    return histories[0]
@@ -0,0 +1,155 @@
+import atexit
+import threading
+
+_MIB = 1024**2
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+class CpuOnlyBackend:
+    """
+    GPU metrics backend used when no NVIDIA GPU (or no NVML driver) is available.
+    """
+
+    num_gpus = 0
+
+    def read(self):
+        """
+        Read GPU metrics.
+
+        Returns:
+        - dict: GPU metrics, all zero.
+        """
+        return {
+            "num_gpus": 0,
+            "gpu_compute_percent": 0,
+            "gpu_memory_usage": 0,
+            "gpu_memory_total": 0,
+            "gpu_memory_percent": 0,
+        }
+
+    def close(self):
+        pass
+
+
+class NvmlBackend:
+    """
+    GPU metrics backend reading memory and utilization directly through NVML.
+
+    NVML is initialized once and device handles are cached for the lifetime of the
+    backend, so a read costs a handful of driver calls instead of a process spawn.
+
+    Parameters:
+    - nvml (module): The `pynvml` module, or any object exposing the same functions.
+    """
+
+    def __init__(self, nvml):
+        self._nvml = nvml
+        self._closed = False
+        nvml.nvmlInit()
+        try:
+            self._handles = [
+                nvml.nvmlDeviceGetHandleByIndex(i)
+                for i in range(nvml.nvmlDeviceGetCount())
+            ]
+        except Exception:
+            nvml.nvmlShutdown()
+            raise
+
+    @property
+    def num_gpus(self):
+        return len(self._handles)
+
+    def read(self):
+        """
+        Read GPU metrics from all cached devices.
+
+        Returns:
+        - dict: A dictionary containing the following keys:
+            - num_gpus (int): Number of GPUs available.
+            - gpu_compute_percent (float): Average GPU compute utilization as a percentage.
+            - gpu_memory_usage (float): Total GPU memory used across all GPUs (in MB).
+            - gpu_memory_total (float): Total available GPU memory across all GPUs (in MB).
+            - gpu_memory_percent (float): Average GPU memory utilization as a fraction.
+        """
+        num_gpus = self.num_gpus
+        if num_gpus == 0:
+            return CpuOnlyBackend().read()
+
+        memory = [self._nvml.nvmlDeviceGetMemoryInfo(h) for h in self._handles]
+        compute = [
+            self._nvml.nvmlDeviceGetUtilizationRates(h).gpu for h in self._handles
+        ]
+
+        return {
+            "num_gpus": num_gpus,
+            "gpu_compute_percent": sum(compute) / num_gpus,
+            "gpu_memory_usage": sum(m.used for m in memory) / _MIB,
+            "gpu_memory_total": sum(m.total for m in memory) / _MIB,
+            "gpu_memory_percent": sum(m.used / m.total for m in memory) / num_gpus,
+        }
+
+    def close(self):
+        """
+        Shut down NVML. Safe to call more than once.
+        """
+        if not self._closed:
+            self._closed = True
+            self._handles = []
+            self._nvml.nvmlShutdown()
+
+
+def get_gpu_backend(nvml=None):
+    """
+    Return the process-wide GPU metrics backend, creating it on first use.
+
+    Parameters:
+    - nvml (module, optional): Module to use instead of `pynvml` (e.g. a fake for testing).
+      Only used when the backend is created.
+
+    Returns:
+    - NvmlBackend or CpuOnlyBackend: NVML backend if at least one GPU is found,
+      otherwise the CPU-only backend.
+    """
+    global _backend
+
+    with _backend_lock:
+        if _backend is None:
+            _backend = _create_backend(nvml)
+        return _backend
+
+
+def shutdown_gpu_backend():
+    """
+    Close the process-wide GPU metrics backend. The next `get_gpu_backend` call creates a new one.
+    """
+    global _backend
+
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+            _backend = None
+
+
+def _create_backend(nvml):
+    if nvml is None:
+        try:
+            import pynvml as nvml
+        except ImportError:
+            return CpuOnlyBackend()
+
+    try:
+        backend = NvmlBackend(nvml)
+    except Exception:
+        # No driver, no device or a broken installation: report no GPUs
+        return CpuOnlyBackend()
+
+    if backend.num_gpus == 0:
+        backend.close()
+        return CpuOnlyBackend()
+    return backend
+
+
+# Release the NVML session when the interpreter exits
+atexit.register(shutdown_gpu_backend)
@@ -0,0 +1,121 @@
+import math
+import types
+
+import tensorflow as tf
+from tensorflow import keras
+
+
+def accumulation_steps_for(batch_size, effective_batch_size):
+    """
+    Number of micro-batches whose gradients add up to an effective batch.
+
+    Parameters:
+    - batch_size (int): Micro-batch size.
+    - effective_batch_size (int): Number of samples per optimizer update.
+
+    Returns:
+    - int: The number of accumulation steps (at least 1).
+    """
+    return max(1, math.ceil(effective_batch_size / batch_size))
+
+
+class GradientAccumulator(keras.callbacks.Callback):
+    """
+    Accumulate gradients over several micro-batches before each optimizer update.
+
+    Call `attach(model)` once after compiling the model: its train step then only adds the
+    gradients of each micro-batch to per-replica accumulators, and the callback applies
+    their mean every `steps` training steps. Pending gradients are applied at the end of
+    every epoch, so an update never spans two `fit` calls.
+
+    Changing `steps` does not retrace the train function; it takes effect on the next
+    update.
+
+    Parameters:
+    - steps (int): Number of micro-batches per optimizer update.
+
+    Attributes:
+    - update_count (int): Number of optimizer updates applied.
+    """
+
+    def __init__(self, steps=1):
+        super().__init__()
+        self.steps = steps
+        self.update_count = 0
+        self._pending_steps = 0
+        self._accumulators = None
+        self._apply_function = None
+        self._model = None
+
+    def attach(self, model):
+        """
+        Replace the train step of a compiled model by one that accumulates gradients.
+
+        Parameters:
+        - model (tf.keras.Model): The compiled model.
+        """
+        self._model = model
+        strategy = model.distribute_strategy
+        with strategy.scope():
+            # Each replica accumulates its own gradients; they are reduced on update
+            self._accumulators = [
+                tf.Variable(
+                    tf.zeros_like(variable),
+                    trainable=False,
+                    synchronization=tf.VariableSynchronization.ON_READ,
+                    aggregation=tf.VariableAggregation.SUM,
+                )
+                for variable in model.trainable_variables
+            ]
+
+        accumulators = self._accumulators
+
+        def train_step(self, data):
+            x, y, sample_weight = keras.utils.unpack_x_y_sample_weight(data)
+            # Loss scale optimizers (float16) need scaled losses and unscaled gradients
+            loss_scaling = hasattr(self.optimizer, "get_scaled_loss")
+            with tf.GradientTape() as tape:
+                y_pred = self(x, training=True)
+                loss = self.compute_loss(x, y, y_pred, sample_weight)
+                if loss_scaling:
+                    loss = self.optimizer.get_scaled_loss(loss)
+            gradients = tape.gradient(loss, self.trainable_variables)
+            if loss_scaling:
+                gradients = self.optimizer.get_unscaled_gradients(gradients)
+            for accumulator, gradient in zip(accumulators, gradients):
+                if gradient is not None:
+                    accumulator.assign_add(gradient)
+            return self.compute_metrics(x, y, y_pred, sample_weight)
+
+        def apply_step(count):
+            gradients = [accumulator / count for accumulator in accumulators]
+            model.optimizer.apply_gradients(zip(gradients, model.trainable_variables))
+            for accumulator in accumulators:
+                accumulator.assign(tf.zeros_like(accumulator))
+
+        @tf.function
+        def apply_function(count):
+            strategy.run(apply_step, args=(count,))
+
+        model.train_step = types.MethodType(train_step, model)
+        model.train_function = None
+        self._apply_function = apply_function
+        self._pending_steps = 0
+
+    def apply(self):
+        """
+        Apply the mean of the pending gradients, if any, and reset the accumulators.
+        """
+        if not self._pending_steps:
+            return
+        self._apply_function(tf.constant(self._pending_steps, dtype=tf.float32))
+        self._pending_steps = 0
+        self.update_count += 1
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._pending_steps += 1
+        if self._pending_steps >= self.steps:
+            self.apply()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.apply()
@@ -0,0 +1,71 @@
+import tensorflow as tf
+from tensorflow import keras
+
+
+def _unwrap_optimizer(optimizer):
+    # Loss scale optimizers keep the hyperparameters and slots on the wrapped optimizer
+    return getattr(optimizer, "inner_optimizer", optimizer)
+
+
+def _hyperparameter_variable(optimizer, name):
+    variable = getattr(optimizer, f"_{name}", None)
+    if not isinstance(variable, tf.Variable):
+        variable = getattr(optimizer, name, None)
+    if not isinstance(variable, tf.Variable):
+        raise ValueError(
+            f"Optimizer hyperparameter '{name}' is not stored in a variable and cannot "
+            "be changed without retracing the train function."
+        )
+    return variable
+
+
+def set_optimizer_hyperparameters(optimizer, **hyperparameters):
+    """
+    Push new hyperparameter values into a compiled optimizer in place.
+
+    Values are assigned to the optimizer's existing variables, so the traced train function
+    picks them up on the next step without rebuilding the model or retracing.
+
+    Parameters:
+    - optimizer (tf.keras.optimizers.Optimizer): The optimizer of the compiled model.
+    - **hyperparameters: Hyperparameter values keyed by name (e.g. learning_rate=1e-4).
+
+    Raises:
+    - ValueError: If a hyperparameter is not backed by a variable (e.g. a learning rate
+      schedule, or `beta_1` on non-legacy optimizers).
+    """
+    optimizer = _unwrap_optimizer(optimizer)
+
+    for name, value in hyperparameters.items():
+        # Legacy optimizers keep their hyperparameters in `_hyper`
+        legacy_hyper = getattr(optimizer, "_hyper", None)
+        if legacy_hyper is not None and name in legacy_hyper:
+            optimizer._set_hyper(name, value)
+            continue
+
+        variable = _hyperparameter_variable(optimizer, name)
+        variable.assign(tf.cast(value, variable.dtype))
+
+
+def get_optimizer_hyperparameters(optimizer, *names):
+    """
+    Read the current value of optimizer hyperparameters.
+
+    Parameters:
+    - optimizer (tf.keras.optimizers.Optimizer): The optimizer to read from.
+    - *names (str): Hyperparameter names (e.g. "learning_rate").
+
+    Returns:
+    - dict: Hyperparameter values as Python floats, keyed by name.
+    """
+    optimizer = _unwrap_optimizer(optimizer)
+
+    values = {}
+    for name in names:
+        legacy_hyper = getattr(optimizer, "_hyper", None)
+        if legacy_hyper is not None and name in legacy_hyper:
+            value = optimizer._get_hyper(name)
+        else:
+            value = _hyperparameter_variable(optimizer, name)
+        values[name] = float(keras.backend.get_value(value))
+    return values
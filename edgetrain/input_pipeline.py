@@ -0,0 +1,145 @@
+import os
+import types
+
+import numpy as np
+import tensorflow as tf
+
+AUTOTUNE = tf.data.AUTOTUNE
+
+
+def _array_chunks(images, labels, chunk_size):
+    # Yield slices of (possibly memory-mapped) arrays so only one chunk is resident at a time
+    for start in range(0, len(images), chunk_size):
+        stop = start + chunk_size
+        yield images[start:stop], labels[start:stop]
+
+
+def _from_arrays(images, labels, chunk_size):
+    if len(images) != len(labels):
+        raise ValueError("Images and labels must have the same number of samples.")
+
+    signature = (
+        tf.TensorSpec(shape=(None,) + images.shape[1:], dtype=images.dtype),
+        tf.TensorSpec(shape=(None,) + labels.shape[1:], dtype=labels.dtype),
+    )
+    dataset = tf.data.Dataset.from_generator(
+        lambda: _array_chunks(images, labels, chunk_size),
+        output_signature=signature,
+    ).unbatch()
+    return dataset.apply(tf.data.experimental.assert_cardinality(len(images)))
+
+
+def _from_path(path, chunk_size):
+    if os.path.isdir(path):
+        # Memory-map the arrays: samples are read from disk as the pipeline consumes them
+        images = np.load(os.path.join(path, "images.npy"), mmap_mode="r")
+        labels = np.load(os.path.join(path, "labels.npy"), mmap_mode="r")
+        return _from_arrays(images, labels, chunk_size)
+
+    if path.endswith(".npz"):
+        with np.load(path) as data:
+            return _from_arrays(data["images"], data["labels"], chunk_size)
+
+    raise ValueError(
+        f"Unsupported dataset path '{path}': expected a directory containing "
+        "'images.npy' and 'labels.npy', or an '.npz' file."
+    )
+
+
+def _from_generator(generator_fn, first=None):
+    # Infer the output signature from the first element
+    if first is None:
+        first = next(iter(generator_fn()))
+    first_image, first_label = first
+    signature = (
+        tf.TensorSpec(shape=np.shape(first_image), dtype=np.asarray(first_image).dtype),
+        tf.TensorSpec(shape=np.shape(first_label), dtype=np.asarray(first_label).dtype),
+    )
+    return tf.data.Dataset.from_generator(generator_fn, output_signature=signature)
+
+
+def load_dataset(source, chunk_size=1024):
+    """
+    Create a dataset of unbatched (image, label) elements from a training data source.
+
+    Parameters:
+    - source: One of
+        - dict: In-memory arrays under 'images' and 'labels'.
+        - tf.data.Dataset: A dataset of unbatched (image, label) elements, used as is.
+        - callable: A function returning a fresh iterator of (image, label) pairs for every epoch.
+        - generator: A one-shot iterator of (image, label) pairs. It can only be read once,
+          so its elements are cached in memory during the first epoch.
+        - str: A directory containing 'images.npy' and 'labels.npy' (memory-mapped), or an '.npz' file.
+    - chunk_size (int): Number of samples read at once from arrays.
+
+    Returns:
+    - dataset (tf.data.Dataset): A dataset of unbatched (image, label) elements.
+    """
+
+    if isinstance(source, tf.data.Dataset):
+        return source
+    if isinstance(source, dict):
+        return _from_arrays(
+            np.asarray(source["images"]), np.asarray(source["labels"]), chunk_size
+        )
+    if isinstance(source, (str, os.PathLike)):
+        return _from_path(os.fspath(source), chunk_size)
+    if isinstance(source, types.GeneratorType):
+        # Replay the first element that was consumed to infer the signature
+        first = next(source)
+
+        def replay():
+            yield first
+            yield from source
+
+        iterator = replay()
+        return _from_generator(lambda: iterator, first=first).cache()
+    if callable(source):
+        return _from_generator(source)
+
+    raise TypeError(f"Unsupported training data source: {type(source).__name__}.")
+
+
+def _cast_images(images, labels):
+    return tf.cast(images, tf.float32), labels
+
+
+def build_pipeline(
+    dataset,
+    batch_size,
+    shuffle_buffer=1024,
+    cache=False,
+    map_fn=_cast_images,
+    drop_remainder=False,
+):
+    """
+    Build an optimized, batched input pipeline from a dataset of unbatched elements.
+
+    Changing the batch size only requires calling this function again on the same
+    unbatched dataset: the stream is rebatched and no arrays are re-materialized.
+
+    Parameters:
+    - dataset (tf.data.Dataset): A dataset of unbatched (image, label) elements.
+    - batch_size (int): Batch size.
+    - shuffle_buffer (int, optional): Size of the shuffle buffer. None or 0 disables shuffling.
+    - cache (bool or str): Cache elements after the first epoch, in memory if True or in
+      the given file if a path.
+    - map_fn (callable, optional): Function applied in parallel to each batch. By default,
+      images are cast to float32 so that they can be stored in a smaller dtype.
+    - drop_remainder (bool): Drop the last incomplete batch so that all batches have a
+      static shape.
+
+    Returns:
+    - dataset (tf.data.Dataset): The batched and prefetched dataset.
+    """
+
+    if cache:
+        dataset = dataset.cache(cache if isinstance(cache, str) else "")
+    if shuffle_buffer:
+        dataset = dataset.shuffle(shuffle_buffer)
+    dataset = dataset.batch(
+        batch_size, drop_remainder=drop_remainder, num_parallel_calls=AUTOTUNE
+    )
+    if map_fn is not None:
+        dataset = dataset.map(map_fn, num_parallel_calls=AUTOTUNE)
+    return dataset.prefetch(AUTOTUNE)
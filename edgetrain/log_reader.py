@@ -0,0 +1,273 @@
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+from edgetrain.log_sinks import read_npy_log
+
+_TAIL_BLOCK_SIZE = 64 * 1024
+_NPY_HEADER_READERS = {
+    (1, 0): np.lib.format.read_array_header_1_0,
+    (2, 0): np.lib.format.read_array_header_2_0,
+}
+
+
+def _is_npy_log(log_file):
+    return str(log_file).endswith(".npy")
+
+
+def load_log(log_file, columns=None):
+    """
+    Load a resource log written as CSV or as a binary `.npy` log.
+
+    Parameters:
+    - log_file (str): The path to the log file.
+    - columns (list of str, optional): Only load these columns.
+
+    Returns:
+    - df (pd.DataFrame): The log, one row per entry.
+    """
+    if _is_npy_log(log_file):
+        df = pd.DataFrame(read_npy_log(log_file))
+        return df[columns] if columns is not None else df
+    return pd.read_csv(log_file, usecols=columns)
+
+
+def _npy_chunk_headers(f):
+    # Yield (data offset, shape, dtype) of every array appended to the file,
+    # seeking over the array data instead of reading it
+    size = os.fstat(f.fileno()).st_size
+    while f.tell() < size:
+        try:
+            version = np.lib.format.read_magic(f)
+            shape, _, dtype = _NPY_HEADER_READERS[version](f)
+        except (ValueError, EOFError):
+            # Incomplete header: the writer is still appending it
+            return
+        offset = f.tell()
+        nbytes = int(np.prod(shape)) * dtype.itemsize
+        if offset + nbytes > size:
+            # Incomplete array: the writer is still appending it
+            return
+        yield offset, shape, dtype
+        f.seek(offset + nbytes)
+
+
+def _read_npy_chunk(f, offset, shape, dtype):
+    f.seek(offset)
+    count = int(np.prod(shape))
+    return np.frombuffer(f.read(count * dtype.itemsize), dtype=dtype, count=count)
+
+
+def iter_log_chunks(log_file, chunksize=100_000, columns=None):
+    """
+    Iterate over a resource log in chunks without loading the whole file.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+    - chunksize (int): Maximum number of rows per chunk.
+    - columns (list of str, optional): Only load these columns.
+
+    Yields:
+    - df (pd.DataFrame): Consecutive chunks of the log.
+    """
+    if not _is_npy_log(log_file):
+        with pd.read_csv(log_file, usecols=columns, chunksize=chunksize) as reader:
+            yield from reader
+        return
+
+    with open(log_file, "rb") as f:
+        for offset, shape, dtype in list(_npy_chunk_headers(f)):
+            array = _read_npy_chunk(f, offset, shape, dtype)
+            for start in range(0, len(array), chunksize):
+                stop = start + chunksize
+                df = pd.DataFrame(array[start:stop])
+                yield df[columns] if columns is not None else df
+
+
+def _csv_tail_lines(f, n, data_start):
+    # Read blocks backwards from the end until n complete lines are found,
+    # without going back past the header
+    f.seek(0, os.SEEK_END)
+    position = f.tell()
+    data = b""
+    while position > data_start and data.count(b"\n") <= n:
+        read_size = min(_TAIL_BLOCK_SIZE, position - data_start)
+        position -= read_size
+        f.seek(position)
+        data = f.read(read_size) + data
+    return data.rstrip(b"\n").split(b"\n")[-n:]
+
+
+def read_log_head_tail(log_file, n=1):
+    """
+    Read only the first and last records of a resource log.
+
+    The cost does not depend on the length of the log: CSV logs are read from both ends,
+    and for binary logs only the array headers are visited.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+    - n (int): Number of records to read at each end.
+
+    Returns:
+    - head (pd.DataFrame): The first `n` records.
+    - tail (pd.DataFrame): The last `n` records.
+    """
+    if _is_npy_log(log_file):
+        with open(log_file, "rb") as f:
+            headers = list(_npy_chunk_headers(f))
+            if not headers:
+                empty = pd.DataFrame(read_npy_log(log_file)[:0])
+                return empty, empty
+
+            head = _read_npy_chunk(f, *headers[0])[:n]
+
+            tail_chunks = []
+            rows = 0
+            for header in reversed(headers):
+                tail_chunks.insert(0, _read_npy_chunk(f, *header))
+                rows += header[1][0]
+                if rows >= n:
+                    break
+            tail = np.concatenate(tail_chunks)[-n:]
+        return pd.DataFrame(head), pd.DataFrame(tail)
+
+    with open(log_file, "rb") as f:
+        header_line = f.readline()
+        data_start = f.tell()
+        head_lines = [f.readline() for _ in range(n)]
+        tail_lines = _csv_tail_lines(f, n, data_start)
+
+    head_lines = [line for line in head_lines if line.strip()]
+    tail_lines = [line for line in tail_lines if line.strip()]
+
+    def parse(lines):
+        text = header_line + b"".join(line.rstrip(b"\n") + b"\n" for line in lines)
+        return pd.read_csv(io.BytesIO(text))
+
+    return parse(head_lines), parse(tail_lines)
+
+
+class LogTailer:
+    """
+    Incrementally read a resource log that is still being written.
+
+    Each `read_new` call only reads the bytes appended since the previous call.
+    Incomplete trailing records are left for the next call.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+    """
+
+    def __init__(self, log_file):
+        self.log_file = log_file
+        self.offset = 0
+        self._header = None
+
+    def read_new(self):
+        """
+        Read the records appended since the previous call.
+
+        Returns:
+        - df (pd.DataFrame): The new records (empty if there are none).
+        """
+        if not os.path.exists(self.log_file):
+            return pd.DataFrame()
+        if _is_npy_log(self.log_file):
+            return self._read_new_npy()
+        return self._read_new_csv()
+
+    def _read_new_npy(self):
+        with open(self.log_file, "rb") as f:
+            f.seek(self.offset)
+            chunks = []
+            for offset, shape, dtype in list(_npy_chunk_headers(f)):
+                chunks.append(_read_npy_chunk(f, offset, shape, dtype))
+                self.offset = offset + int(np.prod(shape)) * dtype.itemsize
+        if not chunks:
+            return pd.DataFrame()
+        return pd.DataFrame(np.concatenate(chunks))
+
+    def _read_new_csv(self):
+        with open(self.log_file, "rb") as f:
+            f.seek(self.offset)
+            data = f.read()
+
+        # Only consume complete lines
+        end = data.rfind(b"\n") + 1
+        data = data[:end]
+        self.offset += end
+
+        if self._header is None:
+            if not data:
+                return pd.DataFrame()
+            self._header, _, data = data.partition(b"\n")
+            self._header += b"\n"
+        if not data:
+            return pd.read_csv(io.BytesIO(self._header))
+        return pd.read_csv(io.BytesIO(self._header + data))
+
+
+def count_log_records(log_file):
+    """
+    Count the complete records of a resource log without parsing them.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+
+    Returns:
+    - int: The number of records (0 if the file does not exist).
+    """
+    if not os.path.exists(log_file):
+        return 0
+    with open(log_file, "rb") as f:
+        if _is_npy_log(log_file):
+            return sum(int(shape[0]) for _, shape, _ in _npy_chunk_headers(f))
+        # Complete lines, without the header
+        lines = sum(block.count(b"\n") for block in iter(lambda: f.read(1 << 20), b""))
+    return max(0, lines - 1)
+
+
+def truncate_log(log_file, num_records):
+    """
+    Keep only the first records of a resource log, e.g. to resume a run from a checkpoint.
+
+    The file is rewritten next to the original and then replaced, so a crash while
+    truncating keeps the original log. Incomplete trailing records are dropped.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+    - num_records (int): Number of records to keep.
+
+    Returns:
+    - int: The number of records kept.
+    """
+    if not os.path.exists(log_file):
+        return 0
+
+    temporary_file = f"{log_file}.tmp"
+    kept = 0
+    if _is_npy_log(log_file):
+        with open(log_file, "rb") as f:
+            chunks = []
+            for offset, shape, dtype in list(_npy_chunk_headers(f)):
+                if kept >= num_records:
+                    break
+                chunk = _read_npy_chunk(f, offset, shape, dtype)[: num_records - kept]
+                chunks.append(chunk)
+                kept += len(chunk)
+        with open(temporary_file, "wb") as out:
+            for chunk in chunks:
+                np.save(out, chunk)
+    else:
+        with open(log_file, "rb") as f, open(temporary_file, "wb") as out:
+            out.write(f.readline())
+            for line in f:
+                if kept >= num_records or not line.endswith(b"\n"):
+                    break
+                out.write(line)
+                kept += 1
+    os.replace(temporary_file, log_file)
+    return kept
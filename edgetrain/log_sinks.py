@@ -0,0 +1,410 @@
+import atexit
+import csv
+import os
+import queue
+import signal
+import threading
+import time
+import weakref
+
+import numpy as np
+
+# Resource log columns and their types in binary logs
+LOG_SCHEMA = [
+    ("Timestamp", "datetime64[us]"),
+    ("Epoch #", "int64"),
+    ("CPU Usage (%)", "float64"),
+    ("CPU RAM (%)", "float64"),
+    ("GPU RAM (%)", "float64"),
+    ("GPU Usage (%)", "float64"),
+    ("Mem Score", "float64"),
+    ("Acc Score", "float64"),
+    ("Priority Batch Size", "float64"),
+    ("Priority Learning Rate", "float64"),
+    ("Pruning", "float64"),
+    ("Batch Size", "int64"),
+    ("Learning Rate", "float64"),
+    ("Retraces", "int64"),
+    ("Compile Time (s)", "float64"),
+    ("Accuracy", "float64"),
+    ("Throughput Score", "float64"),
+    ("Step Time (s)", "float64"),
+    ("Samples/s", "float64"),
+    ("Time to Accuracy (s)", "float64"),
+    ("Time to Accuracy Score", "float64"),
+    ("Accuracy Gain/s", "float64"),
+    ("Accumulation Steps", "int64"),
+    ("Precision", "U16"),
+    ("Process RSS (MiB)", "float64"),
+    ("Process USS (MiB)", "float64"),
+    ("TF Memory (MiB)", "float64"),
+]
+LOG_COLUMNS = [name for name, _ in LOG_SCHEMA]
+LOG_DTYPE = np.dtype(LOG_SCHEMA)
+
+
+class CsvLogSink:
+    """
+    Write resource log records as rows of a CSV file.
+
+    The file is opened once and every record is flushed immediately, so the log is
+    readable while training runs. The header is written if the file is new or empty.
+
+    Parameters:
+    - path (str): Path to the CSV log file.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        write_header = not os.path.exists(path) or os.path.getsize(path) == 0
+        self._file = open(path, "a", newline="")
+        self._writer = csv.writer(self._file)
+        if write_header:
+            self._writer.writerow(LOG_COLUMNS)
+            self._file.flush()
+
+    def write(self, record):
+        """
+        Append one record.
+
+        Parameters:
+        - record (dict): Values keyed by column name (see `LOG_COLUMNS`).
+        """
+        row = [record.get(column) for column in LOG_COLUMNS]
+        row[0] = row[0].strftime("%Y-%m-%d %H:%M:%S")
+        self._writer.writerow(row)
+        self._file.flush()
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class NpyLogSink:
+    """
+    Buffer resource log records in memory and append them to a binary `.npy` log.
+
+    Records are flushed as one typed structured array (see `LOG_SCHEMA`) once `buffer_size`
+    records are buffered or `flush_interval` seconds have passed since the last flush.
+    Each flush appends one array to the file; `read_npy_log` concatenates them.
+
+    The log is row-structured: each chunk stores whole records, not one array per
+    column, so appending stays a single write. Reading a few columns still loads every
+    field of a chunk, then selects the requested ones.
+
+    The interval is checked when a record is written, or by `flush_if_due`, which
+    `AsyncLogSink` calls while its queue is idle so buffered records reach the file
+    without waiting for the next write.
+
+    Parameters:
+    - path (str): Path to the binary log file.
+    - buffer_size (int): Maximum number of buffered records.
+    - flush_interval (float): Maximum number of seconds between two flushes.
+    """
+
+    def __init__(self, path, buffer_size=256, flush_interval=10.0):
+        self.path = path
+        self.buffer_size = buffer_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def write(self, record):
+        """
+        Buffer one record, flushing if the buffer is full or the flush interval elapsed.
+
+        Parameters:
+        - record (dict): Values keyed by column name (see `LOG_COLUMNS`).
+        """
+        self._buffer.append(tuple(_typed(record, name, t) for name, t in LOG_SCHEMA))
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def flush_if_due(self):
+        """
+        Flush the buffered records if the flush interval elapsed since the last flush.
+        """
+        if time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """
+        Append all buffered records to the file.
+        """
+        if self._buffer:
+            with open(self.path, "ab") as f:
+                np.save(f, np.array(self._buffer, dtype=LOG_DTYPE))
+            self._buffer = []
+        self._last_flush = time.monotonic()
+
+    def close(self):
+        self.flush()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+_STOP = object()
+_FLUSH = object()
+_open_async_sinks = weakref.WeakSet()
+_sigterm_lock = threading.Lock()
+_sigterm_handler_installed = False
+
+
+class AsyncLogSink:
+    """
+    Write log records to another sink from a background thread.
+
+    `write` only enqueues the record; a daemon thread drains the queue in batches. The
+    queue is bounded: when it is full, records are dropped (and counted) unless `block`
+    is True, in which case the caller waits up to `timeout` seconds before dropping.
+    Pending records are flushed on `close`, at interpreter exit and on SIGTERM. While the
+    queue is idle, the thread checks every `idle_interval` seconds whether a buffering
+    sink is due for a flush (see `NpyLogSink.flush_if_due`). If the underlying sink
+    fails, later records are dropped and the error is re-raised by `write`, `flush` and
+    `close`.
+
+    Parameters:
+    - sink (CsvLogSink or NpyLogSink): The sink records are written to.
+    - max_queue_size (int): Maximum number of pending records.
+    - block (bool): Block the caller instead of dropping records when the queue is full.
+    - timeout (float, optional): Maximum number of seconds to block. None waits forever.
+    - batch_size (int): Maximum number of records written per batch.
+    - idle_interval (float): Seconds between two flush checks while the queue is idle.
+    """
+
+    def __init__(
+        self,
+        sink,
+        max_queue_size=1024,
+        block=False,
+        timeout=None,
+        batch_size=64,
+        idle_interval=1.0,
+    ):
+        self.sink = sink
+        self.block = block
+        self.timeout = timeout
+        self.batch_size = batch_size
+        self.idle_interval = idle_interval
+        self.dropped_records = 0
+        self.written_records = 0
+
+        self._queue = queue.Queue(max_queue_size)
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._run, name="edgetrain-log-writer", daemon=True
+        )
+        self._thread.start()
+
+        _open_async_sinks.add(self)
+        atexit.register(self.close)
+        _install_sigterm_handler()
+
+    @property
+    def queue_depth(self):
+        """Number of records waiting to be written."""
+        return self._queue.qsize()
+
+    def write(self, record):
+        """
+        Enqueue one record.
+
+        Parameters:
+        - record (dict): Values keyed by column name (see `LOG_COLUMNS`).
+
+        Raises:
+        - RuntimeError: If the underlying sink failed.
+        """
+        if self._closed:
+            raise ValueError("Cannot write to a closed log sink.")
+        self._raise_error()
+        try:
+            self._queue.put(record, block=self.block, timeout=self.timeout)
+        except queue.Full:
+            self.dropped_records += 1
+
+    def _run(self):
+        stop = False
+        while not stop:
+            try:
+                batch = [self._queue.get(timeout=self.idle_interval)]
+            except queue.Empty:
+                # Buffering sinks would otherwise hold records until the next write
+                if self._error is None and hasattr(self.sink, "flush_if_due"):
+                    self._call(self.sink.flush_if_due)
+                continue
+            while len(batch) < self.batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            # The underlying sink is only ever used from this thread. After an error,
+            # records are still taken off the queue so `flush` and `close` return
+            try:
+                for record in batch:
+                    if record is _STOP:
+                        stop = True
+                    elif self._error is not None:
+                        if record is not _FLUSH:
+                            self.dropped_records += 1
+                    elif record is _FLUSH:
+                        self._call(self.sink.flush)
+                    elif self._call(self.sink.write, record):
+                        self.written_records += 1
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _call(self, fn, *args):
+        try:
+            fn(*args)
+        except Exception as e:
+            print(f"Log writing failed: {e!r}")
+            self._error = e
+            return False
+        return True
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("Log writing failed.") from self._error
+
+    def flush(self):
+        """
+        Wait until all enqueued records are written, then flush the underlying sink.
+
+        Raises:
+        - RuntimeError: If the underlying sink failed.
+        """
+        if not self._closed and self._thread.is_alive():
+            self._queue.put(_FLUSH)
+            self._queue.join()
+        self._raise_error()
+
+    def close(self):
+        """
+        Write all pending records, stop the writer thread and close the underlying sink.
+        Safe to call more than once.
+
+        Raises:
+        - RuntimeError: If the underlying sink failed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        _open_async_sinks.discard(self)
+        atexit.unregister(self.close)
+        self.sink.close()
+        self._raise_error()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.close()
+        except RuntimeError:
+            # Do not hide the exception that ended the block
+            if exc_type is None:
+                raise
+
+
+def _close_async_sinks():
+    for sink in list(_open_async_sinks):
+        try:
+            sink.close()
+        except RuntimeError:
+            # Already reported by the writer thread; close the other sinks
+            pass
+
+
+def _install_sigterm_handler():
+    # Signal handlers can only be installed from the main thread
+    global _sigterm_handler_installed
+    if threading.current_thread() is not threading.main_thread():
+        return
+
+    with _sigterm_lock:
+        if _sigterm_handler_installed:
+            return
+        previous = signal.getsignal(signal.SIGTERM)
+
+        def handle_sigterm(signum, frame):
+            _close_async_sinks()
+            if callable(previous):
+                previous(signum, frame)
+            elif previous != signal.SIG_IGN:
+                # Exit like the default handler, but let finally blocks and atexit run
+                raise SystemExit(128 + signum)
+
+        signal.signal(signal.SIGTERM, handle_sigterm)
+        _sigterm_handler_installed = True
+
+
+def _typed(record, name, dtype):
+    value = record.get(name)
+    if dtype.startswith("datetime"):
+        return np.datetime64(value, "us")
+    if value is None:
+        if dtype.startswith("U"):
+            return ""
+        return 0 if dtype == "int64" else np.nan
+    return value
+
+
+def read_npy_log(path):
+    """
+    Read a binary resource log written by `NpyLogSink`.
+
+    Parameters:
+    - path (str): Path to the binary log file.
+
+    Returns:
+    - np.ndarray: A structured array with one field per log column.
+    """
+    chunks = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        while f.tell() < size:
+            chunks.append(np.load(f))
+    if not chunks:
+        return np.empty(0, dtype=LOG_DTYPE)
+    return np.concatenate(chunks)
+
+
+def open_log_sink(log_file, **kwargs):
+    """
+    Open the log sink matching the log file extension.
+
+    Parameters:
+    - log_file (str or sink): Path to the log file. '.npy' files use `NpyLogSink`, all other
+      files `CsvLogSink`. An existing sink is returned unchanged.
+    - **kwargs: Extra arguments passed to the sink.
+
+    Returns:
+    - CsvLogSink or NpyLogSink: The log sink.
+    """
+    if hasattr(log_file, "write"):
+        return log_file
+    if str(log_file).endswith(".npy"):
+        return NpyLogSink(log_file, **kwargs)
+    return CsvLogSink(log_file, **kwargs)
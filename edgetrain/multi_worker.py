@@ -0,0 +1,235 @@
+import json
+import multiprocessing
+import os
+import queue
+import socket
+import time
+import traceback
+
+import tensorflow as tf
+
+# Numeric resource snapshot fields aggregated across workers
+_RESOURCE_FIELDS = (
+    "num_gpus",
+    "cpu_compute_percent",
+    "cpu_memory_percent",
+    "gpu_compute_percent",
+    "gpu_memory_percent",
+)
+
+
+def is_multi_worker(strategy):
+    """
+    Whether a distribution strategy synchronizes several worker processes.
+
+    Parameters:
+    - strategy (tf.distribute.Strategy): The strategy.
+
+    Returns:
+    - bool: True for `MultiWorkerMirroredStrategy` (even with a single worker).
+    """
+    return isinstance(strategy, tf.distribute.MultiWorkerMirroredStrategy)
+
+
+class WorkerCoordinator:
+    """
+    Coordinate the adjustment decisions of the workers of a multi-worker strategy.
+
+    Every worker runs its own `EdgeTrainController`. Before each decision, the resource
+    snapshots and step timings of all workers are combined (the largest value of each
+    field, i.e. the most loaded worker), so the decision accounts for the whole cluster.
+    The decision of the chief is then broadcast, so every replica applies the same batch
+    size, learning rate and precision.
+
+    All methods are collective operations: every worker must call them in the same order,
+    so decisions must be triggered by step counts or epochs, not by wall-clock time.
+
+    Parameters:
+    - strategy (tf.distribute.MultiWorkerMirroredStrategy): The strategy of the workers.
+    """
+
+    def __init__(self, strategy):
+        self.strategy = strategy
+        resolver = strategy.cluster_resolver
+        self.task_type = resolver.task_type
+        self.task_id = resolver.task_id or 0
+        self.is_chief = self.task_type in (None, "chief") or (
+            self.task_type == "worker"
+            and self.task_id == 0
+            and "chief" not in resolver.cluster_spec().as_dict()
+        )
+
+        @tf.function(input_signature=[tf.TensorSpec([None], tf.float64)])
+        def gather(values):
+            # One row per replica; global replica 0 lives on the chief
+            def replica_fn(values):
+                context = tf.distribute.get_replica_context()
+                return context.all_gather(values[tf.newaxis], axis=0)
+
+            return strategy.run(replica_fn, args=(values,))
+
+        self._gather = gather
+
+    def _gather_values(self, values):
+        gathered = self._gather(tf.constant(values, dtype=tf.float64))
+        return self.strategy.experimental_local_results(gathered)[0].numpy()
+
+    def maximum(self, values):
+        """
+        Element-wise maximum of a list of numbers over all workers.
+
+        Parameters:
+        - values (list of float): This worker's values.
+
+        Returns:
+        - list of float: The maximum of each value.
+        """
+        return [float(v) for v in self._gather_values(values).max(axis=0)]
+
+    def broadcast(self, values):
+        """
+        Replace a list of numbers by the chief's values.
+
+        Parameters:
+        - values (list of float): This worker's values (ignored except on the chief).
+
+        Returns:
+        - list of float: The chief's values.
+        """
+        return [float(v) for v in self._gather_values(values)[0]]
+
+    def aggregate_resources(self, resources):
+        """
+        Combine the resource snapshots of all workers.
+
+        Parameters:
+        - resources (dict): This worker's resource snapshot.
+
+        Returns:
+        - dict: The snapshot with the largest value of each field over all workers.
+        """
+        values = self.maximum([resources.get(name, 0) for name in _RESOURCE_FIELDS])
+        combined = {**resources, **dict(zip(_RESOURCE_FIELDS, values))}
+        combined["num_gpus"] = int(combined["num_gpus"])
+        return combined
+
+
+def _free_ports(count):
+    # Ports the OS reports as free; a concurrent process may still take them
+    sockets = []
+    try:
+        for _ in range(count):
+            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            s.bind(("localhost", 0))
+            sockets.append(s)
+        return [s.getsockname()[1] for s in sockets]
+    finally:
+        for s in sockets:
+            s.close()
+
+
+def local_cluster_configs(num_workers, ports=None):
+    """
+    Build the `TF_CONFIG` of every worker of a cluster running on this machine.
+
+    Parameters:
+    - num_workers (int): Number of worker processes.
+    - ports (list of int, optional): Port of each worker. Defaults to free ports.
+
+    Returns:
+    - list of dict: One `TF_CONFIG` per worker; worker 0 is the chief.
+    """
+    if ports is None:
+        ports = _free_ports(num_workers)
+    cluster = {"worker": [f"localhost:{port}" for port in ports]}
+    return [
+        {"cluster": cluster, "task": {"type": "worker", "index": index}}
+        for index in range(num_workers)
+    ]
+
+
+def _run_worker(target, tf_config, threads, args, kwargs, results):
+    # Runs in a fresh (spawned) process: TF_CONFIG and threading must be set before
+    # the strategy initializes the runtime
+    try:
+        os.environ["TF_CONFIG"] = json.dumps(tf_config)
+        if threads:
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(threads)
+        strategy = tf.distribute.MultiWorkerMirroredStrategy()
+        results.put(
+            (tf_config["task"]["index"], "ok", target(strategy, *args, **kwargs))
+        )
+    except BaseException:
+        results.put((tf_config["task"]["index"], "error", traceback.format_exc()))
+
+
+def launch_local_workers(
+    target, num_workers=2, args=(), kwargs=None, threads_per_worker=None, timeout=None
+):
+    """
+    Run a function in several local worker processes joined by `MultiWorkerMirroredStrategy`.
+
+    Each worker is a spawned process with its own `TF_CONFIG`; it creates the strategy
+    and calls `target(strategy, *args, **kwargs)`. The cores of the machine are split
+    between workers so they do not oversubscribe the CPU.
+
+    Parameters:
+    - target (callable): Picklable (module level) function run by every worker.
+    - num_workers (int): Number of worker processes.
+    - args (tuple): Extra positional arguments passed to `target`.
+    - kwargs (dict, optional): Extra keyword arguments passed to `target`.
+    - threads_per_worker (int, optional): Intra- and inter-op threads of each worker.
+      Defaults to the number of CPUs divided by the number of workers.
+    - timeout (float, optional): Maximum number of seconds to wait for the workers.
+
+    Returns:
+    - list: The return value of `target` on each worker, in worker order.
+
+    Raises:
+    - RuntimeError: If a worker fails or the workers time out. All workers are stopped.
+    """
+    if threads_per_worker is None:
+        threads_per_worker = max(1, (os.cpu_count() or 1) // num_workers)
+
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    workers = [
+        context.Process(
+            target=_run_worker,
+            args=(target, tf_config, threads_per_worker, args, kwargs or {}, results),
+            name=f"edgetrain-worker-{tf_config['task']['index']}",
+        )
+        for tf_config in local_cluster_configs(num_workers)
+    ]
+    for worker in workers:
+        worker.start()
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    outputs = {}
+    try:
+        while len(outputs) < num_workers:
+            try:
+                index, status, output = results.get(timeout=1.0)
+            except queue.Empty:
+                # Workers killed by the OS never report back
+                crashed = [
+                    worker.name
+                    for i, worker in enumerate(workers)
+                    if i not in outputs and worker.exitcode not in (None, 0)
+                ]
+                if crashed:
+                    raise RuntimeError(f"Workers exited without a result: {crashed}.")
+                if deadline is not None and time.monotonic() > deadline:
+                    raise RuntimeError(f"Workers did not finish within {timeout} s.")
+                continue
+            if status == "error":
+                raise RuntimeError(f"Worker {index} failed:\n{output}")
+            outputs[index] = output
+    finally:
+        # A failed worker leaves the others blocked in collective operations
+        for worker in workers:
+            if len(outputs) < num_workers and worker.is_alive():
+                worker.terminate()
+            worker.join()
+    return [outputs[index] for index in range(num_workers)]
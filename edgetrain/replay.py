@@ -0,0 +1,367 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from edgetrain.adjust_train_parameters import (
+    DEFAULT_BATCH_BUCKETS,
+    DEFAULT_THRESHOLDS,
+    adjust_precision,
+    adjust_training_parameters,
+    adjust_training_parameters_array,
+    snap_batch_size,
+    snap_batch_size_array,
+)
+from edgetrain.calculate_priorities import (
+    DEFAULT_PRIORITIES,
+    define_priorities,
+    define_priorities_array,
+)
+from edgetrain.calculate_scores import compute_scores, compute_scores_array
+from edgetrain.log_reader import load_log
+
+TRACE_COLUMNS = [
+    "Epoch #",
+    "CPU RAM (%)",
+    "GPU RAM (%)",
+    "GPU Usage (%)",
+    "Batch Size",
+    "Learning Rate",
+    "Accuracy",
+]
+
+
+def _column(decisions, name):
+    # NaN for logs written before the column was recorded
+    if name in decisions.columns:
+        return decisions[name].to_numpy(dtype=float)
+    return np.full(len(decisions), np.nan)
+
+
+def load_trace(log_file, run=-1, num_gpus=None):
+    """
+    Read the recorded decisions of one training run from a resource log.
+
+    A run starts with the epoch 0 record written before training; every following record
+    is one decision, with the resource snapshot and training accuracy it was based on.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+    - run (int): Index of the run to read when the log contains several runs.
+    - num_gpus (int, optional): Number of GPUs of the recorded machine. By default, a GPU
+      is assumed whenever GPU usage or memory was recorded.
+
+    Returns:
+    - trace (dict): Initial 'batch_size', 'lr' and 'precision', and one array entry per
+      decision: 'epoch', 'accuracy', 'cpu_memory_percent', 'gpu_memory_percent', 'num_gpus',
+      'samples_per_second', 'best_samples_per_second', 'measured_batch_size' (the recorded
+      batch size throughput was measured at), 'accuracy_per_second',
+      'best_accuracy_per_second', 'time_to_accuracy', 'recorded_batch_size' and
+      'recorded_lr'. Throughput and accuracy gains are NaN for logs written before they
+      were recorded.
+    """
+    df = load_log(log_file)
+    missing = [column for column in TRACE_COLUMNS if column not in df.columns]
+    if missing:
+        raise ValueError(
+            f"Log file '{log_file}' cannot be replayed, missing columns: {missing}."
+        )
+
+    starts = np.flatnonzero(df["Epoch #"].to_numpy() == 0)
+    if len(starts) == 0:
+        raise ValueError(f"Log file '{log_file}' has no initial (epoch 0) record.")
+    stops = list(starts[1:]) + [len(df)]
+    start, stop = list(zip(starts, stops))[run]
+    first_decision = start + 1
+    initial, decisions = df.iloc[start], df.iloc[first_decision:stop]
+
+    accuracy = decisions["Accuracy"].to_numpy(dtype=float)
+    if np.isnan(accuracy).any():
+        raise ValueError(f"Log file '{log_file}' has decisions without an accuracy.")
+
+    gpu_memory_percent = decisions["GPU RAM (%)"].to_numpy(dtype=float)
+    if num_gpus is None:
+        gpu_used = (gpu_memory_percent > 0) | (
+            decisions["GPU Usage (%)"].to_numpy(dtype=float) > 0
+        )
+        gpus = gpu_used.astype(int)
+    else:
+        gpus = np.full(len(decisions), num_gpus)
+
+    # Throughput was measured at the batch size set by the previous record
+    samples_per_second = _column(decisions, "Samples/s")
+    accuracy_per_second = _column(decisions, "Accuracy Gain/s")
+    recorded_batch_size = decisions["Batch Size"].to_numpy(dtype=int)
+    measured_batch_size = np.concatenate(
+        [[int(initial["Batch Size"])], recorded_batch_size[:-1]]
+    )
+
+    # Logs written before precision was recorded were trained in float32
+    precision = initial.get("Precision")
+
+    return {
+        "batch_size": int(initial["Batch Size"]),
+        "lr": float(initial["Learning Rate"]),
+        "precision": (
+            precision if isinstance(precision, str) and precision else "float32"
+        ),
+        "epoch": decisions["Epoch #"].to_numpy(dtype=int),
+        "accuracy": accuracy,
+        "cpu_memory_percent": decisions["CPU RAM (%)"].to_numpy(dtype=float),
+        "gpu_memory_percent": gpu_memory_percent,
+        "num_gpus": gpus,
+        "samples_per_second": samples_per_second,
+        "best_samples_per_second": np.fmax.accumulate(samples_per_second),
+        "accuracy_per_second": accuracy_per_second,
+        "best_accuracy_per_second": np.fmax.accumulate(accuracy_per_second),
+        "time_to_accuracy": _column(decisions, "Time to Accuracy (s)"),
+        "measured_batch_size": measured_batch_size,
+        "recorded_batch_size": recorded_batch_size,
+        "recorded_lr": decisions["Learning Rate"].to_numpy(dtype=float),
+    }
+
+
+def policy_grid(**values):
+    """
+    Build every combination of threshold and priority values.
+
+    Priorities that are not varied keep their `DEFAULT_PRIORITIES` value, so each
+    policy's 'user_priorities' can be passed to `dynamic_train` unchanged.
+
+    Parameters:
+    - **values (list): Candidate values keyed by a `DEFAULT_THRESHOLDS` key
+      (e.g. memory_high=[70, 75, 80]) or a `DEFAULT_PRIORITIES` key
+      (e.g. batch_size_adjustment=[0.3, 0.4]).
+
+    Returns:
+    - policies (list of dict): One policy per combination (see `replay_policy`).
+    """
+    for name in values:
+        if name not in DEFAULT_THRESHOLDS and name not in DEFAULT_PRIORITIES:
+            raise ValueError(f"Unknown policy parameter '{name}'.")
+
+    policies = []
+    for combination in itertools.product(*values.values()):
+        chosen = dict(zip(values, combination))
+        priorities = {k: v for k, v in chosen.items() if k in DEFAULT_PRIORITIES}
+        policies.append(
+            {
+                "thresholds": {
+                    k: v for k, v in chosen.items() if k in DEFAULT_THRESHOLDS
+                },
+                # Complete priorities, usable as is by `dynamic_train`
+                "user_priorities": (
+                    {**DEFAULT_PRIORITIES, **priorities} if priorities else None
+                ),
+            }
+        )
+    return policies
+
+
+def _throughput(trace, i):
+    # Traces built by hand may not have throughput
+    if "samples_per_second" not in trace:
+        return None
+    throughput = {
+        "batch_size": int(trace["measured_batch_size"][i]),
+        "samples_per_second": trace["samples_per_second"][i],
+        "best_samples_per_second": trace["best_samples_per_second"][i],
+    }
+    if "accuracy_per_second" in trace:
+        throughput.update(
+            accuracy_per_second=trace["accuracy_per_second"][i],
+            best_accuracy_per_second=trace["best_accuracy_per_second"][i],
+            time_to_accuracy=trace["time_to_accuracy"][i],
+        )
+    return throughput
+
+
+def _replay(trace, policy, batch_buckets):
+    # Run the live pipeline on each recorded decision, as EdgeTrainController.adjust does
+    policy = policy or {}
+    thresholds = policy.get("thresholds")
+    priorities = policy.get("user_priorities")
+    controller = policy.get("batch_size_controller")
+    if controller is not None:
+        controller.reset()
+    mixed_precision = policy.get("mixed_precision")
+
+    batch_size, lr, prev_accuracy = trace["batch_size"], trace["lr"], 0.0
+    precision = trace.get("precision", "float32")
+    steps = []
+    for i, accuracy in enumerate(trace["accuracy"]):
+        resources = {
+            "cpu_memory_percent": trace["cpu_memory_percent"][i],
+            "gpu_memory_percent": trace["gpu_memory_percent"][i],
+            "num_gpus": trace["num_gpus"][i],
+        }
+        throughput = _throughput(trace, i)
+        scores = compute_scores(
+            prev_accuracy, accuracy, resources=resources, throughput=throughput
+        )
+        priority_value = define_priorities(scores, priorities)
+        new_precision = adjust_precision(
+            priority_value,
+            precision,
+            resources=resources,
+            thresholds=thresholds,
+            mixed_precision=mixed_precision,
+        )
+        if new_precision != precision:
+            precision = new_precision
+        else:
+            batch_size, lr = adjust_training_parameters(
+                priority_values=priority_value,
+                batch_size=batch_size,
+                lr=lr,
+                accuracy_score=accuracy,
+                resources=resources,
+                thresholds=thresholds,
+                batch_size_controller=controller,
+                buckets=batch_buckets,
+                throughput=throughput,
+            )
+        if batch_buckets:
+            batch_size = snap_batch_size(batch_size, batch_buckets)
+        steps.append((scores, priority_value, batch_size, lr))
+        prev_accuracy = accuracy
+    return steps
+
+
+def replay_policy(trace, policy=None, batch_buckets=DEFAULT_BATCH_BUCKETS):
+    """
+    Replay the recorded decisions of a run through a candidate policy.
+
+    The replay is open-loop: the recorded resource snapshots and accuracies are used as
+    is, although a different batch size or learning rate would have changed them.
+
+    Parameters:
+    - trace (dict): Recorded decisions (see `load_trace`).
+    - policy (dict, optional): 'thresholds' and 'batch_size_controller' passed to
+      `adjust_training_parameters`, 'user_priorities' passed to `define_priorities` and
+      'mixed_precision' passed to `adjust_precision`. Values are used exactly as
+      `EdgeTrainController` uses them, e.g. priorities are not merged with the defaults.
+      Controllers are reset before the replay.
+    - batch_buckets (iterable of int, optional): Allowed batch sizes, as in `dynamic_train`.
+
+    Returns:
+    - df (pd.DataFrame): One row per decision, with the log columns for the epoch, accuracy,
+      scores, priorities, batch size and learning rate. The recorded throughput is used as
+      is, also for batch sizes the run did not train with.
+    """
+    steps = _replay(trace, policy, batch_buckets)
+    return pd.DataFrame(
+        {
+            "Epoch #": trace["epoch"],
+            "Accuracy": trace["accuracy"],
+            "Mem Score": [s["memory_score"] for s, _, _, _ in steps],
+            "Acc Score": [s["accuracy_score"] for s, _, _, _ in steps],
+            "Throughput Score": [s["throughput_score"] for s, _, _, _ in steps],
+            "Time to Accuracy Score": [
+                s["time_to_accuracy_score"] for s, _, _, _ in steps
+            ],
+            "Priority Batch Size": [p["batch_size"] for _, p, _, _ in steps],
+            "Priority Learning Rate": [p["learning_rate"] for _, p, _, _ in steps],
+            "Batch Size": [bs for _, _, bs, _ in steps],
+            "Learning Rate": [lr for _, _, _, lr in steps],
+        }
+    )
+
+
+def _threshold_arrays(policies):
+    # One array per threshold, with one value per policy
+    values = [
+        {**DEFAULT_THRESHOLDS, **((policy or {}).get("thresholds") or {})}
+        for policy in policies
+    ]
+    return {name: np.array([v[name] for v in values]) for name in DEFAULT_THRESHOLDS}
+
+
+def _priority_arrays(policies):
+    # One array per priority weight; priorities are used as given, as in training
+    values = [
+        (policy or {}).get("user_priorities") or DEFAULT_PRIORITIES
+        for policy in policies
+    ]
+    return {
+        "batch_size_adjustment": np.array([v["batch_size_adjustment"] for v in values]),
+        "accuracy_improvement": np.array([v["accuracy_improvement"] for v in values]),
+        "throughput_improvement": np.array(
+            [v.get("throughput_improvement", 0) for v in values]
+        ),
+        "time_to_accuracy_improvement": np.array(
+            [v.get("time_to_accuracy_improvement", 0) for v in values]
+        ),
+    }
+
+
+def replay_policies(trace, policies, batch_buckets=DEFAULT_BATCH_BUCKETS):
+    """
+    Replay the recorded decisions of a run through many candidate policies.
+
+    All policies are evaluated together with the array form of the pipeline: scores are
+    computed once for the whole run and each decision is one vectorized step over policies.
+    The result matches `replay_policy` for every policy. Policies with a stateful
+    'batch_size_controller' or with 'mixed_precision' switching are replayed one at a time
+    with `replay_policy`.
+
+    Parameters:
+    - trace (dict): Recorded decisions (see `load_trace`).
+    - policies (list of dict): Candidate policies (see `replay_policy` and `policy_grid`).
+    - batch_buckets (iterable of int, optional): Allowed batch sizes, as in `dynamic_train`.
+
+    Returns:
+    - dict: 'batch_size' and 'learning_rate' trajectories, arrays of shape
+      (number of policies, number of decisions).
+    """
+    accuracy = trace["accuracy"]
+    num_policies, num_decisions = len(policies), len(accuracy)
+    thresholds = _threshold_arrays(policies)
+    priorities = _priority_arrays(policies)
+
+    # Scores only depend on the recording; priorities are (policies, decisions)
+    previous_accuracy = np.concatenate([[0.0], accuracy[:-1]])
+    scores = compute_scores_array(
+        previous_accuracy,
+        accuracy,
+        trace,
+        throughput=trace if "samples_per_second" in trace else None,
+    )
+    priority_value = define_priorities_array(
+        scores[np.newaxis, :],
+        {name: values[:, np.newaxis] for name, values in priorities.items()},
+    )
+
+    batch_size = np.full(num_policies, trace["batch_size"])
+    lr = np.full(num_policies, trace["lr"], dtype=float)
+    batch_sizes = np.zeros((num_policies, num_decisions), dtype=int)
+    lrs = np.zeros((num_policies, num_decisions))
+    for i in range(num_decisions):
+        resources = {
+            "cpu_memory_percent": trace["cpu_memory_percent"][i],
+            "gpu_memory_percent": trace["gpu_memory_percent"][i],
+        }
+        batch_size, lr = adjust_training_parameters_array(
+            priority_value[:, i],
+            batch_size,
+            lr,
+            accuracy[i],
+            resources,
+            thresholds=thresholds,
+        )
+        if batch_buckets:
+            batch_size = snap_batch_size_array(batch_size, batch_buckets)
+        batch_sizes[:, i] = batch_size
+        lrs[:, i] = lr
+
+    for i, policy in enumerate(policies):
+        policy = policy or {}
+        if policy.get("batch_size_controller") is not None or policy.get(
+            "mixed_precision"
+        ):
+            for j, (_, _, batch_size, lr) in enumerate(
+                _replay(trace, policy, batch_buckets)
+            ):
+                batch_sizes[i, j] = batch_size
+                lrs[i, j] = lr
+    return {"batch_size": batch_sizes, "learning_rate": lrs}
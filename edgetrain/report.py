@@ -0,0 +1,164 @@
+import argparse
+import glob
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from matplotlib.figure import Figure
+
+from edgetrain.edgetrain_folder import get_edgetrain_folder
+from edgetrain.log_reader import load_log
+from edgetrain.train_visualize import (
+    PLOTTED_COLUMNS,
+    draw_resource_usage,
+    plot_prefix,
+    save_figure,
+)
+
+LOG_PATTERNS = ("*.csv", "*.npy")
+DEFAULT_FORMATS = ("png", "svg")
+
+
+def find_logs(log_dir):
+    """
+    Find the resource logs in a directory.
+
+    Parameters:
+    - log_dir (str): Directory containing CSV or `.npy` resource logs.
+
+    Returns:
+    - list of str: The sorted paths of the log files.
+    """
+    logs = []
+    for pattern in LOG_PATTERNS:
+        logs.extend(glob.glob(os.path.join(log_dir, pattern)))
+    return sorted(logs)
+
+
+def render_log(log_file, img_dir, formats=DEFAULT_FORMATS):
+    """
+    Render the resource usage plot of one log without a display.
+
+    The figure is not registered with pyplot, so no GUI backend is involved and the
+    figure is freed once saved.
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format).
+    - img_dir (str): The output directory.
+    - formats (iterable of str): File formats, e.g. 'png' or 'svg'.
+
+    Returns:
+    - list of str: The paths of the saved files.
+    """
+    df = load_log(log_file, columns=PLOTTED_COLUMNS)
+    fig = draw_resource_usage(Figure(figsize=(7, 10)), df)
+    return save_figure(
+        fig, img_dir, f"{plot_prefix(log_file)}_resource_usage_plot", formats=formats
+    )
+
+
+def render_reports(log_files, img_dir=None, formats=DEFAULT_FORMATS, max_workers=None):
+    """
+    Render the resource usage plots of many logs in parallel.
+
+    Logs are rendered in a pool of worker processes. Figures never go through pyplot
+    (see `render_log`), so the workers need no display and the matplotlib backend of the
+    calling process is left untouched. A log that fails to render is reported and skipped.
+
+    Parameters:
+    - log_files (str or list of str): A directory of logs, or a list of log files.
+    - img_dir (str, optional): The output directory. Defaults to the EdgeTrain images folder.
+    - formats (iterable of str): File formats, e.g. 'png' or 'svg'.
+    - max_workers (int, optional): Number of worker processes. Defaults to the number of
+      CPUs. With 1, logs are rendered in the calling process.
+
+    Returns:
+    - dict: The saved file paths keyed by log file (failed logs are left out).
+    """
+    if isinstance(log_files, (str, os.PathLike)):
+        log_files = find_logs(log_files)
+    if img_dir is None:
+        img_dir = os.path.join(get_edgetrain_folder(), "images")
+    os.makedirs(img_dir, exist_ok=True)
+    formats = tuple(formats)
+
+    results = {}
+    if max_workers == 1:
+        for log_file in log_files:
+            try:
+                results[log_file] = render_log(log_file, img_dir, formats)
+            except Exception as e:
+                print(f"Failed to render '{log_file}': {e}")
+        return results
+
+    # Spawn workers: reports are often rendered right after training, and a fork would
+    # copy the TensorFlow runtime and its threads into every worker
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=max_workers, mp_context=context) as executor:
+        futures = {
+            executor.submit(render_log, log_file, img_dir, formats): log_file
+            for log_file in log_files
+        }
+        for future in as_completed(futures):
+            log_file = futures[future]
+            try:
+                results[log_file] = future.result()
+            except Exception as e:
+                print(f"Failed to render '{log_file}': {e}")
+    return results
+
+
+def main(argv=None):
+    """
+    Command line entry point: render the plots of every log in a directory.
+
+    Parameters:
+    - argv (list of str, optional): Command line arguments. Defaults to `sys.argv[1:]`.
+
+    Returns:
+    - int: The exit status, 1 if any log failed to render.
+    """
+    parser = argparse.ArgumentParser(
+        prog="edgetrain-report",
+        description="Render resource usage plots for a directory of EdgeTrain logs.",
+    )
+    parser.add_argument("log_dir", help="Directory containing CSV or .npy logs.")
+    parser.add_argument(
+        "-o",
+        "--output-dir",
+        default=None,
+        help="Output directory (default: the EdgeTrain images folder).",
+    )
+    parser.add_argument(
+        "-f",
+        "--formats",
+        nargs="+",
+        default=list(DEFAULT_FORMATS),
+        help="Image formats to write (default: png svg).",
+    )
+    parser.add_argument(
+        "-j",
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes (default: number of CPUs).",
+    )
+    args = parser.parse_args(argv)
+
+    log_files = find_logs(args.log_dir)
+    if not log_files:
+        print(f"No logs found in '{args.log_dir}'.")
+        return 1
+
+    results = render_reports(
+        log_files,
+        img_dir=args.output_dir,
+        formats=args.formats,
+        max_workers=args.workers,
+    )
+    print(f"Rendered {len(results)} of {len(log_files)} logs.")
+    return 0 if len(results) == len(log_files) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
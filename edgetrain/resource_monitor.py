@@ -1,20 +1,66 @@
-import csv
+import sys
+import threading
+import time
+from collections import deque
 from datetime import datetime
 
-import GPUtil
+import numpy as np
 import psutil
-from pynvml import (
-    nvmlDeviceGetHandleByIndex,
-    nvmlDeviceGetUtilizationRates,
-    nvmlInit,
-    nvmlShutdown,
-)
 
+from edgetrain.gpu_backend import get_gpu_backend
+from edgetrain.log_sinks import open_log_sink
+
+
+def process_memory():
+    """
+    Memory used by this process.
+
+    Returns:
+    - dict: 'process_rss' (resident set size, bytes) and 'process_uss' (unique set size,
+      i.e. memory freed if the process exited, bytes). USS falls back to RSS where the
+      platform does not report it.
+    """
+    process = psutil.Process()
+    try:
+        info = process.memory_full_info()
+        return {"process_rss": info.rss, "process_uss": getattr(info, "uss", info.rss)}
+    except psutil.AccessDenied:
+        rss = process.memory_info().rss
+        return {"process_rss": rss, "process_uss": rss}
 
-def sys_resources():
+
+def tf_memory_info():
+    """
+    Memory held by the TensorFlow allocators of this process on its GPUs.
+
+    TensorFlow is only queried if it is already imported, so monitoring never loads it.
+    Devices without allocator statistics (e.g. CPUs) are skipped.
+
+    Returns:
+    - dict: 'tf_memory_current' and 'tf_memory_peak' (bytes, summed over devices).
+    """
+    memory = {"tf_memory_current": 0, "tf_memory_peak": 0}
+    tf = sys.modules.get("tensorflow")
+    if tf is None:
+        return memory
+    for device in tf.config.list_logical_devices("GPU"):
+        try:
+            info = tf.config.experimental.get_memory_info(device.name)
+        except (ValueError, RuntimeError):
+            continue
+        memory["tf_memory_current"] += info["current"]
+        memory["tf_memory_peak"] += info["peak"]
+    return memory
+
+
+def sys_resources(interval=1):
     """
     Monitor system resources, including CPU and GPU utilization and memory usage.
 
+    Parameters:
+    - interval (float, optional): Seconds to block while measuring CPU utilization. If None,
+      utilization is measured since the previous call and the function returns immediately.
+
     Returns:
     - dict: A dictionary containing the following keys:
         - cpu_cores (int): Number of logical CPU cores.
@@ -23,35 +69,20 @@ def sys_resources():
         - gpu_compute_percent (float): Average GPU compute utilization as a percentage.
         - gpu_memory_usage (float): Total GPU memory used across all GPUs (in MB).
         - gpu_memory_total (float): Total available GPU memory across all GPUs (in MB).
-        - gpu_memory_percent (float): Average GPU memory utilization as a percentage.
+        - gpu_memory_percent (float): Average GPU memory utilization as a fraction.
         - num_gpus (int): Number of GPUs available.
+        - process_rss, process_uss (int): Memory used by this process (bytes, see
+          `process_memory`).
+        - tf_memory_current, tf_memory_peak (int): Memory held by TensorFlow's GPU
+          allocators (bytes, see `tf_memory_info`).
     """
 
     # Check CPU usage (compute and RAM)
-    cpu_compute_percent = psutil.cpu_percent(interval=1)
+    cpu_compute_percent = psutil.cpu_percent(interval=interval)
     cpu_cores = psutil.cpu_count(logical=True)
 
-    # Check GPU usage (memory and compute)
-    gpus = GPUtil.getGPUs()
-    num_gpus = len(gpus)
-    gpu_memory_usage = sum(gpu.memoryUsed for gpu in gpus)
-    gpu_memory_total = sum(gpu.memoryTotal for gpu in gpus)
-    gpu_memory_percent = sum(gpu.memoryUtil for gpu in gpus) / num_gpus if gpus else 0
-
-    # GPU compute utilization
-    gpu_compute_percent = 0
-    if num_gpus > 0:
-        nvmlInit()
-        try:
-            gpu_compute_percent = (
-                sum(
-                    nvmlDeviceGetUtilizationRates(nvmlDeviceGetHandleByIndex(i)).gpu
-                    for i in range(num_gpus)
-                )
-                / num_gpus
-            )
-        finally:
-            nvmlShutdown()
+    # Check GPU usage (memory and compute) through the persistent GPU backend
+    gpu = get_gpu_backend().read()
 
     # Check system memory usage (RAM)
     cpu_memory_percent = psutil.virtual_memory().percent
@@ -60,14 +91,216 @@ def sys_resources():
         "cpu_cores": cpu_cores,
         "cpu_compute_percent": cpu_compute_percent,
         "cpu_memory_percent": cpu_memory_percent,
-        "gpu_compute_percent": gpu_compute_percent,
-        "gpu_memory_usage": gpu_memory_usage,
-        "gpu_memory_total": gpu_memory_total,
-        "gpu_memory_percent": gpu_memory_percent,
-        "num_gpus": num_gpus,
+        "gpu_compute_percent": gpu["gpu_compute_percent"],
+        "gpu_memory_usage": gpu["gpu_memory_usage"],
+        "gpu_memory_total": gpu["gpu_memory_total"],
+        "gpu_memory_percent": gpu["gpu_memory_percent"],
+        "num_gpus": gpu["num_gpus"],
+        **process_memory(),
+        **tf_memory_info(),
     }
 
 
+def apply_memory_budget(resources, memory_budget):
+    """
+    Express memory usage against a budget for this process instead of the whole host.
+
+    Host-wide percentages also count other processes and the page cache. With a budget,
+    'cpu_memory_percent' becomes this process's USS as a percentage of the budget, and
+    'gpu_memory_percent' the memory held by TensorFlow's GPU allocators as a percentage of
+    the GPU memory (when TensorFlow reports it, else the device-wide usage). Unlike in
+    the snapshot, where it is a fraction, 'gpu_memory_percent' is then a percentage like
+    'cpu_memory_percent'. The host-wide values are kept as 'host_memory_percent' and
+    'host_gpu_memory_percent' (both percentages).
+
+    Parameters:
+    - resources (dict): A resource snapshot (see `sys_resources`).
+    - memory_budget (int): Memory (bytes) this process may use.
+
+    Returns:
+    - dict: A copy of the snapshot with budget-relative memory percentages.
+    """
+    resources = dict(resources)
+    resources["host_memory_percent"] = resources["cpu_memory_percent"]
+    # The GPU backend reports a fraction
+    resources["host_gpu_memory_percent"] = 100 * resources["gpu_memory_percent"]
+    process = resources.get("process_uss") or resources.get("process_rss") or 0
+    resources["cpu_memory_percent"] = 100 * process / memory_budget
+    resources["gpu_memory_percent"] = resources["host_gpu_memory_percent"]
+    gpu_total = (resources.get("gpu_memory_total") or 0) * 2**20
+    if resources.get("tf_memory_current") and gpu_total:
+        resources["gpu_memory_percent"] = (
+            100 * resources["tf_memory_current"] / gpu_total
+        )
+    return resources
+
+
+# Fields of a resource snapshot in array form (see `resources_array`)
+RESOURCE_DTYPE = np.dtype(
+    [
+        ("cpu_cores", "int64"),
+        ("cpu_compute_percent", "float64"),
+        ("cpu_memory_percent", "float64"),
+        ("gpu_compute_percent", "float64"),
+        ("gpu_memory_usage", "float64"),
+        ("gpu_memory_total", "float64"),
+        ("gpu_memory_percent", "float64"),
+        ("num_gpus", "int64"),
+        ("process_rss", "float64"),
+        ("process_uss", "float64"),
+        ("tf_memory_current", "float64"),
+        ("tf_memory_peak", "float64"),
+    ]
+)
+
+
+def resources_array(snapshots):
+    """
+    Convert resource snapshots to a structured array.
+
+    Parameters:
+    - snapshots (list of dict): Resource dictionaries as returned by `sys_resources`.
+      Missing values are set to 0.
+
+    Returns:
+    - np.ndarray: A structured array of `RESOURCE_DTYPE`, one element per snapshot.
+    """
+    return np.array(
+        [tuple(s.get(name) or 0 for name in RESOURCE_DTYPE.names) for s in snapshots],
+        dtype=RESOURCE_DTYPE,
+    )
+
+
+class ResourceSampler:
+    """
+    Sample system resources in a background daemon thread.
+
+    Snapshots are taken every `interval` seconds and stored in a fixed-size ring buffer,
+    so readers never block on a measurement. If a sample fails, sampling stops and the
+    error is re-raised by `latest()` and `stop()`.
+
+    Parameters:
+    - interval (float): Seconds between two samples.
+    - capacity (int): Maximum number of samples kept in the ring buffer.
+    - sample_fn (callable, optional): Function returning a resource dictionary. Defaults to
+      a non-blocking `sys_resources` call.
+    """
+
+    def __init__(self, interval=1.0, capacity=600, sample_fn=None):
+        self.interval = interval
+        self.capacity = capacity
+        self._sample_fn = sample_fn or (lambda: sys_resources(interval=None))
+        self._default_sampling = sample_fn is None
+        self._buffer = deque(maxlen=capacity)
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._error = None
+
+    def start(self):
+        """
+        Take a first sample synchronously and start the sampling thread.
+
+        Returns:
+        - ResourceSampler: The running sampler.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return self
+
+        self._stop_event.clear()
+        self._error = None
+        if self._default_sampling:
+            # cpu_percent measures since its previous call: prime it and measure the
+            # first sample over a short window so it does not report 0
+            psutil.cpu_percent(interval=None)
+            self._record(sys_resources(interval=min(self.interval, 0.1)))
+        else:
+            self._record(self._sample_fn())
+        self._thread = threading.Thread(
+            target=self._run, name="edgetrain-resource-sampler", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self, timeout=None):
+        """
+        Stop the sampling thread and wait for it to exit.
+
+        Parameters:
+        - timeout (float, optional): Maximum number of seconds to wait for the thread.
+
+        Raises:
+        - RuntimeError: If sampling failed.
+        """
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self._raise_error()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        try:
+            self.stop()
+        except RuntimeError:
+            # Do not hide the exception that ended the block
+            if exc_type is None:
+                raise
+
+    def _run(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self._record(self._sample_fn())
+            except Exception as e:
+                print(f"Resource sampling failed: {e!r}")
+                self._error = e
+                return
+
+    def _raise_error(self):
+        if self._error is not None:
+            raise RuntimeError("Resource sampling failed.") from self._error
+
+    def _record(self, resources):
+        with self._lock:
+            self._buffer.append((time.monotonic(), resources))
+
+    def latest(self):
+        """
+        Return the most recent resource snapshot without blocking.
+
+        Returns:
+        - dict or None: A copy of the latest snapshot, or None if nothing was sampled yet.
+
+        Raises:
+        - RuntimeError: If sampling failed.
+        """
+        self._raise_error()
+        with self._lock:
+            if not self._buffer:
+                return None
+            return dict(self._buffer[-1][1])
+
+    def window(self, seconds):
+        """
+        Return all snapshots taken within the last `seconds` seconds, oldest first.
+
+        Parameters:
+        - seconds (float): Length of the time window.
+
+        Returns:
+        - list: List of resource dictionaries.
+        """
+        cutoff = time.monotonic() - seconds
+        with self._lock:
+            return [dict(sample) for stamp, sample in self._buffer if stamp >= cutoff]
+
+
+def _mebibytes(value):
+    return None if value is None else value / 2**20
+
+
 def log_usage_once(
     log_file,
     pruning,
@@ -77,12 +310,18 @@ def log_usage_once(
     priority_value,
     num_epoch=0,
     resources=None,
+    retrace_count=0,
+    compile_time=0.0,
+    accuracy=None,
+    throughput=None,
+    accumulation_steps=1,
+    precision="float32",
 ):
     """
     Log GPU and CPU resource usage once.
 
     Parameters:
-    - log_file (str): Path to the log file.
+    - log_file (str or sink): Path to the log file, or an open log sink (see `open_log_sink`).
     - pruning (bool): Whether pruning is enabled.
     - batch_size (int): Current batch size.
     - lr (float): Learning rate.
@@ -90,63 +329,58 @@ def log_usage_once(
     - priority_value (dict): Dictionary of priority values.
     - num_epoch (int, optional): Current epoch number. Default is 0.
     - resources (dict, optional): Dictionary containing system resource usage metrics. If None, system resources will be fetched.
+    - retrace_count (int, optional): Number of train function retraces so far.
+    - compile_time (float, optional): Cumulative time (s) spent in steps that traced the train function.
+    - accuracy (float, optional): Training accuracy the logged decision was based on (0-1).
+    - throughput (dict, optional): Mean 'step_time' (s), 'samples_per_second' and
+      'accuracy_per_second' of the training since the previous decision, and
+      'time_to_accuracy' (s).
+    - accumulation_steps (int, optional): Number of micro-batches of `batch_size` whose
+      gradients are accumulated per optimizer update.
+    - precision (str, optional): Keras dtype policy of the model, e.g. 'mixed_float16'.
     """
 
-    # Create CSV header if the file doesn't exist
-    try:
-        with open(log_file, "r") as f:
-            pass
-    except FileNotFoundError:
-        with open(log_file, "w", newline="") as f:
-            writer = csv.writer(f)
-            header = [
-                "Timestamp",
-                "Epoch #",
-                "CPU Usage (%)",
-                "CPU RAM (%)",
-                "GPU RAM (%)",
-                "GPU Usage (%)",
-                "Mem Score",
-                "Acc Score",
-                "Priority Batch Size",
-                "Priority Learning Rate",
-                "Pruning",
-                "Batch Size",
-                "Learning Rate",
-            ]
-            writer.writerow(header)
-
     # Get resource usage
     if resources is None:
         resources = sys_resources()
-    cpu_compute_percent = resources.get("cpu_compute_percent")
-    cpu_memory_percent = resources.get("cpu_memory_percent")
-    gpu_compute_percent = resources.get("gpu_compute_percent")
-    gpu_memory_percent = resources.get("gpu_memory_percent")
 
-    memory_score = normalize_scores.get("memory_score")
-    accuracy_score = normalize_scores.get("accuracy_score")
-    batch_size_priority_value = priority_value.get("batch_size")
-    learning_rate_priority_value = priority_value.get("learning_rate")
+    if throughput is None:
+        throughput = {}
 
     # Prepare log entry
-    log_entry = [
-        datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-        num_epoch,
-        cpu_compute_percent,
-        cpu_memory_percent,
-        gpu_compute_percent,
-        gpu_memory_percent,
-        memory_score,
-        accuracy_score,
-        batch_size_priority_value,
-        learning_rate_priority_value,
-        pruning,
-        batch_size,
-        lr,
-    ]
+    record = {
+        "Timestamp": datetime.now(),
+        "Epoch #": num_epoch,
+        "CPU Usage (%)": resources.get("cpu_compute_percent"),
+        "CPU RAM (%)": resources.get("cpu_memory_percent"),
+        "GPU RAM (%)": resources.get("gpu_memory_percent"),
+        "GPU Usage (%)": resources.get("gpu_compute_percent"),
+        "Mem Score": normalize_scores.get("memory_score"),
+        "Acc Score": normalize_scores.get("accuracy_score"),
+        "Priority Batch Size": priority_value.get("batch_size"),
+        "Priority Learning Rate": priority_value.get("learning_rate"),
+        "Pruning": pruning,
+        "Batch Size": batch_size,
+        "Learning Rate": lr,
+        "Retraces": retrace_count,
+        "Compile Time (s)": compile_time,
+        "Accuracy": accuracy,
+        "Throughput Score": normalize_scores.get("throughput_score"),
+        "Step Time (s)": throughput.get("step_time"),
+        "Samples/s": throughput.get("samples_per_second"),
+        "Time to Accuracy (s)": throughput.get("time_to_accuracy"),
+        "Time to Accuracy Score": normalize_scores.get("time_to_accuracy_score"),
+        "Accuracy Gain/s": throughput.get("accuracy_per_second"),
+        "Accumulation Steps": accumulation_steps,
+        "Precision": precision,
+        "Process RSS (MiB)": _mebibytes(resources.get("process_rss")),
+        "Process USS (MiB)": _mebibytes(resources.get("process_uss")),
+        "TF Memory (MiB)": _mebibytes(resources.get("tf_memory_current")),
+    }
 
-    # Append log entry to the file
-    with open(log_file, "a", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(log_entry)
+    # Write the entry to an open sink, or append it to the log file
+    if hasattr(log_file, "write"):
+        log_file.write(record)
+    else:
+        with open_log_sink(log_file) as sink:
+            sink.write(record)
@@ -0,0 +1,303 @@
+import json
+import os
+import time
+import types
+
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+# Step phases timed by `StepProfiler`
+STEP_PHASES = ("data_wait", "compute", "callbacks")
+
+# Histogram bin edges (s): 10 log-spaced bins per decade from 1 us to 100 s
+TIMING_BINS = np.logspace(-6, 2, 81)
+
+
+class TimingHistogram:
+    """
+    Histogram of durations over fixed log-spaced bins.
+
+    Attributes:
+    - counts (np.ndarray): Number of durations per bin of `TIMING_BINS` (durations
+      outside the bins are counted in the first or last bin).
+    - count (int): Number of durations.
+    - total (float): Sum of the durations (s).
+    - max (float): Longest duration (s).
+    """
+
+    def __init__(self):
+        self.counts = np.zeros(len(TIMING_BINS) - 1, dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        """
+        Count one duration.
+
+        Parameters:
+        - duration (float): The duration (s).
+        """
+        index = np.searchsorted(TIMING_BINS, duration, side="right") - 1
+        self.counts[min(max(index, 0), len(self.counts) - 1)] += 1
+        self.count += 1
+        self.total += duration
+        self.max = max(self.max, duration)
+
+    def percentile(self, q):
+        """
+        Estimate a percentile as the upper edge of the bin containing it.
+
+        Parameters:
+        - q (float): The percentile (0-100).
+
+        Returns:
+        - float: The estimated duration (s), NaN without durations.
+        """
+        if not self.count:
+            return float("nan")
+        index = np.searchsorted(np.cumsum(self.counts), q / 100 * self.count)
+        return float(min(TIMING_BINS[index + 1], self.max))
+
+    def summary(self):
+        """
+        Summarize the histogram.
+
+        Returns:
+        - dict: 'count', 'total', 'mean', 'p50', 'p95', 'max' and the non-empty bins
+          ('bins', a list of [lower edge, upper edge, count]).
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "mean": self.total / self.count if self.count else float("nan"),
+            "p50": self.percentile(50),
+            "p95": self.percentile(95),
+            "max": self.max,
+            "bins": [
+                [float(TIMING_BINS[i]), float(TIMING_BINS[i + 1]), int(count)]
+                for i, count in enumerate(self.counts)
+                if count
+            ],
+        }
+
+
+def step_timing_file(log_file):
+    """
+    Path of the step timing summary written next to a resource log.
+
+    Parameters:
+    - log_file (str): Path to the resource log.
+
+    Returns:
+    - str: '<log root>_step_timing.json'.
+    """
+    return f"{os.path.splitext(log_file)[0]}_step_timing.json"
+
+
+class _StepEnd(keras.callbacks.Callback):
+    # Placed after the other callbacks: marks the end of their per-step work
+    def __init__(self, profiler):
+        super().__init__()
+        self.profiler = profiler
+
+    def on_train_batch_end(self, batch, logs=None):
+        self.profiler._end_step()
+
+    def on_epoch_end(self, epoch, logs=None):
+        self.profiler._end_epoch()
+
+
+class StepProfiler(keras.callbacks.Callback):
+    """
+    Break the duration of each training step down into phases and optionally capture a
+    TensorFlow profiler trace of a window of steps.
+
+    Each step is split into:
+    - 'data_wait': waiting for the next batch from the input pipeline.
+    - 'compute': the compiled train step (forward and backward pass, optimizer update and
+      pruning mask update).
+    - 'callbacks': the per-step work of the callbacks placed between this callback and
+      `end_callback` (EdgeTrain's controller, logging, compile cache, pruning step and
+      accumulated gradient updates).
+
+    The work of the same callbacks at the end of each epoch (e.g. per-epoch decisions) is
+    timed as 'epoch_callbacks'. Durations are counted in log-spaced histograms
+    (see `TimingHistogram`) and a summary is written to `output_file` at the end of every
+    `fit` call.
+
+    Call `attach(model)` once after compiling the model (and again after rebuilding it):
+    its train function then reads batches through an iterator that times each fetch. Place
+    this callback first and `end_callback` last in the callback list.
+
+    Parameters:
+    - output_file (str, optional): JSON file the summary is written to.
+    - profile_steps (tuple of int, optional): First and last training step (counted from
+      0 over all `fit` calls) of the TensorFlow profiler trace. None disables tracing.
+    - profile_dir (str, optional): Directory of the profiler trace (open it with
+      TensorBoard's profile plugin).
+
+    Attributes:
+    - histograms (dict): One `TimingHistogram` per step phase and for 'epoch_callbacks'.
+    - step_count (int): Number of training steps timed.
+    - end_callback (keras.callbacks.Callback): Callback marking the end of the timed
+      callback work.
+    """
+
+    def __init__(self, output_file=None, profile_steps=None, profile_dir=None):
+        super().__init__()
+        if profile_steps is not None and profile_dir is None:
+            raise ValueError("A profiler trace needs a profile_dir.")
+        self.output_file = output_file
+        self.profile_steps = profile_steps
+        self.profile_dir = profile_dir
+        self.histograms = {
+            phase: TimingHistogram() for phase in STEP_PHASES + ("epoch_callbacks",)
+        }
+        self.step_count = 0
+        self.end_callback = _StepEnd(self)
+        self._profiling = False
+        self._step_start = None
+        self._call_start = None
+        self._data_wait = 0.0
+        self._callbacks_start = None
+
+    def attach(self, model):
+        """
+        Wrap the train function of a compiled model so that the wait for each batch is
+        timed.
+
+        The Keras train function is kept as is (including `jit_compile` and
+        `steps_per_execution`); it reads its batches through a proxy iterator that times
+        each fetch from the input pipeline. Iterators of distribution strategies with
+        several replicas yield per-replica batches and are not proxied: their steps are
+        timed as compute only.
+
+        Parameters:
+        - model (tf.keras.Model): The compiled model.
+        """
+        profiler = self
+
+        def make_train_function(self, force=False):
+            if self.train_function is not None and not force:
+                return self.train_function
+            keras_train_function = type(self).make_train_function(self, force=force)
+            single_replica = self.distribute_strategy.num_replicas_in_sync == 1
+            proxies = {}
+
+            def train_function(iterator):
+                profiler._call_start = time.perf_counter()
+                if not isinstance(iterator, tf.data.Iterator) and not (
+                    single_replica
+                    and isinstance(iterator, tf.distribute.DistributedIterator)
+                ):
+                    return keras_train_function(iterator)
+                if proxies.get("source") is not iterator:
+                    # Keras opens a new iterator every epoch
+                    proxies.update(source=iterator, proxy=profiler._timed(iterator))
+                return keras_train_function(proxies["proxy"])
+
+            # Lets the compile cache detect retracing
+            if hasattr(keras_train_function, "experimental_get_tracing_count"):
+                train_function.experimental_get_tracing_count = (
+                    keras_train_function.experimental_get_tracing_count
+                )
+            self.train_function = train_function
+            return train_function
+
+        model.make_train_function = types.MethodType(make_train_function, model)
+        model.train_function = None
+
+    def _timed(self, iterator):
+        # Iterator over the same elements, adding each fetch to the step's data wait
+        def elements():
+            while True:
+                start = time.perf_counter()
+                try:
+                    element = next(iterator)
+                except StopIteration:
+                    return
+                self._data_wait += time.perf_counter() - start
+                yield element
+
+        dataset = tf.data.Dataset.from_generator(
+            elements, output_signature=iterator.element_spec
+        )
+        return iter(dataset)
+
+    def _start_profiler(self):
+        tf.profiler.experimental.start(self.profile_dir)
+        self._profiling = True
+
+    def _stop_profiler(self):
+        if self._profiling:
+            tf.profiler.experimental.stop()
+            self._profiling = False
+
+    def on_train_batch_begin(self, batch, logs=None):
+        if self.profile_steps is not None and self.step_count == self.profile_steps[0]:
+            self._start_profiler()
+        self._call_start = None
+        self._data_wait = 0.0
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        self._callbacks_start = time.perf_counter()
+        if self._call_start is None:
+            # Train function not attached: the whole step counts as compute
+            self._call_start = self._step_start
+        self.histograms["data_wait"].add(self._data_wait)
+        self.histograms["compute"].add(
+            self._callbacks_start - self._call_start - self._data_wait
+        )
+
+    def _end_step(self):
+        # Begin hooks of the other callbacks ran between the step start and the call
+        begin_time = self._call_start - self._step_start
+        end_time = time.perf_counter() - self._callbacks_start
+        self.histograms["callbacks"].add(begin_time + end_time)
+        if self.profile_steps is not None and self.step_count == self.profile_steps[1]:
+            self._stop_profiler()
+        self.step_count += 1
+
+    def on_epoch_end(self, epoch, logs=None):
+        self._callbacks_start = time.perf_counter()
+
+    def _end_epoch(self):
+        self.histograms["epoch_callbacks"].add(
+            time.perf_counter() - self._callbacks_start
+        )
+
+    def on_train_end(self, logs=None):
+        if self.output_file is not None:
+            self.save(self.output_file)
+
+    def summary(self):
+        """
+        Summarize the step timings.
+
+        Returns:
+        - dict: 'steps' (number of steps timed) and one histogram summary per phase (see
+          `TimingHistogram.summary`).
+        """
+        return {
+            "steps": self.step_count,
+            **{name: h.summary() for name, h in self.histograms.items()},
+        }
+
+    def save(self, path):
+        """
+        Write the summary to a JSON file.
+
+        Parameters:
+        - path (str): Path to the JSON file.
+        """
+        with open(path, "w") as f:
+            json.dump(self.summary(), f, indent=2)
+
+    def close(self):
+        """
+        Stop a profiler trace still running, e.g. when training ended inside the window.
+        """
+        self._stop_profiler()
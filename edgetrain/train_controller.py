@@ -0,0 +1,473 @@
+import copy
+import math
+import time
+
+from tensorflow import keras
+
+from edgetrain.adjust_train_parameters import (
+    adjust_precision,
+    adjust_training_parameters,
+    snap_batch_size,
+)
+from edgetrain.calculate_priorities import define_priorities
+from edgetrain.calculate_scores import compute_scores
+from edgetrain.create_model import PRECISION_POLICIES
+from edgetrain.gradient_accumulation import accumulation_steps_for
+from edgetrain.hyperparameters import set_optimizer_hyperparameters
+from edgetrain.resource_monitor import (
+    apply_memory_budget,
+    log_usage_once,
+    sys_resources,
+)
+
+# Decision state saved in checkpoints (see `get_state`)
+_STATE_ATTRIBUTES = (
+    "batch_size",
+    "lr",
+    "precision",
+    "effective_batch_size",
+    "accumulation_steps",
+    "prev_accuracy",
+    "normalized_scores",
+    "priority_value",
+    "epoch",
+    "throughput",
+    "batch_size_controller",
+    "log_count",
+)
+
+
+class EdgeTrainController(keras.callbacks.Callback):
+    """
+    Keras callback running the scores -> priorities -> adjustment pipeline inside `model.fit`.
+
+    The pipeline runs every `every_n_steps` training steps and/or every `every_seconds`
+    seconds. If neither is set, it runs once at the end of every epoch. Each decision is
+    written to the resource log.
+
+    Step time and throughput are measured on every training step (steps that compiled the
+    train function are left out) and averaged since the previous decision. They feed the
+    throughput score and are written to the resource log, together with the time it took
+    to first reach `target_accuracy`. The accuracy gain per second of training since the
+    previous decision feeds the time-to-accuracy score, until the target is reached.
+
+    Learning rate changes are pushed into the compiled optimizer in place and take effect
+    on the next training step. A new batch size cannot be applied to a running `fit` call,
+    so when the batch size changes the controller stops training at the end of the current
+    epoch and the caller resumes `fit` with `controller.batch_size` (see `dynamic_train`).
+
+    With an `effective_batch_size`, `batch_size` is the micro-batch size: adjustments change
+    it together with `accumulation_steps`, the number of micro-batches whose gradients are
+    accumulated per optimizer update (see `GradientAccumulator`), so that each update still
+    averages over `effective_batch_size` samples. The micro-batch never exceeds it.
+
+    With a `mixed_precision` policy, high memory pressure first switches the model from
+    float32 to that policy (see `adjust_precision`) before the batch size is halved. Like a
+    batch size change, a precision change stops training at the end of the epoch; the
+    caller rebuilds the model with `controller.precision`.
+
+    With a `coordinator` (multi-worker training), resource snapshots and step timings are
+    combined over all workers before each decision and the chief's decision is applied on
+    every worker (see `WorkerCoordinator`).
+
+    Parameters:
+    - batch_size (int): Initial batch size.
+    - lr (float): Initial learning rate.
+    - pruning (float): Pruning ratio (logged only).
+    - log_file (str or sink): Path to the log file where resource usage is saved, or an open log sink.
+    - sampler (ResourceSampler, optional): Source of resource snapshots. If None, system
+      resources are measured at each decision.
+    - every_n_steps (int, optional): Number of training steps between two decisions.
+    - every_seconds (float, optional): Number of seconds between two decisions.
+    - dynamic_adjustments (bool): If False, resource usage is logged but parameters are not changed.
+    - user_priorities (dict, optional): User-defined priorities passed to `define_priorities`.
+    - thresholds (dict, optional): Adjustment thresholds passed to `adjust_training_parameters`.
+    - batch_size_controller (BatchSizeController, optional): Rule choosing the next batch
+      size (see `adjust_training_parameters`). Defaults to the threshold rule; the
+      measured throughput only steers the batch size with an opt-in
+      `ThroughputBatchSizeController`.
+    - batch_buckets (iterable of int, optional): Allowed batch sizes. Adjusted batch sizes
+      are snapped to the closest bucket.
+    - train_function_cache (TrainFunctionCache, optional): Source of the retrace count and
+      compile time written to the resource log.
+    - target_accuracy (float): Training accuracy whose time to reach is logged.
+    - effective_batch_size (int, optional): Number of samples per optimizer update to keep
+      constant with gradient accumulation. None disables accumulation.
+    - precision (str): Initial Keras dtype policy of the model.
+    - mixed_precision (str, optional): Mixed policy the controller may switch to under
+      memory pressure ('mixed_float16' or 'mixed_bfloat16'). None disables switching.
+    - coordinator (WorkerCoordinator, optional): Coordinates decisions across the workers
+      of a multi-worker strategy. Decisions cannot be triggered by `every_seconds` then.
+    - memory_budget (int, optional): Memory (bytes) this process may use. Memory scores
+      and thresholds then apply to this process's memory as a percentage of the budget
+      instead of host-wide usage (see `apply_memory_budget`); the logged 'CPU RAM (%)'
+      and 'GPU RAM (%)' are the budget percentages. None uses host-wide percentages.
+    """
+
+    def __init__(
+        self,
+        batch_size,
+        lr,
+        pruning,
+        log_file,
+        sampler=None,
+        every_n_steps=None,
+        every_seconds=None,
+        dynamic_adjustments=True,
+        user_priorities=None,
+        thresholds=None,
+        batch_size_controller=None,
+        batch_buckets=None,
+        train_function_cache=None,
+        target_accuracy=0.9,
+        effective_batch_size=None,
+        precision="float32",
+        mixed_precision=None,
+        coordinator=None,
+        memory_budget=None,
+    ):
+        super().__init__()
+        if coordinator is not None and every_seconds:
+            raise ValueError(
+                "Time-based decisions differ between workers; use every_n_steps."
+            )
+        self.batch_size = batch_size
+        self.lr = lr
+        self.pruning = pruning
+        self.log_file = log_file
+        self.sampler = sampler
+        self.every_n_steps = every_n_steps
+        self.every_seconds = every_seconds
+        self.dynamic_adjustments = dynamic_adjustments
+        self.user_priorities = user_priorities
+        self.thresholds = thresholds
+        self.batch_size_controller = batch_size_controller
+        self.batch_buckets = batch_buckets
+        self.train_function_cache = train_function_cache
+        self.target_accuracy = target_accuracy
+        self.effective_batch_size = effective_batch_size
+        self.precision = precision
+        self.mixed_precision = mixed_precision
+        self.coordinator = coordinator
+        self.memory_budget = memory_budget
+        self.accumulation_steps = 1
+        if effective_batch_size:
+            self.batch_size = min(batch_size, effective_batch_size)
+            self.accumulation_steps = accumulation_steps_for(
+                self.batch_size, effective_batch_size
+            )
+
+        self.prev_accuracy = 0.0
+        self.normalized_scores = {
+            "memory_score": 0,
+            "accuracy_score": 0,
+            "throughput_score": 0,
+            "time_to_accuracy_score": 0,
+        }
+        self.priority_value = {"batch_size": 0, "learning_rate": 0}
+        self.epoch = 0
+        self.log_count = 0
+
+        self._fit_batch_size = self.batch_size
+        self._fit_precision = precision
+        self._steps_since_decision = 0
+        self._last_decision_time = time.monotonic()
+
+        self.throughput = {
+            "batch_size": self.batch_size,
+            "step_time": math.nan,
+            "samples_per_second": math.nan,
+            "best_samples_per_second": math.nan,
+            "time_to_accuracy": math.nan,
+            "accuracy_per_second": math.nan,
+            "best_accuracy_per_second": math.nan,
+        }
+        self._train_start = None
+        self._accuracy_start = None
+        self._step_start = None
+        self._step_compile_count = 0
+        self._timed_steps = 0
+        self._timed_samples = 0
+        self._timed_seconds = 0.0
+
+    def _resources(self):
+        if self.sampler is not None:
+            resources = self.sampler.latest()
+        else:
+            resources = sys_resources()
+        if self.memory_budget:
+            resources = apply_memory_budget(resources, self.memory_budget)
+        return resources
+
+    def _compile_count(self):
+        cache = self.train_function_cache
+        return cache.compile_count if cache is not None else 0
+
+    def measure_throughput(self, curr_accuracy):
+        """
+        Average the step timings since the previous decision into `self.throughput` and
+        measure the accuracy gain per second of training since then.
+
+        Parameters:
+        - curr_accuracy (float): Current training accuracy (0-1).
+        """
+        # Training time since the previous decision, unknown before training starts
+        elapsed = (
+            time.monotonic() - self._accuracy_start
+            if self._accuracy_start is not None
+            else math.nan
+        )
+        if self.coordinator is not None:
+            # Workers step together: the slowest one sets the cluster's throughput
+            steps, samples, seconds, elapsed = self.coordinator.maximum(
+                [self._timed_steps, self._timed_samples, self._timed_seconds, elapsed]
+            )
+            self._timed_steps, self._timed_samples = int(steps), int(samples)
+            self._timed_seconds = seconds
+
+        best = self.throughput["best_samples_per_second"]
+        if self._timed_steps:
+            samples_per_second = self._timed_samples / self._timed_seconds
+            self.throughput.update(
+                batch_size=self._fit_batch_size,
+                step_time=self._timed_seconds / self._timed_steps,
+                samples_per_second=samples_per_second,
+                best_samples_per_second=(
+                    samples_per_second
+                    if math.isnan(best)
+                    else max(best, samples_per_second)
+                ),
+            )
+        else:
+            self.throughput.update(step_time=math.nan, samples_per_second=math.nan)
+
+        # Wall time includes input waits, decisions and rebuilds: all delay the target
+        accuracy_per_second = (
+            max(0.0, curr_accuracy - self.prev_accuracy) / elapsed
+            if elapsed > 0
+            else math.nan
+        )
+        best = self.throughput["best_accuracy_per_second"]
+        if math.isnan(best) or accuracy_per_second > best:
+            best = accuracy_per_second
+        self.throughput.update(
+            accuracy_per_second=accuracy_per_second, best_accuracy_per_second=best
+        )
+        self._accuracy_start = time.monotonic()
+
+        if (
+            math.isnan(self.throughput["time_to_accuracy"])
+            and self._train_start is not None
+            and curr_accuracy >= self.target_accuracy
+        ):
+            self.throughput["time_to_accuracy"] = time.monotonic() - self._train_start
+
+        self._timed_steps = 0
+        self._timed_samples = 0
+        self._timed_seconds = 0.0
+
+    def log_usage(self, num_epoch, resources=None, accuracy=None):
+        """
+        Write the current scores, priorities and parameters to the resource log.
+
+        Parameters:
+        - num_epoch (int): Epoch number written to the log.
+        - resources (dict, optional): Resource snapshot to log. If None, a new one is taken.
+        - accuracy (float, optional): Training accuracy the decision was based on.
+        """
+        if resources is None:
+            resources = self._resources()
+        cache = self.train_function_cache
+        log_usage_once(
+            self.log_file,
+            self.pruning,
+            self.batch_size,
+            self.lr,
+            self.normalized_scores,
+            self.priority_value,
+            num_epoch=num_epoch,
+            resources=resources,
+            retrace_count=cache.retrace_count if cache is not None else 0,
+            compile_time=cache.compile_time if cache is not None else 0.0,
+            accuracy=accuracy,
+            throughput=self.throughput,
+            accumulation_steps=self.accumulation_steps,
+            precision=self.precision,
+        )
+        self.log_count += 1
+
+    def get_state(self):
+        """
+        Copy the decision state, e.g. to checkpoint it (see `TrainingCheckpoint`).
+
+        Returns:
+        - state (dict): Current parameters, previous accuracy, scores, priorities, throughput
+          measurements, batch size controller, number of logged records and training time.
+        """
+        state = {name: copy.deepcopy(getattr(self, name)) for name in _STATE_ATTRIBUTES}
+        state["train_time"] = (
+            time.monotonic() - self._train_start
+            if self._train_start is not None
+            else 0.0
+        )
+        return state
+
+    def set_state(self, state):
+        """
+        Restore a decision state copied by `get_state`. Training time keeps counting from
+        the restored value.
+
+        Parameters:
+        - state (dict): The decision state.
+        """
+        for name in _STATE_ATTRIBUTES:
+            setattr(self, name, copy.deepcopy(state[name]))
+        self._train_start = time.monotonic() - state["train_time"]
+        self._accuracy_start = time.monotonic()
+        self._fit_batch_size = self.batch_size
+        self._fit_precision = self.precision
+
+    def adjust(self, curr_accuracy):
+        """
+        Run one scores -> priorities -> adjustment decision and log it.
+
+        Parameters:
+        - curr_accuracy (float): Current training accuracy (0-1).
+        """
+        # Decide on and log the same resource snapshot so that decisions can be replayed
+        resources = self._resources()
+        if self.coordinator is not None:
+            resources = self.coordinator.aggregate_resources(resources)
+        self.measure_throughput(curr_accuracy)
+        if self.dynamic_adjustments:
+            # Compute scores & priorities
+            self.normalized_scores = compute_scores(
+                self.prev_accuracy,
+                curr_accuracy,
+                resources=resources,
+                throughput=self.throughput,
+            )
+            self.priority_value = define_priorities(
+                self.normalized_scores, self.user_priorities
+            )
+
+            # Switching to mixed precision relieves memory without shrinking batches
+            precision = adjust_precision(
+                self.priority_value,
+                self.precision,
+                resources=resources,
+                thresholds=self.thresholds,
+                mixed_precision=self.mixed_precision,
+            )
+            if precision != self.precision:
+                self.precision = precision
+            else:
+                # Adjust highest priority parameter
+                self.batch_size, self.lr = adjust_training_parameters(
+                    priority_values=self.priority_value,
+                    batch_size=self.batch_size,
+                    lr=self.lr,
+                    accuracy_score=curr_accuracy,
+                    resources=resources,
+                    thresholds=self.thresholds,
+                    batch_size_controller=self.batch_size_controller,
+                    buckets=self.batch_buckets,
+                    throughput=self.throughput,
+                )
+            if self.batch_buckets:
+                self.batch_size = snap_batch_size(self.batch_size, self.batch_buckets)
+            if self.effective_batch_size:
+                # Trade micro-batch size for accumulation steps at a fixed update size
+                self.batch_size = min(self.batch_size, self.effective_batch_size)
+                self.accumulation_steps = accumulation_steps_for(
+                    self.batch_size, self.effective_batch_size
+                )
+            if self.coordinator is not None:
+                self._apply_chief_decision()
+            self.apply_hyperparameters()
+
+            print(
+                f"Adjusted parameters: batch_size={self.batch_size}, accumulation_steps={self.accumulation_steps}, precision={self.precision}, pruning_ratio={self.pruning}, learning_rate={self.lr}"
+            )
+
+        # Log resource usage
+        self.log_usage(
+            num_epoch=self.epoch + 1, resources=resources, accuracy=curr_accuracy
+        )
+
+        # Update previous accuracy
+        self.prev_accuracy = curr_accuracy
+        self._steps_since_decision = 0
+        self._last_decision_time = time.monotonic()
+
+    def _apply_chief_decision(self):
+        # Every replica must train with the same parameters
+        batch_size, lr, precision, accumulation_steps = self.coordinator.broadcast(
+            [
+                self.batch_size,
+                self.lr,
+                PRECISION_POLICIES.index(self.precision),
+                self.accumulation_steps,
+            ]
+        )
+        self.batch_size, self.lr = int(batch_size), lr
+        self.precision = PRECISION_POLICIES[int(precision)]
+        self.accumulation_steps = int(accumulation_steps)
+
+    def apply_hyperparameters(self):
+        """
+        Push the current learning rate into the model's optimizer without recompiling.
+        """
+        set_optimizer_hyperparameters(self.model.optimizer, learning_rate=self.lr)
+
+    def _decision_due(self):
+        if self.every_n_steps and self._steps_since_decision >= self.every_n_steps:
+            return True
+        if (
+            self.every_seconds
+            and time.monotonic() - self._last_decision_time >= self.every_seconds
+        ):
+            return True
+        return False
+
+    def on_train_begin(self, logs=None):
+        if self._train_start is None:
+            self._train_start = time.monotonic()
+        if self._accuracy_start is None:
+            self._accuracy_start = time.monotonic()
+        self.apply_hyperparameters()
+        self._fit_batch_size = self.batch_size
+        self._fit_precision = self.precision
+        self._steps_since_decision = 0
+        self._last_decision_time = time.monotonic()
+
+    def on_epoch_begin(self, epoch, logs=None):
+        self.epoch = epoch
+
+    def on_train_batch_begin(self, batch, logs=None):
+        self._step_compile_count = self._compile_count()
+        self._step_start = time.perf_counter()
+
+    def on_train_batch_end(self, batch, logs=None):
+        # Steps that compiled the train function would skew the throughput
+        step_time = time.perf_counter() - self._step_start
+        if self._compile_count() == self._step_compile_count:
+            self._timed_steps += 1
+            self._timed_samples += self._fit_batch_size
+            self._timed_seconds += step_time
+
+        self._steps_since_decision += 1
+        if self._decision_due():
+            self.adjust(float(logs["accuracy"]))
+
+    def on_epoch_end(self, epoch, logs=None):
+        if not self.every_n_steps and not self.every_seconds:
+            self.adjust(float(logs["accuracy"]))
+
+        # The running fit call is bound to its batch size and model; hand control back
+        # to the caller
+        if (
+            self.batch_size != self._fit_batch_size
+            or self.precision != self._fit_precision
+        ):
+            self.model.stop_training = True
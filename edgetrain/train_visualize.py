@@ -1,31 +1,78 @@
+import os
+
 import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
+from matplotlib.ticker import FuncFormatter, MultipleLocator
 
 from edgetrain.edgetrain_folder import get_edgetrain_folder
+from edgetrain.log_reader import load_log, read_log_head_tail
+
+PLOTTED_COLUMNS = [
+    "Epoch #",
+    "CPU Usage (%)",
+    "GPU Usage (%)",
+    "CPU RAM (%)",
+    "GPU RAM (%)",
+    "Mem Score",
+    "Acc Score",
+    "Priority Batch Size",
+    "Priority Learning Rate",
+    "Batch Size",
+    "Learning Rate",
+    "Pruning",
+]
+
+
+def plot_prefix(log_file):
+    """
+    Build the file name prefix of the plots of a log file.
+
+    Parameters:
+    - log_file (str): The path to the log file.
 
+    Returns:
+    - str: The first two '_'-separated parts of the log file name (its timestamp).
+    """
+    return "_".join(os.path.basename(log_file).split("_")[:2])
 
-def log_usage_plot(log_file):
+
+def save_figure(fig, img_dir, name, formats=("png",)):
     """
-    Load the resource usage log from the CSV file and plot CPU and GPU usage,
-    as well as batch size and learning rate over time (epochs).
+    Save a figure in one or more formats.
 
     Parameters:
-    - log_file (str): The path to the log file (CSV format) that contains the resource usage data.
+    - fig (matplotlib.figure.Figure): The figure to save.
+    - img_dir (str): The output directory.
+    - name (str): The file name without extension.
+    - formats (iterable of str): File formats, e.g. 'png' or 'svg'.
 
     Returns:
-    - None
+    - list of str: The paths of the saved files.
     """
+    paths = []
+    for fmt in formats:
+        path = os.path.join(img_dir, f"{name}.{fmt}")
+        fig.savefig(path, format=fmt)
+        paths.append(path)
+    return paths
 
-    # Load the log file into a DataFrame
-    try:
-        df = pd.read_csv(log_file)
-    except FileNotFoundError:
-        print(f"Log file '{log_file}' not found.")
-        return
+
+def draw_resource_usage(fig, df):
+    """
+    Draw CPU and GPU usage, scores, priorities, and batch size and learning rate over
+    time (epochs) on a figure.
+
+    Parameters:
+    - fig (matplotlib.figure.Figure): The figure to draw on.
+    - df (pd.DataFrame): The resource usage log (see `PLOTTED_COLUMNS`).
+
+    Returns:
+    - fig (matplotlib.figure.Figure): The figure.
+    """
 
     # Plot CPU and GPU usage over time on the same plot with workers on a separate y axis
-    fig, ax1 = plt.subplots(5, 1, figsize=(7, 10), sharex=True)
+    ax1 = fig.subplots(5, 1, sharex=True)
 
     ax1[0].plot(
         df["Epoch #"],
@@ -138,18 +185,47 @@ def log_usage_plot(log_file):
 
     # Set x tick marks as integers every 5
     for ax in ax1:
-        ax.xaxis.set_major_locator(plt.MultipleLocator(5))
-        ax.xaxis.set_major_formatter(plt.FuncFormatter(lambda x, _: f"{int(x):d}"))
+        ax.xaxis.set_major_locator(MultipleLocator(5))
+        ax.xaxis.set_major_formatter(FuncFormatter(lambda x, _: f"{int(x):d}"))
+
+    fig.tight_layout()
+    return fig
 
-    plt.tight_layout()
-    plt.show()
-    fig.canvas.draw()
+
+def log_usage_plot(log_file, show=True, img_dir=None, formats=("png",)):
+    """
+    Load the resource usage log and plot CPU and GPU usage,
+    as well as batch size and learning rate over time (epochs).
+
+    Parameters:
+    - log_file (str): The path to the log file (CSV or `.npy` format) that contains the resource usage data.
+    - show (bool): Display the figure. Set to False on headless machines.
+    - img_dir (str, optional): The output directory. Defaults to the EdgeTrain images folder.
+    - formats (iterable of str): File formats of the saved figure, e.g. 'png' or 'svg'.
+
+    Returns:
+    - None
+    """
+
+    # Load only the plotted columns of the log file into a DataFrame
+    try:
+        df = load_log(log_file, columns=PLOTTED_COLUMNS)
+    except FileNotFoundError:
+        print(f"Log file '{log_file}' not found.")
+        return
+
+    fig = draw_resource_usage(plt.figure(figsize=(7, 10)), df)
+    if show:
+        plt.show()
 
     # Save the figure to the images folder
-    edgetrain_folder = get_edgetrain_folder()
-    img_dir = f"{edgetrain_folder}/images/"
-    timestamp = "_".join(log_file.split("/")[-1].split("_")[:2])
-    fig.savefig(f"{img_dir}/{timestamp}_resource_usage_plot.png")
+    if img_dir is None:
+        img_dir = os.path.join(get_edgetrain_folder(), "images")
+    save_figure(
+        fig, img_dir, f"{plot_prefix(log_file)}_resource_usage_plot", formats=formats
+    )
+    if not show:
+        plt.close(fig)
 
 
 def log_train_time(log_file):
@@ -157,24 +233,21 @@ def log_train_time(log_file):
     Calculate and print the total training time from the log file based on timestamps.
 
     Parameters:
-    - log_file (str): The path to the log file (CSV format) containing the timestamps.
+    - log_file (str): The path to the log file (CSV or `.npy` format) containing the timestamps.
 
     Returns:
     - total_training_time (timedelta): The total training time.
     """
-    # Load the log file into a DataFrame
+    # Read only the first and last records of the log file
     try:
-        df = pd.read_csv(log_file)
+        head, tail = read_log_head_tail(log_file)
     except FileNotFoundError:
         print(f"Log file '{log_file}' not found.")
         return
 
-    # Convert the 'Timestamp' column to datetime format
-    df["Timestamp"] = pd.to_datetime(df["Timestamp"])
-
     # Get the first and last timestamps from the log
-    start_time = df["Timestamp"].iloc[0]
-    end_time = df["Timestamp"].iloc[-1]
+    start_time = pd.to_datetime(head["Timestamp"].iloc[0])
+    end_time = pd.to_datetime(tail["Timestamp"].iloc[-1])
 
     # Calculate the total training time
     total_training_time = end_time - start_time
@@ -183,23 +256,22 @@ def log_train_time(log_file):
     return total_training_time
 
 
-def training_history_plot(history_list, log_file):
+def draw_training_history(fig, history_list):
     """
-    Plot the training loss and accuracy over epochs.
+    Draw the training loss and accuracy over epochs on a figure.
 
     Parameters:
+    - fig (matplotlib.figure.Figure): The figure to draw on.
     - history_list (list): List of dictionaries containing 'accuracy' and 'loss' for each epoch.
-      Example: [{'accuracy': 0.8, 'loss': 0.5}, {'accuracy': 0.85, 'loss': 0.4}, ...]
-    - log_file (str): The path to the log file (CSV format) that contains the resource usage data.
 
     Returns:
-    - None
+    - fig (matplotlib.figure.Figure): The figure.
     """
 
     accuracy_values = np.array([epoch["accuracy"][0] for epoch in history_list])
     loss_values = np.array([epoch["loss"][0] for epoch in history_list])
 
-    fig, ax1 = plt.subplots(figsize=(6, 4))
+    ax1 = fig.subplots()
 
     ax1.set_xlabel("Epochs")
     ax1.set_ylabel("Loss", color="red")
@@ -219,12 +291,37 @@ def training_history_plot(history_list, log_file):
     ax2.set_ylim(45, 105)
 
     fig.tight_layout()
-    plt.title("Training Loss and Accuracy")
-    plt.show()
-    fig.canvas.draw()
+    ax2.set_title("Training Loss and Accuracy")
+    return fig
+
+
+def training_history_plot(
+    history_list, log_file, show=True, img_dir=None, formats=("png",)
+):
+    """
+    Plot the training loss and accuracy over epochs.
+
+    Parameters:
+    - history_list (list): List of dictionaries containing 'accuracy' and 'loss' for each epoch.
+      Example: [{'accuracy': 0.8, 'loss': 0.5}, {'accuracy': 0.85, 'loss': 0.4}, ...]
+    - log_file (str): The path to the log file (CSV format) that contains the resource usage data.
+    - show (bool): Display the figure. Set to False on headless machines.
+    - img_dir (str, optional): The output directory. Defaults to the EdgeTrain images folder.
+    - formats (iterable of str): File formats of the saved figure, e.g. 'png' or 'svg'.
+
+    Returns:
+    - None
+    """
+
+    fig = draw_training_history(plt.figure(figsize=(6, 4)), history_list)
+    if show:
+        plt.show()
 
     # Save the figure to the images folder
-    edgetrain_folder = get_edgetrain_folder()
-    img_dir = f"{edgetrain_folder}/images/"
-    timestamp = "_".join(log_file.split("/")[-1].split("_")[:2])
-    fig.savefig(f"{img_dir}/{timestamp}_training_history_plot.png")
+    if img_dir is None:
+        img_dir = os.path.join(get_edgetrain_folder(), "images")
+    save_figure(
+        fig, img_dir, f"{plot_prefix(log_file)}_training_history_plot", formats=formats
+    )
+    if not show:
+        plt.close(fig)
@@ -0,0 +1,234 @@
+import inspect
+import itertools
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from edgetrain.edgetrain_folder import get_edgetrain_folder
+
+SUMMARY_COLUMNS = [
+    "Cores",
+    "Log File",
+    "Wall Time (s)",
+    "Final Accuracy",
+    "Peak Memory Growth (MiB)",
+    "Error",
+]
+
+# Core set of this worker process, assigned once by `_init_trial_worker`
+_worker_cores = None
+
+
+def _dynamic_train_parameters():
+    # Imported lazily: the parent process only schedules trials
+    from edgetrain.dynamic_train import dynamic_train
+
+    return set(inspect.signature(dynamic_train).parameters) - {"train_dataset"}
+
+
+def trial_grid(**values):
+    """
+    Build every combination of `dynamic_train` settings.
+
+    Parameters:
+    - **values (list): Candidate values keyed by a `dynamic_train` argument
+      (e.g. batch_size=[32, 64], dynamic_adjustments=[True, False]).
+
+    Returns:
+    - trials (list of dict): One dict of `dynamic_train` arguments per combination.
+    """
+    parameters = _dynamic_train_parameters()
+    for name in values:
+        if name not in parameters:
+            raise ValueError(f"Unknown dynamic_train parameter '{name}'.")
+    return [
+        dict(zip(values, combination))
+        for combination in itertools.product(*values.values())
+    ]
+
+
+def available_cores():
+    """
+    CPU cores this process may run on.
+
+    Returns:
+    - list of int: The sorted core ids.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def split_cores(cores, num_groups):
+    """
+    Split CPU cores into disjoint groups of (almost) equal size.
+
+    Parameters:
+    - cores (list of int): The core ids.
+    - num_groups (int): Number of groups. At most one group per core.
+
+    Returns:
+    - list of list of int: The core groups; the first groups get the leftover cores.
+    """
+    num_groups = max(1, min(num_groups, len(cores)))
+    size, extra = divmod(len(cores), num_groups)
+    groups, start = [], 0
+    for index in range(num_groups):
+        end = start + size + (index < extra)
+        groups.append(list(cores[start:end]))
+        start = end
+    return groups
+
+
+def _init_trial_worker(core_groups):
+    # Runs once in each spawned worker, before TensorFlow initializes its runtime
+    global _worker_cores
+    import tensorflow as tf
+
+    _worker_cores = core_groups.get()
+    if hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, _worker_cores)
+    tf.config.threading.set_intra_op_parallelism_threads(len(_worker_cores))
+    tf.config.threading.set_inter_op_parallelism_threads(len(_worker_cores))
+
+
+def run_trial(train_dataset, trial, log_file):
+    """
+    Train once with `dynamic_train` and measure the run.
+
+    Parameters:
+    - train_dataset (dict or str): The training data, as in `dynamic_train`.
+    - trial (dict): `dynamic_train` arguments of the trial.
+    - log_file (str): Path to the resource log of the trial.
+
+    Returns:
+    - result (dict): 'wall_time' (s), 'final_accuracy' (training accuracy of the last
+      epoch) and 'memory_growth' (peak RSS of the process during training above its RSS
+      at the start of the trial, in bytes).
+    """
+    from tensorflow import keras
+
+    from edgetrain.batch_finder import PeakMemoryMonitor
+    from edgetrain.dynamic_train import dynamic_train
+
+    # Worker processes are reused: start every trial from a fresh Keras state
+    keras.backend.clear_session()
+    start = time.perf_counter()
+    with PeakMemoryMonitor(interval=0.05) as monitor:
+        # Memory kept by earlier trials in this process is not charged to this one
+        start_memory = monitor.peak
+        _, history_list = dynamic_train(train_dataset, log_file=log_file, **trial)
+    wall_time = time.perf_counter() - start
+
+    final_accuracy = math.nan
+    if history_list:
+        final_accuracy = float(history_list[-1].get("accuracy", [math.nan])[0])
+    return {
+        "wall_time": wall_time,
+        "final_accuracy": final_accuracy,
+        "memory_growth": max(0, monitor.peak - start_memory),
+    }
+
+
+def _run_pinned_trial(train_dataset, trial, log_file):
+    # Entry point of each trial in a worker process
+    return {"cores": _worker_cores, **run_trial(train_dataset, trial, log_file)}
+
+
+def run_trials(
+    train_dataset, trials, log_dir=None, max_workers=None, cores=None, **kwargs
+):
+    """
+    Run several `dynamic_train` trials in parallel and summarize them.
+
+    Trials run in a pool of spawned worker processes. Each worker is pinned to its own
+    disjoint set of CPU cores (where the OS supports it) and caps the TensorFlow intra-
+    and inter-op threads to the size of its set, so concurrent trials do not compete for
+    cores. Workers are reused between trials, so memory is reported as the growth of a
+    trial above the worker's memory at its start. Each trial writes its own resource log
+    to `log_dir`. A trial that fails is reported and its measurements are left empty.
+
+    Parameters:
+    - train_dataset (dict or str): The training data, as in `dynamic_train`. Data are sent
+      to the workers with every trial, so pass a path for large datasets.
+    - trials (list of dict): `dynamic_train` arguments of each trial (see `trial_grid`).
+    - log_dir (str, optional): Directory of the trial logs, unless a trial sets its own
+      'log_file'. Defaults to a new 'trials_<timestamp>' folder in the EdgeTrain logs
+      folder.
+    - max_workers (int, optional): Number of concurrent trials. Defaults to one per trial,
+      and is limited to the number of cores.
+    - cores (list of int, optional): CPU cores shared out between the workers. Defaults to
+      the cores available to this process.
+    - **kwargs: `dynamic_train` arguments common to every trial (e.g. epochs). Trial
+      arguments take precedence.
+
+    Returns:
+    - summary (pd.DataFrame): One row per trial with its arguments, 'Cores', 'Log File',
+      'Wall Time (s)', 'Final Accuracy', 'Peak Memory Growth (MiB)' and 'Error' (empty
+      unless the trial failed).
+    """
+    if log_dir is None:
+        log_dir = os.path.join(
+            get_edgetrain_folder(), "logs", time.strftime("trials_%Y%m%d_%H%M%S")
+        )
+    os.makedirs(log_dir, exist_ok=True)
+    if cores is None:
+        cores = available_cores()
+    unavailable = set(cores) - set(available_cores())
+    if unavailable:
+        raise ValueError(f"Cores {sorted(unavailable)} are not available.")
+    if max_workers is None:
+        max_workers = len(trials)
+    core_groups = split_cores(cores, max_workers)
+
+    # Common and trial arguments of each trial; a trial may name its own log file
+    arguments = [{**kwargs, **trial} for trial in trials]
+    log_files = [
+        arguments[index].pop(
+            "log_file", os.path.join(log_dir, f"trial_{index:03d}_resource_log.csv")
+        )
+        for index in range(len(trials))
+    ]
+    rows = [
+        {"Trial": index, **trial, "Log File": log_file}
+        for index, (trial, log_file) in enumerate(zip(trials, log_files))
+    ]
+
+    # Spawn workers: forking a process that already runs TensorFlow threads is unsafe
+    context = multiprocessing.get_context("spawn")
+    groups = context.Queue()
+    for group in core_groups:
+        groups.put(group)
+    with ProcessPoolExecutor(
+        max_workers=len(core_groups),
+        mp_context=context,
+        initializer=_init_trial_worker,
+        initargs=(groups,),
+    ) as executor:
+        futures = {
+            executor.submit(
+                _run_pinned_trial, train_dataset, arguments[index], log_files[index]
+            ): index
+            for index in range(len(trials))
+        }
+        for future in as_completed(futures):
+            row = rows[futures[future]]
+            try:
+                result = future.result()
+            except Exception as e:
+                print(f"Trial {row['Trial']} failed: {e}")
+                row["Error"] = str(e)
+                continue
+            row["Cores"] = ",".join(str(core) for core in result["cores"])
+            row["Wall Time (s)"] = result["wall_time"]
+            row["Final Accuracy"] = result["final_accuracy"]
+            row["Peak Memory Growth (MiB)"] = result["memory_growth"] / 2**20
+            row["Error"] = ""
+
+    summary = pd.DataFrame(rows)
+    columns = [c for c in summary.columns if c not in SUMMARY_COLUMNS + ["log_file"]]
+    return summary.reindex(columns=columns + SUMMARY_COLUMNS)
@@ -6,7 +6,6 @@ setup(
     packages=find_packages(),
     install_requires=[
         "psutil>=5.0.0",
-        "GPUtil>=1.4.0",
         "matplotlib>=3.7.0",
         "pandas>=1.5.0",
         "pynvml>=8.0.0",
@@ -15,6 +14,12 @@ setup(
         "tensorflow-model-optimization==0.7.3",
         "jupyter",
     ],
+    entry_points={
+        "console_scripts": [
+            "edgetrain-report=edgetrain.report:main",
+            "edgetrain-benchmark=edgetrain.benchmarks:main",
+        ],
+    },
     extras_require={
         "dev": [
             "pytest",
@@ -0,0 +1,62 @@
+import types
+
+import numpy as np
+import pytest
+
+from edgetrain import gpu_backend
+
+MIB = 1024**2
+
+
+class FakeNVMLError(Exception):
+    pass
+
+
+def _fake_nvml_module(memory_used_mb, memory_total_mb, utilization):
+    """Build a stand-in for the `pynvml` module that records every call."""
+    calls = []
+
+    def record(name, result=None):
+        def fn(*args):
+            calls.append((name, args))
+            return result(*args) if callable(result) else result
+
+        return fn
+
+    nvml = types.ModuleType("pynvml")
+    nvml.calls = calls
+    nvml.NVMLError = FakeNVMLError
+    nvml.nvmlInit = record("nvmlInit")
+    nvml.nvmlShutdown = record("nvmlShutdown")
+    nvml.nvmlDeviceGetCount = record("nvmlDeviceGetCount", len(memory_used_mb))
+    nvml.nvmlDeviceGetHandleByIndex = record("nvmlDeviceGetHandleByIndex", lambda i: i)
+    nvml.nvmlDeviceGetMemoryInfo = record(
+        "nvmlDeviceGetMemoryInfo",
+        lambda i: types.SimpleNamespace(
+            used=memory_used_mb[i] * MIB,
+            total=memory_total_mb[i] * MIB,
+            free=(memory_total_mb[i] - memory_used_mb[i]) * MIB,
+        ),
+    )
+    nvml.nvmlDeviceGetUtilizationRates = record(
+        "nvmlDeviceGetUtilizationRates",
+        lambda i: types.SimpleNamespace(gpu=utilization[i], memory=0),
+    )
+    return nvml
+
+
+@pytest.fixture
+def fake_nvml():
+    # Two GPUs with 8 GB each; the process-wide backend is rebuilt around the fake
+    nvml = _fake_nvml_module([1000, 1200], [8000, 8000], [50, 70])
+    gpu_backend.shutdown_gpu_backend()
+    gpu_backend.get_gpu_backend(nvml=nvml)
+    yield nvml
+    gpu_backend.shutdown_gpu_backend()
+
+
+@pytest.fixture
+def data():
+    # 64 samples for the tiny model
+    rng = np.random.default_rng(0)
+    return rng.random((64, 4), dtype=np.float32), rng.integers(0, 3, 64)
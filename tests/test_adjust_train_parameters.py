@@ -1,6 +1,14 @@
 import pytest
 
-from edgetrain.adjust_train_parameters import adjust_training_parameters
+from edgetrain.adjust_train_parameters import (
+    DEFAULT_BATCH_BUCKETS,
+    HysteresisBatchSizeController,
+    ThresholdBatchSizeController,
+    ThroughputBatchSizeController,
+    adjust_precision,
+    adjust_training_parameters,
+    snap_batch_size,
+)
 
 
 @pytest.fixture
@@ -96,3 +104,162 @@ def test_no_adjustments_when_no_priorities(default_parameters):
     assert (
         adjusted_lr == params["lr"]
     ), "Learning rate should remain unchanged with no priorities."
+
+
+def test_adjust_batch_size_custom_thresholds(default_parameters):
+    # 70% memory is below the default high threshold, but above a custom one
+    sys_resources = {"cpu_memory_percent": 70, "gpu_memory_percent": 10}
+    params = default_parameters.copy()
+    params["priority_values"]["batch_size"] = 0.8  # Highest priority
+    params["resources"] = sys_resources
+
+    adjusted_batch_size, _ = adjust_training_parameters(**params)
+    assert adjusted_batch_size == 32, "Default thresholds should keep the batch size."
+
+    adjusted_batch_size, _ = adjust_training_parameters(
+        **params, thresholds={"memory_high": 65}
+    )
+    assert adjusted_batch_size == 16, "Custom high memory threshold ignored."
+
+
+def simulate_batch_sizes(controller, decisions=8):
+    # Memory usage jumps with the batch size: 32 -> 48.8%, 64 -> 77.6%
+    batch_size, batch_sizes = 32, []
+    for _ in range(decisions):
+        resources = {
+            "cpu_memory_percent": 20 + 0.9 * batch_size,
+            "gpu_memory_percent": 0,
+        }
+        batch_size, _ = adjust_training_parameters(
+            {"batch_size": 1.0, "learning_rate": 0.0},
+            batch_size,
+            1e-3,
+            0.5,
+            resources=resources,
+            batch_size_controller=controller,
+            buckets=DEFAULT_BATCH_BUCKETS,
+        )
+        batch_sizes.append(batch_size)
+    return batch_sizes
+
+
+def test_threshold_controller_is_default():
+    assert simulate_batch_sizes(None) == simulate_batch_sizes(
+        ThresholdBatchSizeController()
+    ), "The threshold rule should remain the default."
+    assert simulate_batch_sizes(None)[:4] == [
+        64,
+        32,
+        64,
+        32,
+    ], "The threshold rule oscillates in this scenario."
+
+
+def test_hysteresis_controller_stops_oscillations():
+    batch_sizes = simulate_batch_sizes(HysteresisBatchSizeController())
+    assert batch_sizes == [32] * 8, "Errors within the buckets should not switch."
+
+
+def test_hysteresis_controller_proportional_steps():
+    controller = HysteresisBatchSizeController(target=60, band=5, gain=2, cooldown=0)
+
+    low = {"cpu_memory_percent": 45, "gpu_memory_percent": 0}
+    assert controller.propose(32, low) == 42, "Step should be proportional."
+    high = {"cpu_memory_percent": 95, "gpu_memory_percent": 0}
+    assert controller.propose(64, high) == 32, "Steps should be at most halving."
+    ok = {"cpu_memory_percent": 63, "gpu_memory_percent": 0}
+    assert controller.propose(64, ok) == 64, "No change within the band."
+    assert (
+        controller.propose(32, low, buckets=DEFAULT_BATCH_BUCKETS) == 32
+    ), "Small steps should snap back to the current bucket."
+
+
+def test_hysteresis_controller_cooldown():
+    controller = HysteresisBatchSizeController(cooldown=2)
+    low = {"cpu_memory_percent": 20, "gpu_memory_percent": 0}
+
+    assert controller.propose(32, low) == 58, "First call should move."
+    assert controller.propose(58, low) == 58, "Cooldown should hold the batch size."
+    assert controller.propose(58, low) == 58, "Cooldown should hold the batch size."
+    assert controller.propose(58, low) == 104, "Cooldown should expire."
+
+    controller.propose(32, low)
+    controller.reset()
+    assert controller.propose(32, low) == 58, "Reset should clear the cooldown."
+
+
+def test_throughput_controller_finds_fastest_batch_size():
+    # Throughput peaks at 64; 128 exceeds the memory ceiling
+    samples_per_second = {16: 100.0, 32: 180.0, 64: 250.0, 128: 240.0}
+    memory = {16: 30.0, 32: 40.0, 64: 60.0, 128: 85.0}
+    controller = ThroughputBatchSizeController(memory_ceiling=75)
+
+    batch_size, batch_sizes = 16, []
+    for _ in range(6):
+        batch_size = controller.propose(
+            batch_size,
+            {"cpu_memory_percent": memory[batch_size], "gpu_memory_percent": 0},
+            buckets=DEFAULT_BATCH_BUCKETS,
+            throughput={"samples_per_second": samples_per_second[batch_size]},
+        )
+        batch_sizes.append(batch_size)
+
+    assert batch_sizes == [32, 64, 128, 64, 64, 64], "Should settle on the fastest."
+
+
+def test_throughput_controller_prefers_faster_smaller_batch():
+    controller = ThroughputBatchSizeController(memory_ceiling=75)
+    resources = {"cpu_memory_percent": 40.0, "gpu_memory_percent": 0}
+
+    assert (
+        controller.propose(32, resources, throughput={"samples_per_second": 200}) == 64
+    ), "Larger batches should be explored while the current one is the fastest."
+    assert (
+        controller.propose(64, resources, throughput={"samples_per_second": 150}) == 32
+    ), "Slower larger batches should be abandoned."
+    assert (
+        controller.propose(
+            32, resources, throughput={"samples_per_second": 210, "batch_size": 64}
+        )
+        == 64
+    ), "Throughput should be attributed to the measured batch size."
+
+
+def test_adjust_precision_on_high_memory():
+    priorities = {"batch_size": 0.8, "learning_rate": 0.2}
+    high = {"cpu_memory_percent": 80, "gpu_memory_percent": 0}
+    low = {"cpu_memory_percent": 40, "gpu_memory_percent": 0}
+
+    assert (
+        adjust_precision(priorities, "float32", resources=high) == "mixed_float16"
+    ), "High memory should switch to mixed precision."
+    assert (
+        adjust_precision(priorities, "float32", resources=low) == "float32"
+    ), "Low memory should keep float32."
+    assert (
+        adjust_precision(
+            {"batch_size": 0.2, "learning_rate": 0.8}, "float32", resources=high
+        )
+        == "float32"
+    ), "Precision only changes when batch size has the highest priority."
+    assert (
+        adjust_precision(priorities, "float32", resources=high, mixed_precision=None)
+        == "float32"
+    ), "Switching should be optional."
+    assert (
+        adjust_precision(
+            priorities,
+            "mixed_bfloat16",
+            resources=high,
+            mixed_precision="mixed_float16",
+        )
+        == "mixed_bfloat16"
+    ), "Mixed precision models should not switch again."
+
+
+def test_snap_batch_size():
+    buckets = (16, 32, 64, 128)
+    assert snap_batch_size(32, buckets) == 32, "Bucket sizes should be kept."
+    assert snap_batch_size(40, buckets) == 32, "Should snap to the closest bucket."
+    assert snap_batch_size(1000, buckets) == 128, "Should snap to the largest bucket."
+    assert snap_batch_size(48, buckets) == 32, "Ties should go to the smaller bucket."
@@ -0,0 +1,112 @@
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from edgetrain.batch_finder import PeakMemoryMonitor, find_batch_size
+
+MIB = 2**20
+
+
+def fake_probe(oom_from=None):
+    # 1 MiB per sample; throughput peaks at 64 samples per batch
+    def probe(batch_size):
+        return {
+            "batch_size": batch_size,
+            "memory_growth": batch_size * MIB,
+            "samples_per_second": 1000.0 - abs(batch_size - 64),
+            "step_time": 0.1,
+            "oom": oom_from is not None and batch_size >= oom_from,
+        }
+
+    return probe
+
+
+def test_find_batch_size_binary_search():
+    result = find_batch_size(None, None, memory_budget=100 * MIB, probe_fn=fake_probe())
+
+    probed = [trial["batch_size"] for trial in result["trials"]]
+    assert probed[:5] == [8, 16, 32, 64, 128], "Batch sizes should double first."
+    assert result["max_batch_size"] == 96, "Largest multiple of 8 under 100 MiB."
+    assert result["best_batch_size"] == 64, "Fastest fitting batch size expected."
+    assert len(probed) == len(set(probed)), "Batch sizes should be probed once."
+
+
+def test_find_batch_size_buckets_and_oom():
+    result = find_batch_size(
+        None,
+        None,
+        memory_budget=1000 * MIB,
+        buckets=(16, 32, 64, 128),
+        probe_fn=fake_probe(oom_from=128),
+    )
+
+    assert result["max_batch_size"] == 64, "Running out of memory should not fit."
+    assert result["best_batch_size"] == 64, "Fastest fitting bucket expected."
+
+    result = find_batch_size(None, None, memory_budget=MIB, probe_fn=fake_probe())
+    assert result["max_batch_size"] is None, "Nothing fits a tiny budget."
+    assert result["best_batch_size"] is None, "Nothing fits a tiny budget."
+
+
+def test_peak_memory_monitor():
+    values = iter([10, 50, 30] + [20] * 1000)
+    with PeakMemoryMonitor(interval=0.001, memory_fn=lambda: next(values)) as monitor:
+        while monitor.peak < 50:
+            pass
+    assert monitor.peak == 50, "Peak memory should be kept."
+
+
+def test_find_batch_size_on_cpu():
+    model = keras.Sequential(
+        [keras.layers.Input(shape=(8,)), keras.layers.Dense(4, activation="softmax")]
+    )
+    model.compile(optimizer="sgd", loss="sparse_categorical_crossentropy")
+    rng = np.random.default_rng(0)
+    dataset = tf.data.Dataset.from_tensor_slices(
+        (rng.random((50, 8), dtype=np.float32), rng.integers(0, 4, 50))
+    )
+
+    result = find_batch_size(
+        model, dataset, memory_budget=2**40, buckets=(8, 16, 32), steps=2
+    )
+
+    assert result["max_batch_size"] == 32, "All batch sizes fit a huge budget."
+    assert result["best_batch_size"] in (8, 16, 32), "Recommendation expected."
+    for trial in result["trials"]:
+        assert trial["samples_per_second"] > 0, "Throughput should be measured."
+        assert trial["memory_growth"] >= 0, "Memory growth should be measured."
+
+
+class RetainingModel:
+    """Stand-in model keeping 1 MiB per sample of every batch size it trains on."""
+
+    def __init__(self):
+        self.memory = 1000 * MIB
+        self.batch_sizes = set()
+
+    def train_on_batch(self, images, labels):
+        if len(images) not in self.batch_sizes:
+            self.batch_sizes.add(len(images))
+            self.memory += len(images) * MIB
+
+
+def test_find_batch_size_charges_memory_kept_by_earlier_probes():
+    model = RetainingModel()
+    dataset = tf.data.Dataset.from_tensor_slices(
+        (np.zeros((8, 2), dtype=np.float32), np.zeros(8, dtype=np.int64))
+    )
+
+    result = find_batch_size(
+        model,
+        dataset,
+        memory_budget=100 * MIB,
+        steps=1,
+        memory_fn=lambda: model.memory,
+    )
+
+    # 8 + 16 + 32 MiB are kept after the 32 probe; the 64 probe brings it to 120 MiB
+    growth = [trial["memory_growth"] // MIB for trial in result["trials"]]
+    assert growth[:4] == [8, 24, 56, 120], "Growth should count earlier probes."
+    assert (
+        result["max_batch_size"] == 32
+    ), "Kept memory should count against the budget."
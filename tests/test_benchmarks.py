@@ -0,0 +1,58 @@
+import json
+import os
+
+import pytest
+
+from edgetrain.benchmarks import compare_results, main, run_benchmarks
+
+
+def make_results(**values):
+    return {
+        "metrics": {
+            name: {"value": value, "unit": "", "higher_is_better": name != "latency"}
+            for name, value in values.items()
+        }
+    }
+
+
+def test_compare_results():
+    baseline = make_results(throughput=100.0, latency=1.0, removed=5.0)
+    results = make_results(throughput=70.0, latency=1.1, added=1.0)
+
+    comparison = {c["name"]: c for c in compare_results(results, baseline, 0.2)}
+
+    assert set(comparison) == {"throughput", "latency"}, "Only shared metrics compare."
+    assert comparison["throughput"]["regression"], "A 30 % slowdown is a regression."
+    assert comparison["throughput"]["change"] == pytest.approx(-0.3)
+    assert not comparison["latency"]["regression"], "10 % is within the tolerance."
+    assert comparison["latency"]["change"] < 0, "Higher latency is a slowdown."
+
+
+def test_run_benchmarks():
+    results = run_benchmarks(["decisions", "log_usage_once"], quick=True)
+
+    assert set(results["metrics"]) == {
+        "decisions.per_second",
+        "log_usage_once.csv_rows_per_second",
+        "log_usage_once.npy_rows_per_second",
+    }, "Unexpected metrics."
+    assert all(m["value"] > 0 for m in results["metrics"].values()), "Invalid value."
+    with pytest.raises(ValueError):
+        run_benchmarks(["unknown"])
+
+
+def test_main_flags_regressions(tmpdir):
+    output = os.path.join(tmpdir, "results.json")
+    baseline = os.path.join(tmpdir, "baseline.json")
+    with open(baseline, "w") as f:
+        json.dump(make_results(**{"decisions.per_second": 1e12}), f)
+
+    assert main(["--only", "decisions", "--quick", "-o", output]) == 0
+    with open(output) as f:
+        assert "decisions.per_second" in json.load(f)["metrics"]
+    assert (
+        main(["--only", "decisions", "--quick", "-o", output, "-b", baseline]) == 1
+    ), "A slower run than the baseline should fail."
+    # Any throughput is within a 100 % tolerance
+    args = ["--only", "decisions", "--quick", "-o", output, "-b", output, "-t", "1"]
+    assert main(args) == 0, "A run within the tolerance should pass."
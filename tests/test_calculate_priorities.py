@@ -60,3 +60,39 @@ def test_define_priorities_with_extreme_scores():
     assert (
         priority_value["learning_rate"] == 0.60
     ), "Learning rate priority with extreme scores failed."
+
+
+def test_define_priorities_with_throughput_drop():
+    normalized_scores = {
+        "memory_score": 0.5,
+        "accuracy_score": 0.5,
+        "throughput_score": 0.5,
+    }
+
+    priority_value = define_priorities(normalized_scores)
+
+    # Default priorities: 0.4 * 0.5 + 0.2 * 0.5
+    assert priority_value["batch_size"] == pytest.approx(
+        0.3, rel=1e-3
+    ), "Throughput drops should raise the batch size priority."
+    assert priority_value["learning_rate"] == pytest.approx(
+        0.3, rel=1e-3
+    ), "Learning rate priority should not depend on throughput."
+
+
+def test_define_priorities_with_stalled_accuracy():
+    normalized_scores = {
+        "memory_score": 0.5,
+        "accuracy_score": 0.5,
+        "time_to_accuracy_score": 0.5,
+    }
+
+    priority_value = define_priorities(normalized_scores)
+
+    # Default priorities: 0.6 * 0.5 + 0.2 * 0.5
+    assert priority_value["learning_rate"] == pytest.approx(
+        0.4, rel=1e-3
+    ), "Stalling accuracy should raise the learning rate priority."
+    assert priority_value["batch_size"] == pytest.approx(
+        0.2, rel=1e-3
+    ), "Batch size priority should not depend on time to accuracy."
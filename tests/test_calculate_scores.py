@@ -1,6 +1,11 @@
 import pytest
 
-from edgetrain.calculate_scores import compute_scores, normalize_scores
+from edgetrain.calculate_scores import (
+    compute_scores,
+    normalize_scores,
+    throughput_score,
+    time_to_accuracy_score,
+)
 
 
 def test_normalize_scores():
@@ -92,3 +97,40 @@ def test_compute_scores_with_acc_improvement():
     assert scores["accuracy_score"] == pytest.approx(
         0.80, rel=1e-3
     ), "Accuracy score normalization with custom range failed."
+
+
+def test_throughput_score():
+    assert throughput_score(100.0, 100.0) == 0, "Best throughput should score 0."
+    assert throughput_score(25.0, 100.0) == 0.75, "Throughput drop score mismatch."
+    assert throughput_score(float("nan"), 100.0) == 0, "Unknown throughput scores 0."
+    assert throughput_score(50.0, float("nan")) == 0, "Unknown best scores 0."
+
+    mock_resources = {"num_gpus": 0, "cpu_memory_percent": 50}
+    scores = compute_scores(
+        0.5,
+        0.5,
+        resources=mock_resources,
+        throughput={"samples_per_second": 60.0, "best_samples_per_second": 80.0},
+    )
+    assert scores["throughput_score"] == 0.25, "Throughput score mismatch."
+    scores = compute_scores(0.5, 0.5, resources=mock_resources)
+    assert scores["throughput_score"] == 0, "No throughput should score 0."
+
+
+def test_time_to_accuracy_score():
+    assert time_to_accuracy_score(0.01, 0.01) == 0, "Best accuracy gain should score 0."
+    assert time_to_accuracy_score(0.0, 0.01) == 1, "Stalled accuracy should score 1."
+    assert time_to_accuracy_score(0.0, 0.01, True) == 0, "Reached target scores 0."
+    assert time_to_accuracy_score(float("nan"), 0.01) == 0, "Unknown gain scores 0."
+
+    mock_resources = {"num_gpus": 0, "cpu_memory_percent": 50}
+    throughput = {
+        "accuracy_per_second": 0.002,
+        "best_accuracy_per_second": 0.008,
+        "time_to_accuracy": float("nan"),
+    }
+    scores = compute_scores(0.5, 0.5, resources=mock_resources, throughput=throughput)
+    assert scores["time_to_accuracy_score"] == 0.75, "Time-to-accuracy score mismatch."
+    throughput["time_to_accuracy"] = 30.0
+    scores = compute_scores(0.5, 0.5, resources=mock_resources, throughput=throughput)
+    assert scores["time_to_accuracy_score"] == 0, "Reached target should score 0."
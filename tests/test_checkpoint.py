@@ -0,0 +1,139 @@
+import csv
+import os
+import types
+
+import numpy as np
+from tensorflow import keras
+
+from edgetrain.checkpoint import (
+    TrainingCheckpoint,
+    get_training_state,
+    load_checkpoint,
+    set_training_state,
+)
+from edgetrain.train_controller import EdgeTrainController
+
+BATCH_SIZE_PRIORITY = {"batch_size_adjustment": 1.0, "accuracy_improvement": 0.0}
+LOW_MEMORY = {
+    "num_gpus": 0,
+    "cpu_compute_percent": 20.0,
+    "cpu_memory_percent": 10.0,
+    "gpu_compute_percent": 0,
+    "gpu_memory_percent": 0,
+}
+
+
+def make_tiny_model(optimizer):
+    model = keras.Sequential(
+        [
+            keras.layers.Input(shape=(4,)),
+            keras.layers.Dense(3, activation="softmax"),
+        ]
+    )
+    model.compile(
+        optimizer=optimizer,
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def make_controller(log_file, **kwargs):
+    sampler = types.SimpleNamespace(latest=lambda: dict(LOW_MEMORY))
+    return EdgeTrainController(
+        batch_size=16,
+        lr=1e-3,
+        pruning=0.0,
+        log_file=log_file,
+        sampler=sampler,
+        **kwargs,
+    )
+
+
+def read_log(log_file):
+    with open(log_file, "r") as f:
+        return list(csv.DictReader(f))
+
+
+def test_training_state_round_trip(data):
+    source = make_tiny_model(keras.optimizers.Adam())
+    source.fit(*data, batch_size=16, epochs=1, verbose=0)
+
+    target = make_tiny_model(keras.optimizers.Adam())
+    set_training_state(target, get_training_state(source))
+
+    for expected, actual in zip(source.get_weights(), target.get_weights()):
+        np.testing.assert_array_equal(actual, expected)
+    assert target.optimizer.iterations.numpy() == 4, "Optimizer steps not restored."
+    for expected, actual in zip(source.optimizer.variables, target.optimizer.variables):
+        np.testing.assert_array_equal(actual.numpy(), expected.numpy())
+
+
+def test_loss_scale_round_trip(data):
+    source = make_tiny_model(
+        keras.mixed_precision.LossScaleOptimizer(keras.optimizers.Adam())
+    )
+    source.fit(*data, batch_size=16, epochs=1, verbose=0)
+    source.optimizer.dynamic_counter.assign(7)
+
+    target = make_tiny_model(
+        keras.mixed_precision.LossScaleOptimizer(keras.optimizers.Adam())
+    )
+    set_training_state(target, get_training_state(source))
+
+    assert target.optimizer.dynamic_counter.numpy() == 7, "Loss scale counter lost."
+    assert target.optimizer.loss_scale.numpy() == source.optimizer.loss_scale.numpy()
+    assert target.optimizer.iterations.numpy() == 4, "Optimizer steps not restored."
+
+
+def test_controller_state_round_trip(tmpdir):
+    controller = make_controller(
+        os.path.join(tmpdir, "log.csv"), user_priorities=BATCH_SIZE_PRIORITY
+    )
+    controller.apply_hyperparameters = lambda: None
+    controller.adjust(0.4)
+    state = controller.get_state()
+
+    restored = make_controller(
+        os.path.join(tmpdir, "log.csv"), user_priorities=BATCH_SIZE_PRIORITY
+    )
+    restored.set_state(state)
+
+    assert restored.batch_size == controller.batch_size == 32, "Batch size mismatch."
+    assert restored.prev_accuracy == 0.4, "Previous accuracy mismatch."
+    assert restored.log_count == 1, "Log position mismatch."
+
+
+def test_training_checkpoint(tmpdir, data):
+    log_file = os.path.join(tmpdir, "log.csv")
+    checkpoint_path = os.path.join(tmpdir, "checkpoint.pkl")
+    model = make_tiny_model(keras.optimizers.Adam())
+    controller = make_controller(log_file, user_priorities=BATCH_SIZE_PRIORITY)
+    checkpoint = TrainingCheckpoint(
+        checkpoint_path, controller, every_n_epochs=2, log_start=5
+    )
+
+    model.fit(
+        *data, batch_size=16, epochs=3, callbacks=[controller, checkpoint], verbose=0
+    )
+
+    # Epochs 1 and 3 do not checkpoint; the decision of epoch 1 stops fit
+    assert checkpoint.checkpoint_count == 0, "Only every second epoch checkpoints."
+    model.fit(
+        *data,
+        batch_size=controller.batch_size,
+        epochs=3,
+        initial_epoch=1,
+        callbacks=[controller, checkpoint],
+        verbose=0,
+    )
+    assert checkpoint.checkpoint_count == 1, "Epoch 2 should checkpoint."
+
+    saved = load_checkpoint(checkpoint_path)
+    assert saved["epoch"] == 2, "Checkpoint epoch mismatch."
+    assert len(saved["history"]) == 2, "One history entry per epoch."
+    assert saved["controller"]["log_count"] == 2, "Controller state mismatch."
+    assert saved["log_records"] == 7, "Log position should include earlier records."
+    assert len(read_log(log_file)) == 2, "One record per decision."
+    assert not os.path.exists(f"{checkpoint_path}.tmp"), "Temporary file left."
+    assert load_checkpoint(os.path.join(tmpdir, "missing.pkl")) is None
@@ -0,0 +1,50 @@
+import tensorflow as tf
+
+from edgetrain.compile_cache import TrainFunctionCache
+
+
+def make_tiny_model():
+    model = tf.keras.Sequential(
+        [
+            tf.keras.layers.Input(shape=(4,)),
+            tf.keras.layers.Dense(3, activation="softmax"),
+        ]
+    )
+    model.compile(
+        optimizer="sgd", loss="sparse_categorical_crossentropy", metrics=["accuracy"]
+    )
+    return model
+
+
+def batches(data, batch_size):
+    dataset = tf.data.Dataset.from_tensor_slices(data)
+    return dataset.batch(batch_size, drop_remainder=True)
+
+
+def test_each_bucket_is_compiled_once(data):
+    model = make_tiny_model()
+    cache = TrainFunctionCache()
+
+    for batch_size in (4, 8, 4, 8):
+        cache.activate(model, batch_size)
+        model.fit(batches(data, batch_size), epochs=1, callbacks=[cache], verbose=0)
+
+    assert cache.compile_count == 2, "Each batch size should be compiled once."
+    assert cache.retrace_count == 1, "Only the second bucket is a retrace."
+    assert cache.compile_time > 0, "Compile time should be measured."
+
+
+def test_activate_restores_train_function(data):
+    model = make_tiny_model()
+    cache = TrainFunctionCache()
+
+    cache.activate(model, 4)
+    model.fit(batches(data, 4), epochs=1, verbose=0)
+    train_function = model.train_function
+
+    cache.activate(model, 8)
+    assert model.train_function is None, "A new bucket should get a new function."
+    model.fit(batches(data, 8), epochs=1, verbose=0)
+
+    cache.activate(model, 4)
+    assert model.train_function is train_function, "Cached function not restored."
@@ -1,7 +1,15 @@
+import numpy as np
 import pytest
-from tensorflow.keras import models
+import tensorflow as tf
+from tensorflow.keras import layers, models
 
-from edgetrain.create_model import create_model_tf
+from edgetrain.create_model import (
+    _count_near_zero,
+    check_sparsity,
+    create_model_tf,
+    precision_optimizer,
+    sparsity_report,
+)
 
 
 def test_create_model_without_path():
@@ -29,3 +37,82 @@ def test_create_model_invalid_input_shape():
     # Test that a ValueError is raised when input_shape is None.
     with pytest.raises(ValueError, match="Input shape must be defined."):
         create_model_tf(None)
+
+
+@pytest.mark.parametrize("precision", ["mixed_float16", "mixed_bfloat16"])
+def test_create_model_mixed_precision(precision):
+    model = create_model_tf((28, 28, 1), precision=precision)
+
+    assert model.layers[0].compute_dtype == precision.split("_")[1], "16-bit compute."
+    assert all(
+        w.dtype == tf.float32 for w in model.weights
+    ), "Weights should stay in float32."
+    assert model.output.dtype == tf.float32, "The softmax should compute in float32."
+
+    optimizer = precision_optimizer(tf.keras.optimizers.Adam(), precision)
+    assert isinstance(optimizer, tf.keras.mixed_precision.LossScaleOptimizer) == (
+        precision == "mixed_float16"
+    ), "Only float16 needs loss scaling."
+
+
+def test_create_model_invalid_precision():
+    with pytest.raises(ValueError, match="Unknown precision"):
+        create_model_tf((28, 28, 1), precision="float8")
+
+
+def make_sparse_model():
+    model = models.Sequential(
+        [
+            layers.Input(shape=(4,)),
+            layers.Dense(4, name="dense_a"),
+            layers.Dense(2, name="dense_b"),
+        ]
+    )
+    kernel_a, bias_a = model.get_layer("dense_a").get_weights()
+    kernel_a[:2] = 0.0
+    kernel_a[2, 0] = 1e-9
+    model.get_layer("dense_a").set_weights([kernel_a, np.ones_like(bias_a)])
+    return model
+
+
+def test_sparsity_report_matches_numpy():
+    model = make_sparse_model()
+
+    report = sparsity_report(model)
+    expected = [
+        (np.sum(np.isclose(w.numpy(), 0)), w.numpy().size)
+        for layer in model.layers
+        for w in layer.weights
+    ]
+    zeros, total = np.sum(expected, axis=0)
+    assert report["zeros"] == zeros, "Global zero count mismatch."
+    assert report["total"] == total, "Global parameter count mismatch."
+    assert check_sparsity(model) == pytest.approx(zeros / total), "Sparsity mismatch."
+
+    # 9 of 20 parameters in dense_a; only the zero bias of dense_b (2 of 10)
+    assert report["layers"]["dense_a"]["zeros"] == 9, "Layer zero count mismatch."
+    assert report["layers"]["dense_a"]["total"] == 20, "Layer size mismatch."
+    assert report["layers"]["dense_b"]["zeros"] == 2, "Layer zero count mismatch."
+
+
+def test_sparsity_report_tolerance_does_not_retrace():
+    model = make_sparse_model()
+
+    sparsity_report(model, tol=1e-8)
+    tracing_count = _count_near_zero.experimental_get_tracing_count()
+    report = sparsity_report(model, tol=0.0)
+
+    assert report["layers"]["dense_a"]["zeros"] == 8, "Tolerance should be respected."
+    assert (
+        _count_near_zero.experimental_get_tracing_count() == tracing_count
+    ), "Changing the tolerance should not retrace."
+
+
+def test_sparsity_report_skips_integer_weights():
+    model = make_sparse_model()
+    model.get_layer("dense_b").add_weight(
+        name="step", shape=(), dtype=tf.int64, initializer="zeros", trainable=False
+    )
+
+    report = sparsity_report(model)
+    assert report["layers"]["dense_b"]["total"] == 10, "Integer weights counted."
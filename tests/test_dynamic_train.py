@@ -0,0 +1,159 @@
+import csv
+import json
+import os
+
+import numpy as np
+import pytest
+
+from edgetrain.checkpoint import load_checkpoint
+from edgetrain.dynamic_train import dynamic_train, dynamic_train_multi_worker
+from edgetrain.step_profiler import step_timing_file
+
+
+def read_log(log_file):
+    with open(log_file, "r") as f:
+        return list(csv.DictReader(f))
+
+
+@pytest.fixture
+def train_data():
+    # 128 MNIST-shaped samples
+    rng = np.random.default_rng(0)
+    return {
+        "images": rng.random((128, 28, 28, 1), dtype=np.float32),
+        "labels": rng.integers(0, 10, 128),
+    }
+
+
+def test_auto_batch_size_keeps_one_shot_generators(tmpdir, train_data):
+    log_file = os.path.join(tmpdir, "log.csv")
+    images, labels = train_data["images"], train_data["labels"]
+
+    dynamic_train(
+        (sample for sample in zip(images, labels)),
+        epochs=1,
+        batch_size="auto",
+        log_file=log_file,
+        dynamic_adjustments=False,
+        shuffle_buffer=0,
+        batch_buckets=(16, 32),
+        step_timing=True,
+    )
+
+    # The probe must not consume samples the first epoch trains on
+    batch_size = int(read_log(log_file)[0]["Batch Size"])
+    with open(step_timing_file(log_file)) as f:
+        steps = json.load(f)["steps"]
+    assert batch_size in (16, 32), "The probe should pick a bucket."
+    assert steps == 128 // batch_size, "The epoch should see every sample."
+
+
+# Memory pressure without filling the machine: any process exceeds a 1 byte budget
+HIGH_MEMORY = {
+    "memory_budget": 1,
+    "user_priorities": {"batch_size_adjustment": 1.0, "accuracy_improvement": 0.0},
+}
+
+
+def test_dynamic_train_switches_precision_on_high_memory(tmpdir, train_data):
+    log_file = os.path.join(tmpdir, "log.csv")
+
+    final_model, history_list = dynamic_train(
+        train_data,
+        epochs=2,
+        batch_size=32,
+        log_file=log_file,
+        mixed_precision="mixed_bfloat16",
+        **HIGH_MEMORY,
+    )
+
+    # The first decision switches precision, the second one halves the batch size
+    rows = read_log(log_file)
+    assert [row["Precision"] for row in rows] == [
+        "float32",
+        "mixed_bfloat16",
+        "mixed_bfloat16",
+    ], "Precision should switch once."
+    assert [row["Batch Size"] for row in rows] == ["32", "32", "16"], "Batch sizes."
+    assert len(history_list) == 2, "Training should continue after the switch."
+    assert final_model.layers[0].compute_dtype == "bfloat16", "Model not rebuilt."
+
+
+def test_dynamic_train_accumulates_gradients(tmpdir, train_data):
+    log_file = os.path.join(tmpdir, "log.csv")
+
+    dynamic_train(
+        train_data,
+        epochs=2,
+        batch_size=64,
+        log_file=log_file,
+        gradient_accumulation=True,
+        **HIGH_MEMORY,
+    )
+
+    # Halving micro-batches keep 64 samples per update
+    rows = read_log(log_file)
+    assert [row["Batch Size"] for row in rows] == ["64", "32", "16"], "Batch sizes."
+    assert [row["Accumulation Steps"] for row in rows] == [
+        "1",
+        "2",
+        "4",
+    ], "Accumulation should make up for smaller micro-batches."
+
+
+def test_dynamic_train_resumes_from_checkpoint(tmpdir, train_data):
+    log_file = os.path.join(tmpdir, "log.csv")
+    checkpoint_path = os.path.join(tmpdir, "checkpoint.pkl")
+    kwargs = {
+        "batch_size": 64,
+        "log_file": log_file,
+        "mixed_precision": "mixed_float16",
+        "checkpoint_path": checkpoint_path,
+        **HIGH_MEMORY,
+    }
+
+    dynamic_train(train_data, epochs=2, **kwargs)
+    checkpoint = load_checkpoint(checkpoint_path)
+    assert checkpoint["epoch"] == 2, "The last epoch should be checkpointed."
+    assert checkpoint["model"]["loss_scale"], "The loss scale should be saved."
+
+    _, history_list = dynamic_train(train_data, epochs=3, resume=True, **kwargs)
+
+    # Only the third epoch runs, from the saved batch size and precision
+    rows = read_log(log_file)
+    assert [row["Epoch #"] for row in rows] == ["0", "1", "2", "3"], "Epochs."
+    assert [row["Batch Size"] for row in rows] == ["64", "64", "32", "16"], "Sizes."
+    assert rows[-1]["Precision"] == "mixed_float16", "Precision should be restored."
+    assert len(history_list) == 3, "History should include the resumed epochs."
+
+
+def test_dynamic_train_multi_worker(tmpdir, train_data):
+    log_file = os.path.join(tmpdir, "log.csv")
+
+    history_list = dynamic_train_multi_worker(
+        train_data,
+        num_workers=2,
+        timeout=600,
+        epochs=2,
+        batch_size=64,
+        log_file=log_file,
+        gradient_accumulation=True,
+        mixed_precision="mixed_bfloat16",
+        **HIGH_MEMORY,
+    )
+
+    # Every worker applies the chief's decisions: switch precision, then halve
+    assert len(history_list) == 2, "The chief's history should cover every epoch."
+    for worker_log in [log_file, os.path.join(tmpdir, "log.worker1.csv")]:
+        rows = read_log(worker_log)
+        assert [row["Batch Size"] for row in rows] == ["64", "64", "32"], worker_log
+        assert [row["Accumulation Steps"] for row in rows] == [
+            "1",
+            "1",
+            "2",
+        ], worker_log
+        assert [row["Precision"] for row in rows] == [
+            "float32",
+            "mixed_bfloat16",
+            "mixed_bfloat16",
+        ], worker_log
@@ -0,0 +1,59 @@
+import pytest
+
+from edgetrain import gpu_backend
+from edgetrain.gpu_backend import CpuOnlyBackend, NvmlBackend, get_gpu_backend
+
+
+def test_nvml_backend_reads_metrics(fake_nvml):
+    backend = NvmlBackend(fake_nvml)
+
+    metrics = backend.read()
+    assert metrics["num_gpus"] == 2, "GPU count mismatch."
+    assert metrics["gpu_compute_percent"] == 60, "GPU utilization should be averaged."
+    assert metrics["gpu_memory_usage"] == 2200, "GPU memory usage should be in MB."
+    assert metrics["gpu_memory_total"] == 16000, "GPU memory total should be in MB."
+    assert metrics["gpu_memory_percent"] == pytest.approx(0.1375)
+
+
+def test_nvml_backend_close_is_idempotent(fake_nvml):
+    backend = NvmlBackend(fake_nvml)
+    fake_nvml.calls.clear()
+    backend.close()
+    backend.close()
+
+    names = [name for name, _ in fake_nvml.calls]
+    assert names.count("nvmlShutdown") == 1, "NVML should be shut down exactly once."
+
+
+def test_get_gpu_backend_is_shared(fake_nvml):
+    backend = get_gpu_backend()
+    assert isinstance(backend, NvmlBackend), "NVML backend expected with GPUs."
+    assert get_gpu_backend() is backend, "Backend should be created only once."
+
+    gpu_backend.shutdown_gpu_backend()
+    names = [name for name, _ in fake_nvml.calls]
+    assert names.count("nvmlShutdown") == 1, "Shutdown should close NVML."
+
+
+def test_fallback_without_gpus(fake_nvml):
+    gpu_backend.shutdown_gpu_backend()
+    fake_nvml.calls.clear()
+    fake_nvml.nvmlDeviceGetCount = lambda: 0
+
+    backend = get_gpu_backend(nvml=fake_nvml)
+    assert isinstance(backend, CpuOnlyBackend), "CPU-only backend expected."
+    assert backend.read()["num_gpus"] == 0, "No GPUs should be reported."
+
+    names = [name for name, _ in fake_nvml.calls]
+    assert names.count("nvmlShutdown") == 1, "Unused NVML session should be closed."
+
+
+def test_fallback_when_nvml_init_fails(fake_nvml):
+    def failing_init():
+        raise fake_nvml.NVMLError("Driver Not Loaded")
+
+    gpu_backend.shutdown_gpu_backend()
+    fake_nvml.nvmlInit = failing_init
+    assert isinstance(
+        get_gpu_backend(nvml=fake_nvml), CpuOnlyBackend
+    ), "CPU-only backend expected when NVML cannot be initialized."
@@ -0,0 +1,64 @@
+import numpy as np
+import tensorflow as tf
+from tensorflow import keras
+
+from edgetrain.gradient_accumulation import GradientAccumulator, accumulation_steps_for
+
+
+def make_tiny_model(optimizer):
+    # Same initial weights on every call
+    keras.utils.set_random_seed(0)
+    model = keras.Sequential(
+        [
+            keras.layers.Input(shape=(4,)),
+            keras.layers.Dense(3, activation="softmax"),
+        ]
+    )
+    model.compile(
+        optimizer=optimizer,
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def test_accumulation_steps_for():
+    assert accumulation_steps_for(32, 32) == 1, "Full batches need no accumulation."
+    assert accumulation_steps_for(16, 64) == 4, "Expected 4 micro-batches of 16."
+    assert accumulation_steps_for(48, 64) == 2, "Partial micro-batches round up."
+    assert accumulation_steps_for(128, 64) == 1, "At least one step is needed."
+
+
+def test_accumulated_update_matches_full_batch(data):
+    full_batch = make_tiny_model(keras.optimizers.SGD(learning_rate=0.1))
+    full_batch.fit(*data, batch_size=16, epochs=1, shuffle=False, verbose=0)
+
+    # Two micro-batches of 8 average to the gradient of one batch of 16
+    with tf.distribute.MirroredStrategy().scope():
+        accumulated = make_tiny_model(keras.optimizers.SGD(learning_rate=0.1))
+    accumulator = GradientAccumulator(steps=2)
+    accumulator.attach(accumulated)
+    accumulated.fit(
+        *data,
+        batch_size=8,
+        epochs=1,
+        shuffle=False,
+        callbacks=[accumulator],
+        verbose=0,
+    )
+
+    assert accumulator.update_count == 4, "Expected one update per 2 micro-batches."
+    for expected, actual in zip(full_batch.get_weights(), accumulated.get_weights()):
+        np.testing.assert_allclose(actual, expected, atol=1e-6)
+
+
+def test_pending_gradients_are_applied_at_epoch_end(data):
+    model = make_tiny_model(keras.optimizers.SGD(learning_rate=0.1))
+    accumulator = GradientAccumulator(steps=3)
+    accumulator.attach(model)
+
+    # 8 micro-batches per epoch: two full updates and one partial update
+    model.fit(*data, batch_size=8, epochs=2, callbacks=[accumulator], verbose=0)
+
+    assert accumulator.update_count == 6, "Partial updates should be applied."
+    assert model.optimizer.iterations.numpy() == 6, "Optimizer update count mismatch."
@@ -0,0 +1,133 @@
+import csv
+import os
+import types
+
+import numpy as np
+import pytest
+from tensorflow import keras
+
+from edgetrain.hyperparameters import (
+    get_optimizer_hyperparameters,
+    set_optimizer_hyperparameters,
+)
+from edgetrain.train_controller import EdgeTrainController
+
+LOW_MEMORY = {
+    "num_gpus": 0,
+    "cpu_compute_percent": 20.0,
+    "cpu_memory_percent": 10.0,
+    "gpu_compute_percent": 0,
+    "gpu_memory_percent": 0,
+}
+
+
+def make_tiny_model(optimizer, **dense_kwargs):
+    model = keras.Sequential(
+        [
+            keras.layers.Input(shape=(4,)),
+            keras.layers.Dense(3, activation="softmax", **dense_kwargs),
+        ]
+    )
+    model.compile(
+        optimizer=optimizer,
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def make_controller(log_file, **kwargs):
+    sampler = types.SimpleNamespace(latest=lambda: dict(LOW_MEMORY))
+    return EdgeTrainController(
+        batch_size=16,
+        lr=1e-3,
+        pruning=0.0,
+        log_file=log_file,
+        sampler=sampler,
+        **kwargs
+    )
+
+
+def read_log(log_file):
+    with open(log_file, "r") as f:
+        return list(csv.DictReader(f))
+
+
+def test_set_learning_rate_without_retracing(data):
+    model = make_tiny_model(keras.optimizers.Adam(learning_rate=1e-3))
+    model.fit(*data, batch_size=16, epochs=1, verbose=0)
+    train_function = model.train_function
+    tracing_count = train_function.experimental_get_tracing_count()
+
+    set_optimizer_hyperparameters(model.optimizer, learning_rate=5e-4)
+    model.fit(*data, batch_size=16, epochs=1, verbose=0)
+
+    assert get_optimizer_hyperparameters(model.optimizer, "learning_rate")[
+        "learning_rate"
+    ] == pytest.approx(5e-4), "Learning rate was not applied."
+    assert model.train_function is train_function, "Train function was rebuilt."
+    assert (
+        train_function.experimental_get_tracing_count() == tracing_count
+    ), "Train function was retraced."
+
+
+def test_set_legacy_optimizer_hyperparameters():
+    optimizer = keras.optimizers.legacy.Adam(learning_rate=1e-3)
+    set_optimizer_hyperparameters(optimizer, learning_rate=2e-3, beta_1=0.8)
+
+    values = get_optimizer_hyperparameters(optimizer, "learning_rate", "beta_1")
+    assert values["learning_rate"] == pytest.approx(2e-3), "Learning rate mismatch."
+    assert values["beta_1"] == pytest.approx(0.8), "beta_1 mismatch."
+
+
+def test_non_variable_hyperparameter_raises():
+    optimizer = keras.optimizers.Adam(learning_rate=1e-3)
+    with pytest.raises(ValueError, match="beta_1"):
+        set_optimizer_hyperparameters(optimizer, beta_1=0.8)
+
+
+def test_optimizer_learning_rate_tracks_logged_value(tmpdir, data):
+    log_file = os.path.join(tmpdir, "log.csv")
+    images, _ = data
+
+    # The model always predicts class 1 while all labels are 0: with zero accuracy
+    # and learning rate priority, every decision halves the learning rate
+    model = make_tiny_model(
+        keras.optimizers.Adam(learning_rate=1e-3),
+        kernel_initializer="zeros",
+        bias_initializer=keras.initializers.Constant([0.0, 10.0, 0.0]),
+    )
+    controller = make_controller(
+        log_file,
+        every_n_steps=1,
+        user_priorities={"batch_size_adjustment": 0.0, "accuracy_improvement": 1.0},
+    )
+    controller.sampler = types.SimpleNamespace(
+        latest=lambda: {"num_gpus": 0, "cpu_memory_percent": 60.0}
+    )
+    applied = []
+
+    class RecordLearningRate(keras.callbacks.Callback):
+        def on_train_batch_end(self, batch, logs=None):
+            applied.append(
+                get_optimizer_hyperparameters(self.model.optimizer, "learning_rate")
+            )
+
+    model.fit(
+        images,
+        np.zeros(len(images)),
+        batch_size=16,
+        epochs=1,
+        verbose=0,
+        callbacks=[controller, RecordLearningRate()],
+    )
+
+    logged = [float(row["Learning Rate"]) for row in read_log(log_file)]
+
+    assert len(logged) == len(applied) == 4, "Expected one decision per step."
+    assert logged == sorted(logged, reverse=True), "Learning rate should decrease."
+    assert logged[-1] < 1e-3, "Learning rate was never adjusted."
+    for logged_lr, applied_lr in zip(logged, applied):
+        assert applied_lr["learning_rate"] == pytest.approx(
+            logged_lr
+        ), "Optimizer learning rate does not match the logged value."
@@ -0,0 +1,55 @@
+import subprocess
+import sys
+
+import pytest
+
+HEAVY_MODULES = ["tensorflow", "tensorflow_model_optimization", "matplotlib"]
+
+
+def imported_modules(code):
+    # Run in a fresh interpreter: the test process already imports TensorFlow
+    script = f"import sys\n{code}\nprint(','.join(sorted(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", script], capture_output=True, text=True, check=True
+    ).stdout
+    return set(output.strip().splitlines()[-1].split(","))
+
+
+@pytest.mark.parametrize(
+    "code",
+    [
+        "import edgetrain",
+        "import edgetrain.log_reader",
+        "from edgetrain import load_log, replay_policy, sys_resources",
+        "from edgetrain.replay import replay_policies",
+        "from edgetrain.adjust_train_parameters import adjust_training_parameters",
+    ],
+)
+def test_lightweight_imports_skip_heavy_backends(code):
+    modules = imported_modules(code)
+
+    for name in HEAVY_MODULES:
+        assert name not in modules, f"'{code}' should not import {name}."
+
+
+def test_package_attributes_load_on_first_use():
+    import edgetrain
+    from edgetrain.trials import run_trials
+
+    assert edgetrain.run_trials is run_trials, "Expected the function."
+    assert "run_trials" in dir(edgetrain), "Lazy names should be listed."
+    with pytest.raises(AttributeError):
+        edgetrain.not_an_attribute
+
+
+def test_package_function_shares_its_submodule_name():
+    # `trial_grid` imports the `edgetrain.dynamic_train` submodule
+    imported_modules(
+        "import edgetrain\n"
+        "edgetrain.trial_grid(batch_size=[32])\n"
+        "assert callable(edgetrain.dynamic_train), 'Expected the function.'\n"
+        "from edgetrain import dynamic_train\n"
+        "assert callable(dynamic_train), 'Expected the function.'\n"
+        "import edgetrain.dynamic_train\n"
+        "assert callable(edgetrain.dynamic_train), 'Expected the function.'"
+    )
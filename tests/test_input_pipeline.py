@@ -0,0 +1,89 @@
+import os
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from edgetrain.input_pipeline import build_pipeline, load_dataset
+
+
+@pytest.fixture
+def arrays():
+    images = np.arange(10 * 2 * 2, dtype=np.uint8).reshape(10, 2, 2, 1)
+    labels = np.arange(10, dtype=np.int64)
+    return images, labels
+
+
+def collect_labels(dataset):
+    return sorted(int(label) for _, label in dataset.as_numpy_iterator())
+
+
+def test_load_dataset_from_dict(arrays):
+    images, labels = arrays
+    dataset = load_dataset({"images": images, "labels": labels}, chunk_size=3)
+
+    assert dataset.element_spec[0].shape == (2, 2, 1), "Element shape mismatch."
+    assert dataset.cardinality() == 10, "Cardinality should be known."
+    assert collect_labels(dataset) == list(range(10)), "Samples were lost."
+
+
+def test_load_dataset_from_npy_directory(tmpdir, arrays):
+    images, labels = arrays
+    np.save(os.path.join(tmpdir, "images.npy"), images)
+    np.save(os.path.join(tmpdir, "labels.npy"), labels)
+
+    dataset = load_dataset(str(tmpdir), chunk_size=4)
+    assert collect_labels(dataset) == list(range(10)), "Samples were lost."
+
+
+def test_load_dataset_from_npz(tmpdir, arrays):
+    images, labels = arrays
+    path = os.path.join(tmpdir, "data.npz")
+    np.savez(path, images=images, labels=labels)
+
+    assert collect_labels(load_dataset(path)) == list(range(10)), "Samples were lost."
+
+
+def test_load_dataset_from_generator_function(arrays):
+    images, labels = arrays
+    dataset = load_dataset(lambda: zip(images, labels))
+
+    # A generator function can be read once per epoch
+    assert collect_labels(dataset) == list(range(10)), "First epoch mismatch."
+    assert collect_labels(dataset) == list(range(10)), "Second epoch mismatch."
+
+
+def test_load_dataset_from_generator_object(arrays):
+    images, labels = arrays
+    dataset = load_dataset(pair for pair in zip(images, labels))
+
+    # One-shot generators are cached during the first epoch
+    assert collect_labels(dataset) == list(range(10)), "First epoch mismatch."
+    assert collect_labels(dataset) == list(range(10)), "Second epoch mismatch."
+
+
+def test_load_dataset_unsupported_source():
+    with pytest.raises(TypeError):
+        load_dataset(42)
+    with pytest.raises(ValueError):
+        load_dataset("data.csv")
+
+
+def test_build_pipeline_batches_and_casts(arrays):
+    images, labels = arrays
+    dataset = load_dataset({"images": images, "labels": labels})
+
+    batches = list(build_pipeline(dataset, batch_size=4, shuffle_buffer=0))
+    assert [len(y) for _, y in batches] == [4, 4, 2], "Batch sizes mismatch."
+    assert batches[0][0].dtype == tf.float32, "Images should be cast to float32."
+
+
+def test_rebatching_reuses_stream(arrays):
+    images, labels = arrays
+    dataset = load_dataset({"images": images, "labels": labels})
+
+    for batch_size in (2, 5):
+        batches = list(build_pipeline(dataset, batch_size, cache=True))
+        assert all(len(y) == batch_size for _, y in batches), "Rebatching failed."
+        labels_seen = sorted(int(v) for _, y in batches for v in y)
+        assert labels_seen == list(range(10)), "Rebatching lost samples."
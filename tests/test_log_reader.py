@@ -0,0 +1,152 @@
+import os
+from datetime import datetime, timedelta
+
+import pytest
+
+from edgetrain.log_reader import (
+    LogTailer,
+    count_log_records,
+    iter_log_chunks,
+    load_log,
+    read_log_head_tail,
+    truncate_log,
+)
+from edgetrain.log_sinks import LOG_COLUMNS, CsvLogSink, NpyLogSink
+from edgetrain.train_visualize import log_train_time
+
+
+def make_record(epoch):
+    record = {column: 0.5 for column in LOG_COLUMNS}
+    record.update(
+        {
+            "Timestamp": datetime(2025, 1, 1, 12, 0, epoch),
+            "Epoch #": epoch,
+            "Batch Size": 32,
+            "Retraces": 1,
+        }
+    )
+    return record
+
+
+def write_log(log_file, epochs, buffer_size=4):
+    sink = (
+        NpyLogSink(log_file, buffer_size=buffer_size, flush_interval=3600)
+        if log_file.endswith(".npy")
+        else CsvLogSink(log_file)
+    )
+    with sink:
+        for epoch in epochs:
+            sink.write(make_record(epoch))
+
+
+@pytest.fixture(params=["log.csv", "log.npy"])
+def log_file(request, tmpdir):
+    return os.path.join(tmpdir, request.param)
+
+
+def test_iter_log_chunks(log_file):
+    write_log(log_file, range(10))
+
+    chunks = list(iter_log_chunks(log_file, chunksize=3, columns=["Epoch #"]))
+    assert all(len(chunk) <= 3 for chunk in chunks), "Chunks exceed chunksize."
+    epochs = [epoch for chunk in chunks for epoch in chunk["Epoch #"]]
+    assert epochs == list(range(10)), "Chunks should cover the log in order."
+    assert list(chunks[0].columns) == ["Epoch #"], "Only the requested column expected."
+
+
+def test_load_log_columns(log_file):
+    write_log(log_file, range(5))
+
+    df = load_log(log_file, columns=["Epoch #", "Batch Size"])
+    assert list(df.columns) == ["Epoch #", "Batch Size"], "Column selection mismatch."
+    assert len(df) == 5, "Row count mismatch."
+
+
+def test_read_log_head_tail(log_file):
+    write_log(log_file, range(10))
+
+    head, tail = read_log_head_tail(log_file, n=2)
+    assert list(head["Epoch #"]) == [0, 1], "Head records mismatch."
+    assert list(tail["Epoch #"]) == [8, 9], "Tail records mismatch."
+
+
+def test_read_log_head_tail_short_log(log_file):
+    write_log(log_file, range(1))
+
+    head, tail = read_log_head_tail(log_file, n=3)
+    assert list(head["Epoch #"]) == [0], "Head should contain the only record."
+    assert list(tail["Epoch #"]) == [0], "Tail should not include the header."
+
+
+def test_truncate_log(log_file):
+    assert count_log_records(log_file) == 0, "Missing logs have no records."
+    write_log(log_file, range(10), buffer_size=4)
+    assert count_log_records(log_file) == 10, "Record count mismatch."
+
+    # Cut inside the second binary chunk
+    assert truncate_log(log_file, 6) == 6, "Expected 6 records kept."
+    assert list(load_log(log_file)["Epoch #"]) == list(range(6)), "Wrong records kept."
+    assert truncate_log(log_file, 20) == 6, "Cannot keep more records than exist."
+
+    # Appending continues after the kept records
+    write_log(log_file, [6])
+    assert count_log_records(log_file) == 7, "Appended record missing."
+
+
+def test_truncate_log_drops_partial_line(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    write_log(log_file, range(3))
+    with open(log_file, "a") as f:
+        f.write("2024-01-01 00:00:00,3")
+
+    assert count_log_records(log_file) == 3, "Partial lines are not records."
+    assert truncate_log(log_file, 5) == 3, "Partial lines should be dropped."
+    with open(log_file) as f:
+        assert f.read().endswith("\n"), "The log should end with a complete line."
+
+
+def test_log_train_time(log_file):
+    write_log(log_file, range(6))
+
+    total = log_train_time(log_file)
+    assert total == timedelta(seconds=5), "Training time mismatch."
+
+
+def test_log_tailer_csv_partial_lines(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    tailer = LogTailer(log_file)
+    assert tailer.read_new().empty, "Missing log should read as empty."
+
+    write_log(log_file, range(2))
+    assert list(tailer.read_new()["Epoch #"]) == [0, 1], "First read mismatch."
+    assert tailer.read_new().empty, "No new records expected."
+
+    # A partially written line is only returned once it is complete
+    with open(log_file, "a", newline="") as f:
+        f.write("2025-01-01 12:00:02,2,")
+    assert tailer.read_new().empty, "Incomplete lines should not be read."
+
+    with open(log_file, "a", newline="") as f:
+        f.write(",".join(["0.5"] * 8 + ["32", "0.5", "1", "0.5"]) + "\r\n")
+    write_log(log_file, range(3, 4))
+    assert list(tailer.read_new()["Epoch #"]) == [2, 3], "Appended records mismatch."
+
+
+def test_log_tailer_npy_appended_chunks(tmpdir):
+    log_file = os.path.join(tmpdir, "log.npy")
+    tailer = LogTailer(log_file)
+
+    write_log(log_file, range(4), buffer_size=2)
+    assert list(tailer.read_new()["Epoch #"]) == [0, 1, 2, 3], "First read mismatch."
+
+    # Simulate a flush that is still being written
+    write_log(log_file, range(4, 6), buffer_size=2)
+    with open(log_file, "rb") as f:
+        data = f.read()
+    with open(log_file, "wb") as f:
+        f.write(data[:-10])
+    assert tailer.read_new().empty, "Incomplete arrays should not be read."
+
+    with open(log_file, "wb") as f:
+        f.write(data)
+    assert list(tailer.read_new()["Epoch #"]) == [4, 5], "Appended records mismatch."
@@ -0,0 +1,243 @@
+import csv
+import os
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from edgetrain.log_sinks import (
+    LOG_COLUMNS,
+    AsyncLogSink,
+    CsvLogSink,
+    NpyLogSink,
+    open_log_sink,
+    read_npy_log,
+)
+from edgetrain.train_visualize import load_log
+
+
+def make_record(epoch):
+    record = {column: 0.5 for column in LOG_COLUMNS}
+    record.update(
+        {
+            "Timestamp": datetime(2025, 1, 1, 12, 0, epoch),
+            "Epoch #": epoch,
+            "Batch Size": 32,
+            "Retraces": 1,
+        }
+    )
+    return record
+
+
+def test_open_log_sink_by_extension(tmpdir):
+    with open_log_sink(os.path.join(tmpdir, "log.csv")) as sink:
+        assert isinstance(sink, CsvLogSink), "CSV sink expected for '.csv'."
+    with open_log_sink(os.path.join(tmpdir, "log.npy")) as sink:
+        assert isinstance(sink, NpyLogSink), "Binary sink expected for '.npy'."
+        assert open_log_sink(sink) is sink, "Open sinks should be returned as is."
+
+
+def test_csv_sink_writes_header_once(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    for epoch in range(2):
+        with CsvLogSink(log_file) as sink:
+            sink.write(make_record(epoch))
+
+    with open(log_file, "r") as f:
+        rows = list(csv.reader(f))
+    assert rows[0] == LOG_COLUMNS, "Header mismatch."
+    assert len(rows) == 3, "Header should only be written once."
+
+
+def test_npy_sink_buffers_until_full(tmpdir):
+    log_file = os.path.join(tmpdir, "log.npy")
+    sink = NpyLogSink(log_file, buffer_size=3, flush_interval=3600)
+
+    sink.write(make_record(0))
+    sink.write(make_record(1))
+    assert not os.path.exists(log_file), "Records should be buffered."
+
+    sink.write(make_record(2))
+    assert len(read_npy_log(log_file)) == 3, "Full buffer should be flushed."
+
+    sink.write(make_record(3))
+    sink.close()
+    log = read_npy_log(log_file)
+    assert len(log) == 4, "Close should flush the remaining records."
+    assert log["Epoch #"].tolist() == [0, 1, 2, 3], "Record order mismatch."
+
+
+def test_npy_sink_flushes_after_interval(tmpdir):
+    log_file = os.path.join(tmpdir, "log.npy")
+    sink = NpyLogSink(log_file, buffer_size=100, flush_interval=0)
+
+    sink.write(make_record(0))
+    assert len(read_npy_log(log_file)) == 1, "Elapsed interval should flush."
+
+
+def test_npy_log_is_typed(tmpdir):
+    log_file = os.path.join(tmpdir, "log.npy")
+    record = make_record(1)
+    record["GPU RAM (%)"] = None
+    with NpyLogSink(log_file) as sink:
+        sink.write(record)
+
+    log = read_npy_log(log_file)
+    assert log["Timestamp"].dtype == np.dtype("datetime64[us]"), "Timestamp type."
+    assert log["Epoch #"].dtype == np.int64, "Epoch type mismatch."
+    assert log["Learning Rate"].dtype == np.float64, "Metric type mismatch."
+    assert np.isnan(log["GPU RAM (%)"][0]), "Missing values should be NaN."
+
+
+@pytest.mark.parametrize("extension", [".csv", ".npy"])
+def test_load_log_reads_both_formats(tmpdir, extension):
+    log_file = os.path.join(tmpdir, "log" + extension)
+    with open_log_sink(log_file) as sink:
+        for epoch in range(3):
+            sink.write(make_record(epoch))
+
+    df = load_log(log_file)
+    assert list(df.columns) == LOG_COLUMNS, "Columns mismatch."
+    assert df["Epoch #"].tolist() == [0, 1, 2], "Epochs mismatch."
+    assert df["Batch Size"].tolist() == [32, 32, 32], "Batch sizes mismatch."
+
+
+class SlowSink:
+    """Sink that blocks on every write until released."""
+
+    def __init__(self):
+        self.records = []
+        self.release = threading.Event()
+        self.closed = False
+
+    def write(self, record):
+        self.release.wait()
+        self.records.append(record)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+
+def test_async_sink_writes_all_records_on_close(tmpdir):
+    log_file = os.path.join(tmpdir, "log.npy")
+    with AsyncLogSink(NpyLogSink(log_file), batch_size=4) as sink:
+        for epoch in range(10):
+            sink.write(make_record(epoch))
+
+    assert sink.written_records == 10, "All records should be written."
+    assert read_npy_log(log_file)["Epoch #"].tolist() == list(range(10)), "Order."
+
+
+def test_async_sink_flush(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    sink = AsyncLogSink(CsvLogSink(log_file))
+    sink.write(make_record(0))
+    sink.flush()
+
+    assert sink.queue_depth == 0, "Queue should be drained after flush."
+    with open(log_file, "r") as f:
+        assert len(f.readlines()) == 2, "Record should be on disk after flush."
+    sink.close()
+
+
+def test_async_sink_flushes_while_idle(tmpdir):
+    log_file = os.path.join(tmpdir, "log.npy")
+    npy_sink = NpyLogSink(log_file, buffer_size=100, flush_interval=0.05)
+    with AsyncLogSink(npy_sink, idle_interval=0.01) as sink:
+        sink.write(make_record(0))
+        time.sleep(0.5)
+
+        # No further writes: the idle writer thread flushes the buffered record
+        assert len(read_npy_log(log_file)) == 1, "Idle sink should flush when due."
+
+
+def test_async_sink_drops_records_when_full():
+    slow_sink = SlowSink()
+    sink = AsyncLogSink(slow_sink, max_queue_size=2, batch_size=1)
+
+    for epoch in range(6):
+        sink.write(make_record(epoch))
+        time.sleep(0.01)
+
+    # One record is held by the writer thread, two wait in the queue
+    assert sink.queue_depth == 2, "Queue depth should be bounded."
+    assert sink.dropped_records == 3, "Overflowing records should be dropped."
+
+    slow_sink.release.set()
+    sink.close()
+    assert len(slow_sink.records) == 3, "Queued records should still be written."
+    assert slow_sink.closed, "Closing should close the underlying sink."
+
+
+def test_async_sink_blocks_when_requested():
+    slow_sink = SlowSink()
+    sink = AsyncLogSink(slow_sink, max_queue_size=1, block=True, timeout=0.01)
+
+    for epoch in range(3):
+        sink.write(make_record(epoch))
+        time.sleep(0.01)
+    assert sink.dropped_records == 1, "Records should be dropped after the timeout."
+
+    slow_sink.release.set()
+    sink.close()
+
+
+def test_async_sink_rejects_writes_after_close():
+    sink = AsyncLogSink(SlowSink())
+    sink.close()
+    with pytest.raises(ValueError):
+        sink.write(make_record(0))
+
+
+class FailingSink(SlowSink):
+    """Sink whose writes fail, like a full disk."""
+
+    def write(self, record):
+        raise OSError("No space left on device")
+
+
+def test_async_sink_reraises_sink_errors():
+    failing_sink = FailingSink()
+    sink = AsyncLogSink(failing_sink)
+    sink.write(make_record(0))
+
+    # Flushing must not hang on the record the writer thread failed on
+    with pytest.raises(RuntimeError) as error:
+        sink.flush()
+    assert isinstance(error.value.__cause__, OSError), "Expected the sink error."
+    with pytest.raises(RuntimeError):
+        sink.write(make_record(1))
+    with pytest.raises(RuntimeError):
+        sink.close()
+    assert failing_sink.closed, "The underlying sink should still be closed."
+    assert sink.written_records == 0, "Nothing should count as written."
+
+
+@pytest.mark.parametrize("ending", ["exit", "exception", "sigterm"])
+def test_async_sink_flushes_on_process_exit(tmpdir, ending):
+    log_file = os.path.join(tmpdir, "log.npy")
+    script = f"""
+import os, signal, sys
+sys.path.insert(0, {os.getcwd()!r})
+from edgetrain.log_sinks import AsyncLogSink, NpyLogSink
+
+sink = AsyncLogSink(NpyLogSink({log_file!r}, flush_interval=3600))
+for epoch in range(50):
+    sink.write({{"Timestamp": "2025-01-01T12:00:00", "Epoch #": epoch}})
+if {ending!r} == "exception":
+    raise RuntimeError("training failed")
+if {ending!r} == "sigterm":
+    os.kill(os.getpid(), signal.SIGTERM)
+"""
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True)
+
+    expected_code = {"exit": 0, "exception": 1, "sigterm": 143}[ending]
+    assert result.returncode == expected_code, result.stderr.decode()
+    assert len(read_npy_log(log_file)) == 50, "Pending records were not flushed."
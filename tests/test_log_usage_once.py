@@ -15,6 +15,7 @@ def test_log_usage_once(tmpdir):
         "cpu_memory_percent": 40.0,
         "gpu_compute_percent": 45.0,
         "gpu_memory_percent": 50.0,
+        "process_rss": 3 * 2**20,
     }
 
     # Create a temporary log file
@@ -68,6 +69,20 @@ def test_log_usage_once(tmpdir):
             "Pruning",
             "Batch Size",
             "Learning Rate",
+            "Retraces",
+            "Compile Time (s)",
+            "Accuracy",
+            "Throughput Score",
+            "Step Time (s)",
+            "Samples/s",
+            "Time to Accuracy (s)",
+            "Time to Accuracy Score",
+            "Accuracy Gain/s",
+            "Accumulation Steps",
+            "Precision",
+            "Process RSS (MiB)",
+            "Process USS (MiB)",
+            "TF Memory (MiB)",
         ]
         assert reader.fieldnames == expected_header, "Log file header is incorrect."
 
@@ -90,6 +105,9 @@ def test_log_usage_once(tmpdir):
         assert log_entry["Pruning"] == str(pruning), "Pruning ratio mismatch."
         assert log_entry["Batch Size"] == str(batch_size), "Batch size mismatch."
         assert log_entry["Learning Rate"] == str(lr), "Learning rate mismatch."
+        assert log_entry["Accumulation Steps"] == "1", "Accumulation steps mismatch."
+        assert log_entry["Precision"] == "float32", "Precision mismatch."
+        assert log_entry["Process RSS (MiB)"] == "3.0", "Process RSS mismatch."
 
         # Validate timestamp format
         try:
@@ -0,0 +1,62 @@
+import json
+
+import pytest
+
+from edgetrain.multi_worker import launch_local_workers, local_cluster_configs
+
+
+def coordinate(strategy, memory_by_worker):
+    # Runs in each worker process
+    from edgetrain.multi_worker import WorkerCoordinator
+
+    coordinator = WorkerCoordinator(strategy)
+    resources = {
+        "num_gpus": 0,
+        "cpu_compute_percent": 10.0,
+        "cpu_memory_percent": memory_by_worker[coordinator.task_id],
+        "gpu_compute_percent": 0,
+        "gpu_memory_percent": 0,
+    }
+    return {
+        "is_chief": coordinator.is_chief,
+        "resources": coordinator.aggregate_resources(resources),
+        "decision": coordinator.broadcast([32 * (coordinator.task_id + 1), 1e-3]),
+    }
+
+
+def fail(strategy):
+    raise ValueError("worker failure")
+
+
+def test_local_cluster_configs():
+    configs = local_cluster_configs(3, ports=[2000, 2001, 2002])
+
+    assert len(configs) == 3, "Expected one config per worker."
+    assert configs[1]["cluster"]["worker"][2] == "localhost:2002", "Address mismatch."
+    assert [c["task"]["index"] for c in configs] == [0, 1, 2], "Task index mismatch."
+    json.dumps(configs[0])
+
+
+def test_workers_share_the_chief_decision():
+    num_workers = 3
+    memory = [40.0, 85.0, 60.0]
+    results = launch_local_workers(
+        coordinate, num_workers=num_workers, args=(memory,), timeout=120
+    )
+
+    assert [r["is_chief"] for r in results] == [True] + [False] * (
+        num_workers - 1
+    ), "Worker 0 should be the chief."
+    for result in results:
+        assert (
+            result["resources"]["cpu_memory_percent"] == 85.0
+        ), "Every worker should see the most loaded worker."
+        assert result["decision"] == [
+            32,
+            1e-3,
+        ], "Every worker should apply the chief's."
+
+
+def test_worker_failure_is_reported():
+    with pytest.raises(RuntimeError, match="worker failure"):
+        launch_local_workers(fail, num_workers=2, timeout=120)
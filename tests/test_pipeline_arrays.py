@@ -0,0 +1,184 @@
+import numpy as np
+import pytest
+
+from edgetrain.adjust_train_parameters import (
+    adjust_training_parameters,
+    adjust_training_parameters_array,
+    snap_batch_size,
+    snap_batch_size_array,
+)
+from edgetrain.calculate_priorities import define_priorities, define_priorities_array
+from edgetrain.calculate_scores import (
+    compute_scores,
+    compute_scores_array,
+    normalize_scores,
+    normalize_scores_array,
+)
+from edgetrain.replay import policy_grid, replay_policies, replay_policy
+from edgetrain.resource_monitor import resources_array
+
+
+@pytest.fixture
+def snapshots():
+    # Random resource snapshots around the adjustment thresholds, with and without GPUs
+    rng = np.random.default_rng(0)
+    n = 500
+    resources = [
+        {
+            "num_gpus": int(num_gpus),
+            "cpu_memory_percent": float(cpu),
+            "gpu_memory_percent": float(gpu),
+        }
+        for num_gpus, cpu, gpu in zip(
+            rng.integers(0, 2, n), rng.uniform(30, 95, n), rng.uniform(30, 95, n)
+        )
+    ]
+    # Include exact threshold values
+    resources[0].update(cpu_memory_percent=75.0, gpu_memory_percent=50.0)
+    resources[1].update(cpu_memory_percent=50.0, gpu_memory_percent=75.0)
+    accuracies = rng.choice([0.0, 0.03, 0.05, 0.5, 0.95, 0.97, 1.0], n)
+    previous = rng.choice([0.0, 0.03, 0.5, 0.97], n)
+    return resources, accuracies, previous
+
+
+def test_resources_array(snapshots):
+    resources, _, _ = snapshots
+    array = resources_array(resources)
+
+    assert array.shape == (len(resources),), "One element per snapshot expected."
+    assert array["num_gpus"][0] == resources[0]["num_gpus"], "Field mismatch."
+    assert array["cpu_cores"][0] == 0, "Missing values should be 0."
+
+
+def test_scores_match_scalar(snapshots):
+    resources, accuracies, previous = snapshots
+    rng = np.random.default_rng(2)
+    samples_per_second = rng.choice([np.nan, 50.0, 120.0], len(resources))
+    throughput = {
+        "samples_per_second": samples_per_second,
+        "best_samples_per_second": np.fmax.accumulate(samples_per_second),
+    }
+    scores = compute_scores_array(
+        previous, accuracies, resources_array(resources), throughput=throughput
+    )
+
+    for i, snapshot in enumerate(resources):
+        expected = compute_scores(
+            previous[i],
+            accuracies[i],
+            resources=snapshot,
+            throughput={name: values[i] for name, values in throughput.items()},
+        )
+        assert scores[i]["memory_score"] == expected["memory_score"], "Mem mismatch."
+        assert (
+            scores[i]["accuracy_score"] == expected["accuracy_score"]
+        ), "Acc mismatch."
+        assert (
+            scores[i]["throughput_score"] == expected["throughput_score"]
+        ), "Throughput score mismatch."
+
+    ranges = {"memory_score_range": 50}
+    normalized = normalize_scores_array(scores, ranges)
+    expected = normalize_scores(
+        {"memory_score": scores[0]["memory_score"], "accuracy_score": 1.0}, ranges
+    )
+    assert normalized[0]["memory_score"] == expected["memory_score"], "Range ignored."
+
+
+@pytest.mark.parametrize(
+    "user_priorities",
+    [None, {"batch_size_adjustment": 0.9, "accuracy_improvement": 0.1}],
+)
+@pytest.mark.parametrize(
+    "thresholds", [None, {"memory_high": 60, "accuracy_high": 0.5}]
+)
+def test_pipeline_matches_scalar(snapshots, user_priorities, thresholds):
+    resources, accuracies, previous = snapshots
+    rng = np.random.default_rng(1)
+    batch_sizes = rng.choice([16, 24, 32, 64, 128], len(resources))
+    lrs = rng.choice([1e-5, 1e-3, 9e-3], len(resources))
+
+    scores = compute_scores_array(previous, accuracies, resources_array(resources))
+    priorities = define_priorities_array(scores, user_priorities)
+    adjusted_batch_sizes, adjusted_lrs = adjust_training_parameters_array(
+        priorities,
+        batch_sizes,
+        lrs,
+        accuracies,
+        resources_array(resources),
+        thresholds=thresholds,
+    )
+
+    for i, snapshot in enumerate(resources):
+        expected_scores = compute_scores(previous[i], accuracies[i], resources=snapshot)
+        expected_priorities = define_priorities(expected_scores, user_priorities)
+        assert priorities[i]["batch_size"] == expected_priorities["batch_size"]
+        assert priorities[i]["learning_rate"] == expected_priorities["learning_rate"]
+
+        expected = adjust_training_parameters(
+            expected_priorities,
+            int(batch_sizes[i]),
+            float(lrs[i]),
+            accuracies[i],
+            resources=snapshot,
+            thresholds=thresholds,
+        )
+        assert adjusted_batch_sizes[i] == expected[0], f"Batch size mismatch at {i}."
+        assert adjusted_lrs[i] == expected[1], f"Learning rate mismatch at {i}."
+
+
+def test_priority_ties_favour_batch_size():
+    priorities = define_priorities_array(
+        np.array(
+            [(0.5, 0.5)], dtype=[("memory_score", "f8"), ("accuracy_score", "f8")]
+        ),
+        {"batch_size_adjustment": 1.0, "accuracy_improvement": 1.0},
+    )
+    resources = {"cpu_memory_percent": 90.0, "gpu_memory_percent": 0.0}
+
+    batch_size, lr = adjust_training_parameters_array(
+        priorities, [32], [1e-3], [0.0], resources
+    )
+    expected = adjust_training_parameters(
+        {"batch_size": 0.5, "learning_rate": 0.5}, 32, 1e-3, 0.0, resources=resources
+    )
+    assert (batch_size[0], lr[0]) == expected, "Ties should match the scalar version."
+
+
+def test_snap_batch_size_matches_scalar():
+    batch_sizes = np.arange(1, 300)
+    buckets = (128, 16, 64, 32)
+
+    snapped = snap_batch_size_array(batch_sizes, buckets)
+    expected = [snap_batch_size(int(bs), buckets) for bs in batch_sizes]
+    assert list(snapped) == expected, "Snapped batch sizes mismatch."
+
+
+def test_replay_policies_match_scalar_replay(snapshots):
+    resources, accuracies, _ = snapshots
+    array = resources_array(resources[:50])
+    trace = {
+        "batch_size": 32,
+        "lr": 1e-3,
+        "epoch": np.arange(1, 51),
+        "accuracy": accuracies[:50],
+        "cpu_memory_percent": array["cpu_memory_percent"],
+        "gpu_memory_percent": array["gpu_memory_percent"],
+        "num_gpus": array["num_gpus"],
+    }
+    policies = [None] + policy_grid(
+        memory_high=[60, 80],
+        accuracy_low=[0.01, 0.5],
+        batch_size_adjustment=[0.2, 1.0],
+    )
+
+    trajectories = replay_policies(trace, policies)
+
+    for i, policy in enumerate(policies):
+        df = replay_policy(trace, policy)
+        assert np.array_equal(
+            trajectories["batch_size"][i], df["Batch Size"]
+        ), f"Batch size trajectory mismatch for policy {i}."
+        assert np.array_equal(
+            trajectories["learning_rate"][i], df["Learning Rate"]
+        ), f"Learning rate trajectory mismatch for policy {i}."
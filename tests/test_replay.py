@@ -0,0 +1,221 @@
+import os
+import time
+import types
+
+import numpy as np
+import pytest
+
+from edgetrain.adjust_train_parameters import (
+    HysteresisBatchSizeController,
+    adjust_training_parameters,
+)
+from edgetrain.calculate_priorities import DEFAULT_PRIORITIES, define_priorities
+from edgetrain.calculate_scores import compute_scores
+from edgetrain.log_reader import load_log
+from edgetrain.replay import load_trace, policy_grid, replay_policies, replay_policy
+from edgetrain.resource_monitor import log_usage_once
+from edgetrain.train_controller import EdgeTrainController
+
+ACCURACIES = [0.2, 0.5, 0.52, 0.6, 0.97, 0.98]
+CPU_MEMORY = [40.0, 45.0, 80.0, 60.0, 30.0, 90.0]
+LOW_MEMORY = {
+    "num_gpus": 0,
+    "cpu_compute_percent": 20.0,
+    "cpu_memory_percent": 10.0,
+    "gpu_compute_percent": 0,
+    "gpu_memory_percent": 0,
+}
+
+
+def record_run(log_file, user_priorities=None):
+    # Log a run the way EdgeTrainController does, with the default policy
+    batch_size, lr, prev_accuracy = 32, 1e-3, 0.0
+    scores = {"memory_score": 0, "accuracy_score": 0}
+    priorities = {"batch_size": 0, "learning_rate": 0}
+    resources = {"num_gpus": 0, "cpu_memory_percent": 40.0, "gpu_memory_percent": 0}
+    log_usage_once(
+        log_file, 0.2, batch_size, lr, scores, priorities, resources=resources
+    )
+    for epoch, (accuracy, cpu_memory) in enumerate(zip(ACCURACIES, CPU_MEMORY)):
+        resources = {
+            "num_gpus": 0,
+            "cpu_memory_percent": cpu_memory,
+            "gpu_memory_percent": 0,
+        }
+        scores = compute_scores(prev_accuracy, accuracy, resources=resources)
+        priorities = define_priorities(scores, user_priorities)
+        batch_size, lr = adjust_training_parameters(
+            priorities, batch_size, lr, accuracy, resources=resources
+        )
+        log_usage_once(
+            log_file,
+            0.2,
+            batch_size,
+            lr,
+            scores,
+            priorities,
+            num_epoch=epoch + 1,
+            resources=resources,
+            accuracy=accuracy,
+        )
+        prev_accuracy = accuracy
+
+
+@pytest.fixture
+def trace(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    record_run(log_file, {"batch_size_adjustment": 1.0, "accuracy_improvement": 0.3})
+    return load_trace(log_file)
+
+
+def test_load_trace(trace):
+    assert trace["batch_size"] == 32, "Initial batch size mismatch."
+    assert trace["lr"] == 1e-3, "Initial learning rate mismatch."
+    assert list(trace["epoch"]) == [1, 2, 3, 4, 5, 6], "One entry per decision."
+    assert list(trace["accuracy"]) == ACCURACIES, "Accuracies mismatch."
+    assert list(trace["num_gpus"]) == [0] * 6, "No GPU was recorded."
+
+
+def test_load_trace_selects_last_run(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    record_run(log_file)
+    record_run(log_file)
+
+    assert len(load_trace(log_file)["epoch"]) == 6, "Runs should be split."
+    assert len(load_trace(log_file, run=0)["epoch"]) == 6, "Runs should be split."
+
+
+def test_load_trace_requires_accuracy(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    with open(log_file, "w") as f:
+        f.write("Epoch #,CPU RAM (%),Batch Size\n0,40.0,32\n")
+
+    with pytest.raises(ValueError, match="missing columns"):
+        load_trace(log_file)
+
+
+def test_replay_reproduces_recorded_run(trace):
+    df = replay_policy(
+        trace,
+        {
+            "user_priorities": {
+                "batch_size_adjustment": 1.0,
+                "accuracy_improvement": 0.3,
+            }
+        },
+        batch_buckets=None,
+    )
+
+    assert list(df["Batch Size"]) == list(
+        trace["recorded_batch_size"]
+    ), "Replaying the recorded policy should reproduce its batch sizes."
+    assert np.array_equal(
+        df["Learning Rate"], trace["recorded_lr"]
+    ), "Replaying the recorded policy should reproduce its learning rates."
+
+
+def make_controller(log_file, **kwargs):
+    sampler = types.SimpleNamespace(latest=lambda: dict(LOW_MEMORY))
+    return EdgeTrainController(
+        batch_size=16,
+        lr=1e-3,
+        pruning=0.0,
+        log_file=log_file,
+        sampler=sampler,
+        **kwargs
+    )
+
+
+def test_replay_matches_controller_decisions(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    # Partial priorities: no throughput weight, in training and in the replay
+    priorities = {
+        "batch_size_adjustment": 1.0,
+        "accuracy_improvement": 0.3,
+        "time_to_accuracy_improvement": 0.5,
+    }
+    controller = make_controller(log_file, user_priorities=priorities)
+    controller.apply_hyperparameters = lambda: None
+    controller.log_usage(num_epoch=0)
+
+    # Steps get slower from the third decision on, so throughput drops; accuracy gains
+    # per second of training shrink
+    for accuracy, seconds in zip([0.2, 0.5, 0.52, 0.6], [1.0, 1.0, 2.0, 2.0]):
+        controller._timed_steps = 4
+        controller._timed_samples = 4 * controller.batch_size
+        controller._timed_seconds = seconds
+        controller._accuracy_start = time.monotonic() - 4 * seconds
+        controller.adjust(accuracy)
+
+    recorded = load_log(log_file).iloc[1:]
+    assert (recorded["Throughput Score"] > 0).any(), "Throughput should drop."
+    assert (recorded["Time to Accuracy Score"] > 0).any(), "Accuracy should stall."
+    df = replay_policy(load_trace(log_file), {"user_priorities": priorities})
+    for column in ["Priority Batch Size", "Priority Learning Rate"]:
+        np.testing.assert_allclose(df[column], recorded[column])
+    assert list(df["Batch Size"]) == list(
+        recorded["Batch Size"]
+    ), "The replay should make the controller's decisions."
+
+
+def test_replay_policies(trace):
+    policies = policy_grid(memory_high=[75, 95], batch_size_adjustment=[1.0, 0.0])
+    assert len(policies) == 4, "One policy per combination expected."
+    assert policies[0]["user_priorities"] == {
+        **DEFAULT_PRIORITIES,
+        "batch_size_adjustment": 1.0,
+    }, "Priorities that are not varied should keep their default."
+    with pytest.raises(ValueError, match="Unknown policy parameter"):
+        policy_grid(momentum=[0.9])
+
+    trajectories = replay_policies(trace, policies, batch_buckets=None)
+
+    assert trajectories["batch_size"].shape == (4, 6), "Trajectory shape mismatch."
+    for i, policy in enumerate(policies):
+        df = replay_policy(trace, policy, batch_buckets=None)
+        assert np.array_equal(
+            trajectories["batch_size"][i], df["Batch Size"]
+        ), "Batch size trajectory mismatch."
+        assert np.array_equal(
+            trajectories["learning_rate"][i], df["Learning Rate"]
+        ), "Learning rate trajectory mismatch."
+
+    # A higher memory threshold never halves the batch size
+    assert (
+        trajectories["batch_size"][2] >= trajectories["batch_size"][0]
+    ).all(), "Higher memory threshold should keep larger batches."
+
+
+def test_replay_stateful_controller(trace):
+    priorities = {"batch_size_adjustment": 1.0, "accuracy_improvement": 0.3}
+    controller = HysteresisBatchSizeController(cooldown=1)
+    policies = [
+        {"user_priorities": priorities},
+        {"user_priorities": priorities, "batch_size_controller": controller},
+    ]
+
+    trajectories = replay_policies(trace, policies, batch_buckets=None)
+
+    df = replay_policy(trace, policies[1], batch_buckets=None)
+    assert np.array_equal(
+        trajectories["batch_size"][1], df["Batch Size"]
+    ), "Controller replays should be repeatable."
+    assert not np.array_equal(
+        trajectories["batch_size"][0], trajectories["batch_size"][1]
+    ), "The controller should change the trajectory."
+
+
+def test_replay_mixed_precision_policy(trace):
+    assert trace["precision"] == "float32", "Initial precision mismatch."
+    priorities = {"batch_size_adjustment": 1.0, "accuracy_improvement": 0.3}
+    policies = [
+        {"user_priorities": priorities},
+        {"user_priorities": priorities, "mixed_precision": "mixed_float16"},
+    ]
+
+    trajectories = replay_policies(trace, policies, batch_buckets=None)
+
+    # The first high memory decision (80%) switches precision instead of halving
+    default, mixed = trajectories["batch_size"]
+    assert mixed[2] == mixed[1] > default[2], "Switching should keep the batch size."
+    assert mixed[5] < mixed[4], "Later high memory should halve the batch size."
@@ -0,0 +1,97 @@
+import os
+from datetime import datetime
+
+import matplotlib
+
+from edgetrain.log_sinks import LOG_COLUMNS, CsvLogSink, NpyLogSink
+from edgetrain.report import find_logs, main, render_reports
+
+
+def make_record(epoch):
+    record = {column: 0.5 for column in LOG_COLUMNS}
+    record.update(
+        {
+            "Timestamp": datetime(2025, 1, 1, 12, 0, epoch),
+            "Epoch #": epoch,
+            "Batch Size": 32,
+            "Retraces": 1,
+        }
+    )
+    return record
+
+
+def write_log(log_file, epochs, buffer_size=4):
+    sink = (
+        NpyLogSink(log_file, buffer_size=buffer_size, flush_interval=3600)
+        if log_file.endswith(".npy")
+        else CsvLogSink(log_file)
+    )
+    with sink:
+        for epoch in epochs:
+            sink.write(make_record(epoch))
+
+
+def make_logs(log_dir):
+    log_files = [
+        os.path.join(log_dir, "20250101_120000_resource_log.csv"),
+        os.path.join(log_dir, "20250102_120000_resource_log.npy"),
+    ]
+    for log_file in log_files:
+        write_log(log_file, range(6))
+    return log_files
+
+
+def test_find_logs(tmpdir):
+    log_files = make_logs(tmpdir)
+    open(os.path.join(tmpdir, "notes.txt"), "w").close()
+
+    assert find_logs(tmpdir) == sorted(log_files), "Only log files should be found."
+
+
+def test_render_reports_in_process_pool(tmpdir):
+    log_dir = os.path.join(tmpdir, "logs")
+    img_dir = os.path.join(tmpdir, "images")
+    os.makedirs(log_dir)
+    log_files = make_logs(log_dir)
+
+    results = render_reports(log_dir, img_dir=img_dir, max_workers=2)
+
+    assert sorted(results) == sorted(log_files), "Every log should be rendered."
+    for prefix in ["20250101_120000", "20250102_120000"]:
+        for fmt in ["png", "svg"]:
+            path = os.path.join(img_dir, f"{prefix}_resource_usage_plot.{fmt}")
+            assert os.path.getsize(path) > 0, f"Missing plot '{path}'."
+
+
+def test_render_reports_keeps_backend(tmpdir):
+    log_dir = os.path.join(tmpdir, "logs")
+    os.makedirs(log_dir)
+    make_logs(log_dir)
+    backend = matplotlib.get_backend()
+    matplotlib.use("svg")
+    try:
+        render_reports(log_dir, img_dir=os.path.join(tmpdir, "images"), max_workers=1)
+        assert matplotlib.get_backend() == "svg", "The backend should not be changed."
+    finally:
+        matplotlib.use(backend)
+
+
+def test_main_reports_failures(tmpdir):
+    log_dir = os.path.join(tmpdir, "logs")
+    img_dir = os.path.join(tmpdir, "images")
+    os.makedirs(log_dir)
+    make_logs(log_dir)
+    with open(os.path.join(log_dir, "broken_log.csv"), "w") as f:
+        f.write("not,a,log\n")
+
+    status = main([log_dir, "-o", img_dir, "-f", "png", "-j", "1"])
+
+    assert status == 1, "A failed log should make the exit status non-zero."
+    assert sorted(os.listdir(img_dir)) == [
+        "20250101_120000_resource_usage_plot.png",
+        "20250102_120000_resource_usage_plot.png",
+    ], "Valid logs should still be rendered."
+
+
+def test_main_without_logs(tmpdir):
+    assert main([str(tmpdir)]) == 1, "An empty log directory should fail."
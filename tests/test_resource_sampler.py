@@ -0,0 +1,103 @@
+import itertools
+import time
+from unittest import mock
+
+import pytest
+
+from edgetrain.resource_monitor import ResourceSampler
+
+
+@pytest.fixture
+def counting_sample_fn():
+    # Each call returns a new snapshot so samples can be told apart
+    counter = itertools.count()
+    return lambda: {"cpu_memory_percent": float(next(counter)), "num_gpus": 0}
+
+
+def wait_for_samples(sampler, count, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while len(sampler.window(timeout)) < count and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_latest_available_after_start(counting_sample_fn):
+    sampler = ResourceSampler(interval=10, sample_fn=counting_sample_fn)
+    assert sampler.latest() is None, "No snapshot should exist before start."
+
+    with sampler:
+        latest = sampler.latest()
+        assert latest is not None, "A snapshot should be taken when starting."
+        assert latest["cpu_memory_percent"] == 0.0, "First snapshot mismatch."
+
+
+def test_sampler_keeps_sampling_in_background(counting_sample_fn):
+    with ResourceSampler(interval=0.01, sample_fn=counting_sample_fn) as sampler:
+        wait_for_samples(sampler, 5)
+        latest = sampler.latest()
+
+    assert latest["cpu_memory_percent"] >= 4, "Background thread did not sample."
+    assert sampler._thread is None, "Sampling thread should be stopped on exit."
+
+
+def test_ring_buffer_is_bounded(counting_sample_fn):
+    with ResourceSampler(
+        interval=0.001, capacity=3, sample_fn=counting_sample_fn
+    ) as sampler:
+        wait_for_samples(sampler, 3)
+        time.sleep(0.05)
+        samples = sampler.window(60)
+
+    assert len(samples) == 3, "Ring buffer should not exceed its capacity."
+    values = [sample["cpu_memory_percent"] for sample in samples]
+    assert values == sorted(values), "Window should be ordered oldest first."
+    assert values[0] > 0, "Oldest samples should be evicted."
+
+
+def test_window_excludes_old_samples(counting_sample_fn):
+    sampler = ResourceSampler(interval=10, sample_fn=counting_sample_fn)
+    with sampler:
+        time.sleep(0.05)
+        assert sampler.window(0.01) == [], "Old samples should be excluded."
+        assert len(sampler.window(60)) == 1, "Recent samples should be included."
+
+
+def test_latest_returns_a_copy(counting_sample_fn):
+    with ResourceSampler(interval=10, sample_fn=counting_sample_fn) as sampler:
+        sampler.latest()["cpu_memory_percent"] = 99.0
+        assert (
+            sampler.latest()["cpu_memory_percent"] == 0.0
+        ), "Readers should not be able to mutate the buffer."
+
+
+def test_first_default_sample_measures_cpu(fake_nvml):
+    with mock.patch(
+        "edgetrain.resource_monitor.psutil.cpu_percent", return_value=42.0
+    ) as cpu_percent:
+        with ResourceSampler(interval=10) as sampler:
+            first = sampler.latest()
+
+    # An unprimed non-blocking measurement always reports 0.0
+    assert cpu_percent.call_args_list[:2] == [
+        mock.call(interval=None),
+        mock.call(interval=0.1),
+    ], "cpu_percent should be primed, then measured over a short window."
+    assert first["cpu_compute_percent"] == 42.0, "First CPU usage mismatch."
+
+
+def test_sampling_errors_are_reraised():
+    calls = itertools.count()
+
+    def failing_sample_fn():
+        if next(calls) > 0:
+            raise OSError("sensor unavailable")
+        return {"cpu_memory_percent": 0.0, "num_gpus": 0}
+
+    sampler = ResourceSampler(interval=0.001, sample_fn=failing_sample_fn).start()
+    deadline = time.monotonic() + 5
+    while sampler._error is None and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+    with pytest.raises(RuntimeError):
+        sampler.latest()
+    with pytest.raises(RuntimeError):
+        sampler.stop()
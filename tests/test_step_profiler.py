@@ -0,0 +1,137 @@
+import json
+import os
+
+import numpy as np
+import pytest
+import tensorflow as tf
+
+from edgetrain.compile_cache import TrainFunctionCache
+from edgetrain.step_profiler import StepProfiler, TimingHistogram, step_timing_file
+
+
+def make_tiny_model(optimizer="sgd"):
+    model = tf.keras.Sequential(
+        [
+            tf.keras.layers.Input(shape=(4,)),
+            tf.keras.layers.Dense(3, activation="softmax"),
+        ]
+    )
+    model.compile(
+        optimizer=optimizer,
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+    )
+    return model
+
+
+def test_timing_histogram():
+    histogram = TimingHistogram()
+    for duration in [0.001] * 9 + [0.5]:
+        histogram.add(duration)
+    histogram.add(1e-9)
+
+    summary = histogram.summary()
+    assert summary["count"] == 11, "Every duration should be counted."
+    assert summary["max"] == 0.5, "Max mismatch."
+    assert 0.001 <= summary["p50"] <= 0.0013, "Median should be in the 1 ms bin."
+    assert sum(b[2] for b in summary["bins"]) == 11, "Bins should hold every duration."
+    assert np.isnan(TimingHistogram().percentile(50)), "Empty histograms have no value."
+
+
+def test_step_timing_file():
+    assert step_timing_file("logs/run.csv") == os.path.join(
+        "logs", "run_step_timing.json"
+    ), "The summary should sit next to the log."
+
+
+def test_step_profiler(tmpdir, data):
+    output_file = os.path.join(tmpdir, "step_timing.json")
+    profile_dir = os.path.join(tmpdir, "profile")
+    model = make_tiny_model("adam")
+    cache = TrainFunctionCache()
+    profiler = StepProfiler(output_file, profile_steps=(2, 3), profile_dir=profile_dir)
+    profiler.attach(model)
+
+    model.fit(
+        *data,
+        batch_size=16,
+        epochs=2,
+        verbose=0,
+        callbacks=[profiler, cache, profiler.end_callback],
+    )
+    profiler.close()
+
+    with open(output_file) as f:
+        summary = json.load(f)
+    assert summary["steps"] == 8, "Every step should be timed."
+    for phase in ["data_wait", "compute", "callbacks"]:
+        assert summary[phase]["count"] == 8, f"Missing '{phase}' timings."
+    assert summary["epoch_callbacks"]["count"] == 2, "Expected one timing per epoch."
+    assert cache.compile_count == 1, "The compile cache should detect the tracing."
+    assert any(files for _, _, files in os.walk(profile_dir)), "Missing trace."
+
+
+def test_profile_steps_need_a_directory():
+    with pytest.raises(ValueError):
+        StepProfiler(profile_steps=(0, 1))
+
+
+def _recompile(model, **kwargs):
+    model.compile(
+        optimizer="sgd",
+        loss="sparse_categorical_crossentropy",
+        metrics=["accuracy"],
+        **kwargs,
+    )
+
+
+def test_step_profiler_keeps_jit_compile(data):
+    model = make_tiny_model()
+    _recompile(model, jit_compile=True)
+    profiler = StepProfiler()
+    profiler.attach(model)
+
+    model.fit(
+        *data, batch_size=16, verbose=0, callbacks=[profiler, profiler.end_callback]
+    )
+
+    # The traced step should call an XLA-compiled train step
+    step_function = model.train_function.experimental_get_tracing_count.__self__
+    graph = step_function._list_all_concrete_functions()[0].graph
+    assert any(
+        function.attr["_XlaMustCompile"].b
+        for function in graph.as_graph_def().library.function
+        if "_XlaMustCompile" in function.attr
+    ), "The train step should stay XLA-compiled."
+    assert profiler.summary()["data_wait"]["count"] == 4, "Every step should be timed."
+
+
+def test_step_profiler_keeps_steps_per_execution(data):
+    model = make_tiny_model()
+    _recompile(model, steps_per_execution=2)
+    profiler = StepProfiler()
+    profiler.attach(model)
+
+    model.fit(
+        *data, batch_size=16, verbose=0, callbacks=[profiler, profiler.end_callback]
+    )
+
+    # 4 steps in 2 executions, each fetching 2 batches
+    assert int(model.optimizer.iterations) == 4, "Every batch should be trained on."
+    assert profiler.step_count == 2, "Expected one timing per execution."
+    assert profiler.histograms["data_wait"].total > 0, "Fetches should be timed."
+
+
+def test_step_profiler_times_data_wait_under_a_strategy(data):
+    # dynamic_train trains under a single-device MirroredStrategy
+    with tf.distribute.MirroredStrategy().scope():
+        model = make_tiny_model()
+    profiler = StepProfiler()
+    profiler.attach(model)
+
+    model.fit(
+        *data, batch_size=16, verbose=0, callbacks=[profiler, profiler.end_callback]
+    )
+
+    assert profiler.step_count == 4, "Every step should be timed."
+    assert profiler.histograms["data_wait"].total > 0, "Fetches should be timed."
@@ -2,63 +2,33 @@ from unittest import mock
 
 import pytest
 
-from edgetrain.resource_monitor import sys_resources
+from edgetrain.resource_monitor import apply_memory_budget, sys_resources
 
 
-# Mock the psutil and GPUtil modules
+# Mock the psutil module; GPU metrics come from the fake pynvml module
 @pytest.fixture
-def mock_psutil_and_gputil():
+def mock_psutil(fake_nvml):
     with mock.patch(
         "edgetrain.resource_monitor.psutil.cpu_percent"
     ) as mock_cpu_percent, mock.patch(
         "edgetrain.resource_monitor.psutil.cpu_count"
     ) as mock_cpu_count, mock.patch(
         "edgetrain.resource_monitor.psutil.virtual_memory"
-    ) as mock_virtual_memory, mock.patch(
-        "edgetrain.resource_monitor.GPUtil.getGPUs"
-    ) as mock_get_gpus, mock.patch(
-        "edgetrain.resource_monitor.nvmlInit"
-    ) as mock_nvml_init, mock.patch(
-        "edgetrain.resource_monitor.nvmlShutdown"
-    ) as mock_nvml_shutdown, mock.patch(
-        "edgetrain.resource_monitor.nvmlDeviceGetUtilizationRates"
-    ) as mock_nvml_device_utilization, mock.patch(
-        "edgetrain.resource_monitor.nvmlDeviceGetHandleByIndex"
-    ) as mock_nvml_device_handle:
+    ) as mock_virtual_memory:
         # Setup mock return values for psutil
         mock_cpu_percent.return_value = 50.0
         mock_cpu_count.return_value = 8
         mock_virtual_memory.return_value.percent = 75.0
 
-        # Setup mock return values for GPUtil
-        mock_get_gpus.return_value = [
-            mock.Mock(memoryUsed=1000, memoryTotal=8000, memoryUtil=0.12),
-            mock.Mock(memoryUsed=1200, memoryTotal=8000, memoryUtil=0.15),
-        ]
-
-        # Mock nvmlInit and nvmlShutdown
-        mock_nvml_init.return_value = None
-        mock_nvml_shutdown.return_value = None
-
-        # Mock nvmlDeviceGetHandleByIndex to return a dummy handle
-        mock_nvml_device_handle.side_effect = lambda i: f"handle_{i}"
-
-        # Mock nvmlDeviceGetUtilizationRates to return a mock object with a gpu attribute
-        mock_nvml_device_utilization.return_value = mock.Mock(gpu=60)
-
         yield {
             "mock_cpu_percent": mock_cpu_percent,
             "mock_cpu_count": mock_cpu_count,
             "mock_virtual_memory": mock_virtual_memory,
-            "mock_get_gpus": mock_get_gpus,
-            "mock_nvml_init": mock_nvml_init,
-            "mock_nvml_shutdown": mock_nvml_shutdown,
-            "mock_nvml_device_utilization": mock_nvml_device_utilization,
-            "mock_nvml_device_handle": mock_nvml_device_handle,
+            "fake_nvml": fake_nvml,
         }
 
 
-def test_sys_resources(mock_psutil_and_gputil):
+def test_sys_resources(mock_psutil):
     result = sys_resources()
 
     # Check if the function returns a dictionary with the expected keys
@@ -78,6 +48,70 @@ def test_sys_resources(mock_psutil_and_gputil):
     assert result["gpu_compute_percent"] == 60.0
     assert result["gpu_memory_usage"] == 2200
     assert result["gpu_memory_total"] == 16000
+    assert result["num_gpus"] == 2
 
     # Compare the fractional value instead of percentage
-    assert result["gpu_memory_percent"] == 0.135
+    assert result["gpu_memory_percent"] == pytest.approx(0.1375)
+
+
+def test_sys_resources_does_not_reinitialize_nvml(mock_psutil):
+    fake_nvml = mock_psutil["fake_nvml"]
+    for _ in range(3):
+        sys_resources()
+
+    names = [name for name, _ in fake_nvml.calls]
+    assert names.count("nvmlInit") == 1, "NVML should only be initialized once."
+    assert names.count("nvmlShutdown") == 0, "NVML should stay initialized."
+    assert (
+        names.count("nvmlDeviceGetHandleByIndex") == 2
+    ), "Device handles should be cached."
+
+
+def test_sys_resources_non_blocking(mock_psutil):
+    sys_resources(interval=None)
+    mock_psutil["mock_cpu_percent"].assert_called_with(interval=None)
+
+
+def test_sys_resources_reports_process_memory(mock_psutil):
+    result = sys_resources(interval=None)
+
+    assert result["process_rss"] > 0, "The process RSS should be reported."
+    assert 0 < result["process_uss"] <= result["process_rss"], "USS should fit in RSS."
+    # No GPU allocator in this process
+    assert result["tf_memory_current"] == 0, "Unexpected TensorFlow memory."
+
+
+def test_apply_memory_budget():
+    resources = {
+        "num_gpus": 1,
+        "cpu_memory_percent": 95.0,
+        "gpu_memory_percent": 0.9,
+        "gpu_memory_total": 4096,
+        "process_rss": 768 * 2**20,
+        "process_uss": 512 * 2**20,
+        "tf_memory_current": 2**30,
+    }
+
+    budgeted = apply_memory_budget(resources, 2**30)
+
+    assert budgeted["cpu_memory_percent"] == 50.0, "USS should be compared to budget."
+    assert budgeted["gpu_memory_percent"] == 25.0, "Expected the allocator share."
+    assert budgeted["host_memory_percent"] == 95.0, "Host usage should be kept."
+    assert budgeted["host_gpu_memory_percent"] == 90.0, "Expected a percentage."
+    assert resources["cpu_memory_percent"] == 95.0, "The snapshot should be copied."
+
+
+def test_apply_memory_budget_gpu_percentages(mock_psutil):
+    # 2200 MiB used out of 16000 MiB on the fake GPUs
+    resources = sys_resources(interval=None)
+
+    budgeted = apply_memory_budget(resources, 2**40)
+    assert budgeted["gpu_memory_percent"] == pytest.approx(
+        13.75
+    ), "Without allocator stats, device usage should become a percentage."
+    assert budgeted["host_gpu_memory_percent"] == pytest.approx(13.75), "Host GPU %."
+
+    resources["tf_memory_current"] = 800 * 2**20
+    budgeted = apply_memory_budget(resources, 2**40)
+    assert budgeted["gpu_memory_percent"] == pytest.approx(5.0), "Allocator share."
+    assert budgeted["host_gpu_memory_percent"] == pytest.approx(13.75), "Host GPU %."
@@ -0,0 +1,194 @@
+import csv
+import os
+import types
+
+import pytest
+from tensorflow import keras
+
+from edgetrain.train_controller import EdgeTrainController
+
+# Resource snapshot of an idle CPU-only machine
+LOW_MEMORY = {
+    "num_gpus": 0,
+    "cpu_compute_percent": 20.0,
+    "cpu_memory_percent": 10.0,
+    "gpu_compute_percent": 0,
+    "gpu_memory_percent": 0,
+}
+
+
+def make_tiny_model():
+    model = keras.Sequential(
+        [keras.layers.Input(shape=(4,)), keras.layers.Dense(3, activation="softmax")]
+    )
+    model.compile(
+        optimizer="sgd", loss="sparse_categorical_crossentropy", metrics=["accuracy"]
+    )
+    return model
+
+
+def make_controller(log_file, **kwargs):
+    return EdgeTrainController(
+        batch_size=16,
+        lr=1e-3,
+        pruning=0.0,
+        log_file=log_file,
+        sampler=types.SimpleNamespace(latest=lambda: dict(LOW_MEMORY)),
+        **kwargs
+    )
+
+
+def read_log(log_file):
+    with open(log_file, "r") as f:
+        return list(csv.DictReader(f))
+
+
+def test_controller_runs_every_n_steps(tmpdir, data):
+    model = make_tiny_model()
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(log_file, every_n_steps=2, dynamic_adjustments=False)
+
+    # 64 samples / 16 per batch = 4 steps per epoch -> 2 decisions per epoch
+    model.fit(*data, batch_size=16, epochs=2, callbacks=[controller], verbose=0)
+
+    rows = read_log(log_file)
+    assert len(rows) == 4, "Expected one log row per decision."
+    assert [row["Epoch #"] for row in rows] == ["1", "1", "2", "2"], "Epoch mismatch."
+
+
+def test_controller_runs_once_per_epoch_by_default(tmpdir, data):
+    model = make_tiny_model()
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(log_file, dynamic_adjustments=False)
+
+    model.fit(*data, batch_size=16, epochs=3, callbacks=[controller], verbose=0)
+
+    assert len(read_log(log_file)) == 3, "Expected one decision per epoch."
+
+
+def test_controller_stops_fit_when_batch_size_changes(tmpdir, data):
+    model = make_tiny_model()
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(
+        log_file,
+        every_n_steps=1,
+        user_priorities={"batch_size_adjustment": 1.0, "accuracy_improvement": 0.0},
+    )
+
+    history = model.fit(
+        *data, batch_size=16, epochs=5, callbacks=[controller], verbose=0
+    )
+
+    # Low memory doubles the batch size, which ends fit after the first epoch
+    assert controller.batch_size > 16, "Batch size should increase on low memory."
+    assert len(history.epoch) == 1, "Fit should stop at the end of the epoch."
+    assert len(read_log(log_file)) == 4, "Decisions should run on every step."
+
+
+def test_controller_logs_throughput(tmpdir, data):
+    model = make_tiny_model()
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(
+        log_file, dynamic_adjustments=False, target_accuracy=0.0
+    )
+
+    model.fit(*data, batch_size=16, epochs=2, callbacks=[controller], verbose=0)
+
+    rows = read_log(log_file)
+    for row in rows:
+        step_time = float(row["Step Time (s)"])
+        samples_per_second = float(row["Samples/s"])
+        assert step_time > 0, "Step time should be measured."
+        assert samples_per_second == pytest.approx(
+            16 / step_time
+        ), "Throughput should match the step time."
+    assert (
+        float(rows[0]["Time to Accuracy (s)"]) > 0
+    ), "Time to the target accuracy should be logged."
+    assert (
+        rows[1]["Time to Accuracy (s)"] == rows[0]["Time to Accuracy (s)"]
+    ), "Time to accuracy should be measured once."
+    assert (
+        float(rows[0]["Accuracy Gain/s"]) > 0
+    ), "The accuracy gain per second should be logged."
+
+
+def test_controller_keeps_effective_batch_size(tmpdir):
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(
+        log_file,
+        user_priorities={"batch_size_adjustment": 1.0, "accuracy_improvement": 0.0},
+        effective_batch_size=64,
+    )
+    controller.model = types.SimpleNamespace(optimizer=None)
+    controller.apply_hyperparameters = lambda: None
+
+    assert controller.accumulation_steps == 4, "4 x 16 should make 64 samples."
+
+    # Low memory grows the micro-batch up to the effective batch size only
+    for _ in range(3):
+        controller.adjust(0.5)
+    assert controller.batch_size == 64, "Micro-batch is capped at the effective size."
+    assert controller.accumulation_steps == 1, "No accumulation at full size."
+
+    # High memory halves the micro-batch; accumulation doubles
+    controller.sampler = types.SimpleNamespace(
+        latest=lambda: {**LOW_MEMORY, "cpu_memory_percent": 90.0}
+    )
+    controller.adjust(0.5)
+    assert controller.batch_size == 32, "Micro-batch should shrink on high memory."
+    assert controller.accumulation_steps == 2, "Accumulation should keep 64 samples."
+
+    rows = read_log(log_file)
+    assert [row["Accumulation Steps"] for row in rows] == [
+        "2",
+        "1",
+        "1",
+        "2",
+    ], "The accumulation factor should be logged."
+
+
+def test_controller_switches_precision_on_high_memory(tmpdir, data):
+    model = make_tiny_model()
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(
+        log_file,
+        user_priorities={"batch_size_adjustment": 1.0, "accuracy_improvement": 0.0},
+        mixed_precision="mixed_bfloat16",
+    )
+    controller.sampler = types.SimpleNamespace(
+        latest=lambda: {**LOW_MEMORY, "cpu_memory_percent": 90.0}
+    )
+
+    history = model.fit(
+        *data, batch_size=16, epochs=3, callbacks=[controller], verbose=0
+    )
+
+    # Switching precision replaces halving the batch size, and needs a new model
+    assert controller.precision == "mixed_bfloat16", "Precision should switch."
+    assert controller.batch_size == 16, "Batch size should be kept."
+    assert len(history.epoch) == 1, "Fit should stop at the end of the epoch."
+    assert read_log(log_file)[-1]["Precision"] == "mixed_bfloat16", "Log mismatch."
+
+
+def test_controller_scores_memory_against_budget(tmpdir, data):
+    model = make_tiny_model()
+    log_file = os.path.join(tmpdir, "log.csv")
+    controller = make_controller(
+        log_file,
+        user_priorities={"batch_size_adjustment": 1.0, "accuracy_improvement": 0.0},
+        memory_budget=2**30,
+    )
+    # A busy host, but this process only uses a tenth of its budget
+    controller.sampler = types.SimpleNamespace(
+        latest=lambda: {
+            **LOW_MEMORY,
+            "cpu_memory_percent": 95.0,
+            "process_uss": 2**30 // 10,
+        }
+    )
+
+    model.fit(*data, batch_size=16, epochs=1, callbacks=[controller], verbose=0)
+
+    assert controller.batch_size > 16, "Host-wide usage should not shrink the batch."
+    assert float(read_log(log_file)[-1]["CPU RAM (%)"]) == pytest.approx(10.0)
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+from edgetrain.trials import (
+    SUMMARY_COLUMNS,
+    available_cores,
+    run_trials,
+    split_cores,
+    trial_grid,
+)
+
+
+def test_trial_grid():
+    trials = trial_grid(batch_size=[16, 32], dynamic_adjustments=[True, False])
+
+    assert len(trials) == 4, "Expected one trial per combination."
+    assert {"batch_size": 32, "dynamic_adjustments": False} in trials, "Missing trial."
+    with pytest.raises(ValueError):
+        trial_grid(learning_rate=[1e-3])
+
+
+def test_run_trials_rejects_unavailable_cores(tmpdir):
+    with pytest.raises(ValueError):
+        run_trials({}, [{}], log_dir=str(tmpdir), cores=[max(available_cores()) + 1])
+
+
+def test_split_cores():
+    groups = split_cores([0, 1, 2, 3, 4], 2)
+
+    assert groups == [[0, 1, 2], [3, 4]], "Cores should be split into disjoint groups."
+    assert split_cores([0, 1], 4) == [[0], [1]], "Expected at most one group per core."
+
+
+def test_run_trials(tmpdir):
+    rng = np.random.default_rng(0)
+    train_dataset = {
+        "images": rng.random((32, 28, 28, 1), dtype=np.float32),
+        "labels": rng.integers(0, 10, 32),
+    }
+    trials = [
+        {"batch_size": 16, "dynamic_adjustments": False},
+        {"batch_size": 16, "dynamic_adjustments": True},
+        {"precision": "float64"},
+    ]
+
+    summary = run_trials(
+        train_dataset,
+        trials,
+        log_dir=str(tmpdir),
+        max_workers=2,
+        epochs=1,
+        batch_buckets=None,
+        shuffle_buffer=0,
+    )
+
+    columns = list(summary.columns)
+    assert columns[-6:] == SUMMARY_COLUMNS, "Summary columns mismatch."
+    assert list(summary["Trial"]) == [0, 1, 2], "Expected one row per trial."
+    assert summary.loc[2, "Error"] != "", "The failed trial should report its error."
+    finished = summary.loc[:1]
+    assert (finished["Error"] == "").all(), "Valid trials should not fail."
+    groups = {",".join(map(str, g)) for g in split_cores(available_cores(), 2)}
+    assert set(finished["Cores"]) <= groups, "Workers should own disjoint cores."
+    assert (finished["Wall Time (s)"] > 0).all(), "Missing wall time."
+    assert finished["Final Accuracy"].between(0, 1).all(), "Invalid accuracy."
+    assert (finished["Peak Memory Growth (MiB)"] > 0).all(), "Missing memory growth."
+    for log_file in finished["Log File"]:
+        assert os.path.getsize(log_file) > 0, f"Missing trial log '{log_file}'."